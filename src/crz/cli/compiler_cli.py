@@ -19,6 +19,11 @@ from crz.compiler.codegen_sim import codegen as codegen_sim
 from crz.simulator.simulator import Simulator
 from crz.config import load_config
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
 console = Console()
 
 
@@ -49,7 +54,7 @@ def main() -> int:
 
     if args.command == "compile":
         try:
-            code = Path(args.input).read_text()
+            code = Path(args.input).read_bytes()
             program = parse(code)
             # Semantic check
             analyzer = SemanticAnalyzer()
@@ -75,19 +80,15 @@ def main() -> int:
                 ["fusion", "reversible_emulation", "energy_profile"],
                 compile_pass_config,
             )
+            # IR ops are already JSON-ready dicts
             ir = codegen_sim(optimized)
-            ir_json = [
-                {
-                    "op": op.op,
-                    "args": op.args,
-                    "fused": op.fused,
-                    "metadata": op.metadata,
-                }
-                for op in ir
-            ]
             output = args.output or "out.ir.json"
-            with open(output, "w") as f:
-                json.dump(ir_json, f, indent=2)
+            if orjson is not None:
+                with open(output, "wb") as f:
+                    f.write(orjson.dumps(ir, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output, "w") as f:
+                    json.dump(ir, f, indent=2)
             console.print(f"[green]Compiled to {output}[/green]")
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
@@ -96,7 +97,7 @@ def main() -> int:
     elif args.command == "run":
         try:
             run_config = load_config("config.json")
-            code = Path(args.input).read_text()
+            code = Path(args.input).read_bytes()
             program = parse(code)
             run_pass_config: Dict[str, Any] = {}
             optimized = run_passes(
@@ -133,7 +134,7 @@ def main() -> int:
             with Progress() as progress:
                 task = progress.add_task("Benchmarking...", total=len(files))
                 for file in files:
-                    code = file.read_text()
+                    code = file.read_bytes()
                     program = parse(code)
                     bench_pass_config: Dict[str, Any] = {}
                     optimized = run_passes(
@@ -146,20 +147,11 @@ def main() -> int:
                         cycles, energy, temp = result
                     else:
                         cycles, energy, temp = 0, 0.0, 25.0
-                    results.append(
-                        {
-                            "name": file.stem,
-                            "cycles": cycles,
-                            "energy": energy,
-                            "temp": temp,
-                        }
-                    )
+                    results.append((file.stem, cycles, energy, temp))
                     progress.advance(task)
             with open(args.out, "w", newline="") as f:
-                writer = csv.DictWriter(
-                    f, fieldnames=["name", "cycles", "energy", "temp"]
-                )
-                writer.writeheader()
+                writer = csv.writer(f)
+                writer.writerow(("name", "cycles", "energy", "temp"))
                 writer.writerows(results)
             console.print(f"[green]Benchmarks written to {args.out}[/green]")
         except Exception as e:
@@ -5,8 +5,11 @@ Defines dataclasses for representing the Abstract Syntax Tree (AST) and Intermed
 """
 
 import json
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, asdict, field
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
+
+# Bookkeeping fields that are not part of the serialized AST.
+_NON_JSON_FIELDS = frozenset({"meta", "raw_span", "source"})
 
 
 def to_json_dict(obj):
@@ -14,8 +17,10 @@ def to_json_dict(obj):
 
     def remove_meta(o: Any) -> Any:
         if isinstance(o, dict):
-            return {k: remove_meta(v) for k, v in o.items() if k != "meta"}
-        elif isinstance(o, list):
+            return {
+                k: remove_meta(v) for k, v in o.items() if k not in _NON_JSON_FIELDS
+            }
+        elif isinstance(o, (list, tuple)):
             return [remove_meta(item) for item in o]
         else:
             return o
@@ -23,10 +28,12 @@ def to_json_dict(obj):
     return remove_meta(d)
 
 
-@dataclass
+@dataclass(slots=True)
 class Attribute:
     """Represents an attribute like #[fusion] or #[power="low"]."""
 
+    KIND: ClassVar[str] = "attribute"
+
     name: str
     value: Optional[str] = None
     meta: Optional[Dict[str, int]] = None
@@ -35,28 +42,161 @@ class Attribute:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
+class Expr:
+    """Base class for expression nodes; ``str()`` renders the source form."""
+
+    KIND: ClassVar[str] = "expr"
+
+
+@dataclass(slots=True)
+class Ref(Expr):
+    """Represents a name, register or literal like x, R1 or 42."""
+
+    KIND: ClassVar[str] = "ref"
+
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(slots=True)
+class BinOp(Expr):
+    """Represents a binary operation like a + b."""
+
+    KIND: ClassVar[str] = "binop"
+
+    op: str
+    lhs: Expr
+    rhs: Expr
+
+    def __str__(self) -> str:
+        # Chains are left-nested, so walk the lhs spine instead of recursing
+        parts: List[Any] = []
+        node: Expr = self
+        while isinstance(node, BinOp):
+            parts.append(node.rhs)
+            parts.append(node.op)
+            node = node.lhs
+        parts.append(node)
+        return " ".join(map(str, reversed(parts)))
+
+
+@dataclass(slots=True)
+class UnaryOp(Expr):
+    """Represents a unary operation like -x or !flag."""
+
+    KIND: ClassVar[str] = "unaryop"
+
+    op: str
+    operand: Expr
+
+    def __str__(self) -> str:
+        return f"({self.op}{self.operand})"
+
+
+@dataclass(slots=True)
+class Group(Expr):
+    """Represents a parenthesized expression like (a + b)."""
+
+    KIND: ClassVar[str] = "group"
+
+    expr: Expr
+
+    def __str__(self) -> str:
+        return f"({self.expr})"
+
+
+@dataclass(slots=True)
+class Call(Expr):
+    """Represents a function call like f(a, b)."""
+
+    KIND: ClassVar[str] = "call"
+
+    name: str
+    args: List[Expr]
+
+    def __str__(self) -> str:
+        return f"{self.name}({', '.join(map(str, self.args))})"
+
+
+@dataclass(slots=True)
+class MemRef(Expr):
+    """Represents a memory reference like [R1 + 4]."""
+
+    KIND: ClassVar[str] = "memref"
+
+    addr: Expr
+
+    def __str__(self) -> str:
+        return f"[{self.addr}]"
+
+
+@dataclass(slots=True)
 class Instr:
-    """Represents an instruction with mnemonic, operands, attributes, and raw text."""
+    """Represents an instruction with mnemonic, operands, attributes, and raw text.
+
+    ``attrs`` is an immutable tuple, so rewritten instructions can share it.
+    The parser does not copy the raw text out of the source; it records
+    ``raw_span`` offsets into ``source`` and ``raw`` is sliced on first access.
+    """
+
+    KIND: ClassVar[str] = "instr"
 
     mnemonic: str
     operands: List[str]
-    attrs: List[Attribute]
-    raw: str
+    attrs: Tuple[Attribute, ...]
+    raw: Optional[str] = None
     meta: Optional[Dict[str, int]] = None
+    raw_span: Optional[Tuple[int, int]] = None
+    source: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.attrs = tuple(self.attrs)
 
     @property
     def op(self):
         return self.mnemonic
 
+    def get_attr(self, name: str) -> Optional[Attribute]:
+        """First attribute called ``name``, or None."""
+        for attr in self.attrs:
+            if attr.name == name:
+                return attr
+        return None
+
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+# The raw slot itself caches the sliced text; the property wraps it after
+# @dataclass so the generated __init__ still accepts raw=...
+_instr_raw_slot = Instr.__dict__["raw"]
+
+
+def _get_instr_raw(self: Instr) -> Optional[str]:
+    raw = _instr_raw_slot.__get__(self, Instr)
+    if raw is None and self.raw_span is not None and self.source is not None:
+        start, end = self.raw_span
+        raw = self.source[start:end]
+        _instr_raw_slot.__set__(self, raw)
+    return raw
+
+
+def _set_instr_raw(self: Instr, value: Optional[str]) -> None:
+    _instr_raw_slot.__set__(self, value)
+
+
+Instr.raw = property(_get_instr_raw, _set_instr_raw)  # type: ignore[assignment]
+
+
+@dataclass(slots=True)
 class Label:
     """Represents a label like _loop:."""
 
+    KIND: ClassVar[str] = "label"
+
     name: str
     meta: Optional[Dict[str, int]] = None
 
@@ -64,74 +204,82 @@ class Label:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class LocalDecl:
     """Represents a local declaration like let x: i32 = 5;."""
 
+    KIND: ClassVar[str] = "local_decl"
+
     name: str
     type_: Optional[str]
-    expr: str
+    expr: Expr
     meta: Optional[Dict[str, int]] = None
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign:
     """Represents an assignment like x = y + 1;."""
 
+    KIND: ClassVar[str] = "assign"
+
     target: str
-    expr: str
+    expr: Expr
     meta: Optional[Dict[str, int]] = None
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Return:
     """Represents a return statement like return x;."""
 
-    expr: Optional[str]
+    KIND: ClassVar[str] = "return"
+
+    expr: Optional[Expr]
     meta: Optional[Dict[str, int]] = None
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class If:
     """Represents an if statement."""
 
-    condition: str
+    KIND: ClassVar[str] = "if"
+
+    condition: Expr
     then_block: List["Statement"]
     else_block: Optional[List["Statement"]]
-    attrs: Optional[List[Attribute]] = None
+    attrs: Optional[Tuple[Attribute, ...]] = None
     meta: Optional[Dict[str, int]] = None
 
     def __post_init__(self) -> None:
-        if self.attrs is None:
-            self.attrs = []
+        self.attrs = tuple(self.attrs or ())
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Loop:
     """Represents a for loop."""
 
+    KIND: ClassVar[str] = "loop"
+
     var: str
-    start: str
-    end: str
+    start: Expr
+    end: Expr
     body: List["Statement"]
-    attrs: Optional[List[Attribute]] = None
+    attrs: Optional[Tuple[Attribute, ...]] = None
     meta: Optional[Dict[str, int]] = None
 
     def __post_init__(self) -> None:
-        if self.attrs is None:
-            self.attrs = []
+        self.attrs = tuple(self.attrs or ())
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
@@ -141,29 +289,32 @@ class Loop:
 Statement = Union[Instr, LocalDecl, Assign, Return, Label, If, Loop]
 
 
-@dataclass
+@dataclass(slots=True)
 class Function:
     """Represents a function declaration."""
 
+    KIND: ClassVar[str] = "function"
+
     name: str
     params: List[Tuple[str, Optional[str]]]  # (name, type)
     return_type: Optional[str]
     body: List[Statement]
-    attrs: Optional[List[Attribute]] = None
+    attrs: Optional[Tuple[Attribute, ...]] = None
     meta: Optional[Dict[str, int]] = None
 
     def __post_init__(self) -> None:
-        if self.attrs is None:
-            self.attrs = []
+        self.attrs = tuple(self.attrs or ())
 
     def to_json(self) -> Dict[str, Any]:
         return to_json_dict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Program:
     """Represents the entire program."""
 
+    KIND: ClassVar[str] = "program"
+
     declarations: List[Union[Function, Instr, Label]]
     meta: Optional[Dict[str, int]] = None
 
@@ -4,74 +4,231 @@ from .passes import run_passes
 Generates Python code for the simulator from AST.
 """
 
+import ast as pyast
+from types import CodeType, MappingProxyType
 from typing import List, Dict
-from .ast import Function, Instr, Statement, If, Loop, Label, LocalDecl, Assign, Return
+from .ast import (
+    Assign,
+    BinOp,
+    Call,
+    Expr,
+    Function,
+    Group,
+    If,
+    Instr,
+    Label,
+    LocalDecl,
+    Loop,
+    MemRef,
+    Ref,
+    Return,
+    Statement,
+    UnaryOp,
+)
+
+# Read-only and shared by every SimulatorCodegen instance
+_OP_MAP = MappingProxyType(
+    {
+        "ADD": "add",
+        "SUB": "sub",
+        "MUL": "mul",
+        "DIV": "div",
+        "JMP": "jmp",
+        "JZ": "jz",
+        "JNZ": "jnz",
+        "CALL": "call",
+        "RET": "ret",
+        "FUSED_ADD_MUL": "fused_add_mul",  # For fused ops
+    }
+)
+
+
+# Expression operators -> Python AST operator nodes
+_BIN_OPS = MappingProxyType(
+    {
+        "+": pyast.Add,
+        "-": pyast.Sub,
+        "*": pyast.Mult,
+        "/": pyast.Div,
+        "%": pyast.Mod,
+        "<<": pyast.LShift,
+        ">>": pyast.RShift,
+        "&": pyast.BitAnd,
+        "|": pyast.BitOr,
+        "^": pyast.BitXor,
+    }
+)
+_CMP_OPS = MappingProxyType(
+    {
+        "==": pyast.Eq,
+        "!=": pyast.NotEq,
+        "<": pyast.Lt,
+        "<=": pyast.LtE,
+        ">": pyast.Gt,
+        ">=": pyast.GtE,
+    }
+)
+_BOOL_OPS = MappingProxyType({"&&": pyast.And, "||": pyast.Or})
+_UNARY_OPS = MappingProxyType({"-": pyast.USub, "!": pyast.Not})
 
 
 class SimulatorCodegen:
-    """Code generator for simulator."""
+    """
+    Code generator for simulator.
+
+    Statements are built as Python ``ast`` nodes; ``compile_program`` hands
+    the module straight to ``compile()`` and ``generate_program`` renders the
+    same tree with ``ast.unparse``.
+    """
 
     def __init__(self):
-        self.op_map = {
-            "ADD": "add",
-            "SUB": "sub",
-            "MUL": "mul",
-            "DIV": "div",
-            "JMP": "jmp",
-            "JZ": "jz",
-            "JNZ": "jnz",
-            "CALL": "call",
-            "RET": "ret",
-            "FUSED_ADD_MUL": "fused_add_mul",  # For fused ops
-        }
+        self.op_map = _OP_MAP
 
     def generate_function(self, func: Function) -> str:
         """Generate simulator code for a function."""
-        code = f"def {func.name}(simulator):\n"
-        for stmt in func.body:
-            code += self.generate_statement(stmt)
-        return code
+        node = pyast.fix_missing_locations(self.function_node(func))
+        return pyast.unparse(node) + "\n"
+
+    def generate_program(self, program: List[Function]) -> str:
+        """Generate full simulator program."""
+        return pyast.unparse(self.program_node(program)) + "\n"
+
+    def compile_program(self, program: List[Function]) -> CodeType:
+        """Compile the program straight to a code object, skipping source text."""
+        return compile(self.program_node(program), "<crz>", "exec")
+
+    def program_node(self, program: List[Function]) -> pyast.Module:
+        """Build the module: import, simulator instance, functions, call to main."""
+        body: List[pyast.stmt] = [
+            pyast.ImportFrom(
+                module="simulator", names=[pyast.alias(name="Simulator")], level=0
+            ),
+            pyast.Assign(
+                targets=[pyast.Name(id="sim", ctx=pyast.Store())],
+                value=_call(pyast.Name(id="Simulator", ctx=pyast.Load()), []),
+            ),
+        ]
+        body.extend(self.function_node(func) for func in program)
+        main = pyast.Name(id=program[0].name, ctx=pyast.Load())
+        body.append(
+            pyast.Expr(value=_call(main, [pyast.Name(id="sim", ctx=pyast.Load())]))
+        )
+        module = pyast.Module(body=body, type_ignores=[])
+        return pyast.fix_missing_locations(module)
 
-    def generate_statement(self, stmt: Statement) -> str:
-        """Generate code for a statement."""
+    def function_node(self, func: Function) -> pyast.FunctionDef:
+        """Build the AST node for a function."""
+        body = self._block_nodes(func.body)
+        return pyast.FunctionDef(
+            name=func.name,
+            args=pyast.arguments(
+                posonlyargs=[],
+                args=[pyast.arg(arg="simulator")],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=body or [pyast.Pass()],
+            decorator_list=[],
+            type_params=[],
+        )
+
+    def statement_nodes(self, stmt: Statement) -> List[pyast.stmt]:
+        """Build AST nodes for a statement (labels produce none)."""
         if isinstance(stmt, Instr):
-            return self.generate_instr(stmt)
+            op = self.op_map.get(stmt.mnemonic, stmt.mnemonic.lower())
+            args = [pyast.Constant(value=operand) for operand in stmt.operands]
+            return [pyast.Expr(value=_call(_simulator_attr(op), args))]
         elif isinstance(stmt, If):
-            code = f"    if simulator.get_flag('{stmt.condition}'):\n"
-            for s in stmt.then_block:
-                code += "    " + self.generate_statement(s)
-            if stmt.else_block:
-                code += "    else:\n"
-                for s in stmt.else_block:
-                    code += "    " + self.generate_statement(s)
-            return code
+            test = _call(
+                _simulator_attr("get_flag"), [pyast.Constant(value=str(stmt.condition))]
+            )
+            then_body = self._block_nodes(stmt.then_block) or [pyast.Pass()]
+            else_body = self._block_nodes(stmt.else_block or [])
+            return [pyast.If(test=test, body=then_body, orelse=else_body)]
         elif isinstance(stmt, Loop):
-            code = f"    for i in range({stmt.start}, {stmt.end}):\n"
-            code += f"        simulator.set_reg('{stmt.var}', i)\n"
-            for s in stmt.body:
-                code += "    " + self.generate_statement(s)
-            return code
-        elif isinstance(stmt, Label):
-            return f"    # label {stmt.name}\n"
-        else:
-            return f"    # unknown statement\n"
-
-    def generate_instr(self, instr: Instr) -> str:
-        """Generate code for an instruction."""
-        op = self.op_map.get(instr.mnemonic, instr.mnemonic.lower())
-        args = ", ".join(
-            f"'{op}'" if isinstance(op, str) else str(op) for op in instr.operands
-        )
-        return f"    simulator.{op}({args})\n"
+            bounds = [expr_node(stmt.start), expr_node(stmt.end)]
+            set_var = _call(
+                _simulator_attr("set_reg"),
+                [
+                    pyast.Constant(value=stmt.var),
+                    pyast.Name(id="i", ctx=pyast.Load()),
+                ],
+            )
+            return [
+                pyast.For(
+                    target=pyast.Name(id="i", ctx=pyast.Store()),
+                    iter=_call(pyast.Name(id="range", ctx=pyast.Load()), bounds),
+                    body=[pyast.Expr(value=set_var)] + self._block_nodes(stmt.body),
+                    orelse=[],
+                )
+            ]
+        return []
+
+    def _block_nodes(self, block: List[Statement]) -> List[pyast.stmt]:
+        nodes: List[pyast.stmt] = []
+        for stmt in block:
+            nodes.extend(self.statement_nodes(stmt))
+        return nodes
+
+
+def expr_node(expr: Expr) -> pyast.expr:
+    """Lower a CRZ64I expression straight to a Python AST expression."""
+    if isinstance(expr, Ref):
+        return _ref_node(expr.name)
+    elif isinstance(expr, Group):
+        return expr_node(expr.expr)  # unparse adds parentheses where needed
+    elif isinstance(expr, BinOp):
+        # Chains are left-nested: lower the lhs spine iteratively
+        spine = []
+        node: Expr = expr
+        while isinstance(node, BinOp):
+            spine.append(node)
+            node = node.lhs
+        result = expr_node(node)
+        for binop in reversed(spine):
+            result = _binop_node(binop.op, result, expr_node(binop.rhs))
+        return result
+    elif isinstance(expr, UnaryOp):
+        return pyast.UnaryOp(op=_UNARY_OPS[expr.op](), operand=expr_node(expr.operand))
+    elif isinstance(expr, Call):
+        func = pyast.Name(id=expr.name, ctx=pyast.Load())
+        return _call(func, [expr_node(arg) for arg in expr.args])
+    elif isinstance(expr, MemRef):
+        return pyast.List(elts=[expr_node(expr.addr)], ctx=pyast.Load())
+    raise TypeError(f"cannot lower expression {expr!r}")
+
+
+def _ref_node(name: str) -> pyast.expr:
+    # Refs hold names, registers and literals alike
+    if name[:1] == '"':
+        return pyast.Constant(value=name[1:-1])
+    for parse in (lambda text: int(text, 0), float):
+        try:
+            return pyast.Constant(value=parse(name))
+        except ValueError:
+            pass
+    return pyast.Name(id=name, ctx=pyast.Load())
 
-    def generate_program(self, program: List[Function]) -> str:
-        """Generate full simulator program."""
-        code = "from simulator import Simulator\n\n"
-        code += "sim = Simulator()\n\n"
-        for func in program:
-            code += self.generate_function(func) + "\n"
-        code += f"{program[0].name}(sim)\n"  # Call main
-        return code
+
+def _binop_node(op: str, lhs: pyast.expr, rhs: pyast.expr) -> pyast.expr:
+    if op in _BOOL_OPS:
+        return pyast.BoolOp(op=_BOOL_OPS[op](), values=[lhs, rhs])
+    if op in _CMP_OPS:
+        return pyast.Compare(left=lhs, ops=[_CMP_OPS[op]()], comparators=[rhs])
+    return pyast.BinOp(left=lhs, op=_BIN_OPS[op](), right=rhs)
+
+
+def _simulator_attr(name: str) -> pyast.Attribute:
+    return pyast.Attribute(
+        value=pyast.Name(id="simulator", ctx=pyast.Load()),
+        attr=name,
+        ctx=pyast.Load(),
+    )
+
+
+def _call(func: pyast.expr, args: List[pyast.expr]) -> pyast.Call:
+    return pyast.Call(func=func, args=args, keywords=[])
 
 
 def generate_simulator_code(program: List[Function]) -> str:
@@ -80,6 +237,12 @@ def generate_simulator_code(program: List[Function]) -> str:
     return codegen.generate_program(program)
 
 
+def compile_simulator_code(program: List[Function]) -> CodeType:
+    """Compile simulator Python code from program AST to a code object."""
+    codegen = SimulatorCodegen()
+    return codegen.compile_program(program)
+
+
 def lower_statement(stmt, config):
     if isinstance(stmt, Instr):
         op = stmt.mnemonic
@@ -99,7 +262,7 @@ def lower_statement(stmt, config):
         return lower_expr_assign(stmt.target, stmt.expr, config)
     elif isinstance(stmt, Return):
         if stmt.expr:
-            return [{"op": "ADD", "args": ["r0", stmt.expr, "r0"]}]
+            return [{"op": "ADD", "args": ["r0", str(stmt.expr), "r0"]}]
         return []
     else:
         return []
@@ -107,10 +270,9 @@ def lower_statement(stmt, config):
 
 def lower_expr_assign(target, expr, config):
     """Lower assignment expr to instructions."""
-    if "+" in expr:
-        left, right = expr.split("+", 1)
-        left = left.strip()
-        right = right.strip()
+    if isinstance(expr, BinOp) and expr.op == "+":
+        left = str(expr.lhs)
+        right = str(expr.rhs)
         return [
             {
                 "op": "ADD",
@@ -123,7 +285,7 @@ def lower_expr_assign(target, expr, config):
         return [
             {
                 "op": "ADD",
-                "args": [target, expr, "r0"],
+                "args": [target, str(expr), "r0"],
                 "fused": False,
                 "energy_est": config.energy.get("ADD", 0.0),
             }
@@ -132,8 +294,8 @@ def lower_expr_assign(target, expr, config):
 
 def lower_loop(loop, config):
     var = loop.var
-    start = loop.start
-    end = loop.end
+    start = str(loop.start)
+    end = str(loop.end)
     loop_label = f"loop_{id(loop)}"
     end_label = f"loop_end_{id(loop)}"
     ir = []
@@ -173,7 +335,7 @@ def lower_if(if_stmt, config):
     end_label = f"end_if_{id(if_stmt)}"
     ir = []
     # br_if condition, then_label  (assume condition is reg)
-    ir.append({"op": "BR_IF", "args": [if_stmt.condition, then_label]})
+    ir.append({"op": "BR_IF", "args": [str(if_stmt.condition), then_label]})
     # jmp end
     ir.append({"op": "JMP", "args": [end_label]})
     # label then
@@ -192,6 +354,25 @@ def lower_if(if_stmt, config):
     return ir
 
 
+def _estimate_ir_size(stmts) -> int:
+    """Count the IR ops lower_statement will emit for stmts."""
+    size = 0
+    for stmt in stmts:
+        if isinstance(stmt, Loop):
+            # init, loop label, increment, BR_IF, end label
+            size += 5 + _estimate_ir_size(stmt.body)
+        elif isinstance(stmt, If):
+            # BR_IF, JMP, then label, JMP, end label (+ else label)
+            size += 5 + _estimate_ir_size(stmt.then_block)
+            if stmt.else_block:
+                size += 1 + _estimate_ir_size(stmt.else_block)
+        elif isinstance(stmt, Return):
+            size += 1 if stmt.expr else 0
+        elif isinstance(stmt, (Instr, Label, LocalDecl, Assign)):
+            size += 1
+    return size
+
+
 def codegen(program, apply_fusion=True):
     """Generate simulator IR with fused flags and energy estimates."""
     from ..config import Config
@@ -199,18 +380,23 @@ def codegen(program, apply_fusion=True):
 
     func = program.declarations[0]
     config = Config()
-    ir = []
+    # Size the IR list once up front and fill it by slice assignment so it
+    # does not regrow while lowering large bodies.
+    ir = [None] * (len(func.params) + _estimate_ir_size(func.body))
+    idx = 0
     for i, (name, _) in enumerate(func.params):
-        ir.append(
-            {
-                "op": "ADD",
-                "args": [name, f"r{i}", "r0"],
-                "fused": False,
-                "energy_est": config.energy.get("ADD", 0.0),
-            }
-        )
+        ir[idx] = {
+            "op": "ADD",
+            "args": [name, f"r{i}", "r0"],
+            "fused": False,
+            "energy_est": config.energy.get("ADD", 0.0),
+        }
+        idx += 1
     for stmt in func.body:
-        ir.extend(lower_statement(stmt, config))
+        lowered = lower_statement(stmt, config)
+        ir[idx : idx + len(lowered)] = lowered
+        idx += len(lowered)
+    del ir[idx:]
     # Apply fusion to IR if requested
     if apply_fusion:
         ir = apply_fusion_to_ir(ir)
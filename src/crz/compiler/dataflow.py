@@ -4,19 +4,27 @@ CRZ64I Control Flow Graph and Dataflow Analysis
 Builds CFG from AST, enumerates paths, analyzes paths for diagnostics.
 """
 
-from typing import List, Dict, Set, Tuple, Optional, Any
+from itertools import islice
+from typing import List, Dict, Set, Tuple, Optional, Any, Iterator
 from ..config import Config
 from .parser import parse
 from .ast import Function, Statement, Instr, If, Loop, Label
 
+# Mnemonics that end a basic block, and the subset that jump to a label
+_TERMINATORS = frozenset({"JMP", "JZ", "JNZ", "CALL", "RET"})
+_JUMPS = frozenset({"JMP", "JZ", "JNZ"})
+
 
 class BasicBlock:
     """Represents a basic block in the CFG."""
 
+    __slots__ = ("id", "statements", "successors", "has_div")
+
     def __init__(self, id: int, statements: List[Statement]):
         self.id = id
         self.statements = statements
         self.successors: List[int] = []
+        self.has_div = False
 
     def __repr__(self):
         return (
@@ -27,38 +35,64 @@ class BasicBlock:
 class CFG:
     """Control Flow Graph."""
 
+    __slots__ = ("blocks", "entry", "any_div")
+
     def __init__(self, blocks: List[BasicBlock], entry: int = 0):
         self.blocks = blocks
         self.entry = entry
+        # Blocks are final once the CFG is built; flag the ones holding a DIV
+        # so analyze_path can skip everything else.
+        for block in blocks:
+            block.has_div = any(
+                isinstance(s, Instr) and s.mnemonic == "DIV" for s in block.statements
+            )
+        self.any_div = any(block.has_div for block in blocks)
 
     def get_block(self, id: int) -> BasicBlock:
         return self.blocks[id]
 
+    def iter_paths(self) -> Iterator[Tuple[int, ...]]:
+        """Lazily yield paths from entry to exit, depth-first.
+
+        Uses an explicit stack instead of recursion; paths longer than 51
+        blocks are pruned, which also bounds walks around loop back edges.
+        """
+        if not self.blocks:
+            return
+        exit_id = len(self.blocks) - 1  # Assume last block is exit
+        path = [self.entry]
+        if self.entry == exit_id:
+            yield (self.entry,)
+            return
+        stack = [iter(self.blocks[self.entry].successors)]
+        while stack:
+            succ = next(stack[-1], None)
+            if succ is None:
+                stack.pop()
+                path.pop()
+                continue
+            if len(path) > 50:  # Prune long paths
+                continue
+            if succ == exit_id:
+                yield tuple(path) + (succ,)
+                continue
+            path.append(succ)
+            stack.append(iter(self.blocks[succ].successors))
+
     def enumerate_paths(self, max_paths: int = 100) -> List[List[int]]:
         """Enumerate paths from entry to exit, bounded by max_paths."""
-        paths: List[List[int]] = []
-
-        def dfs(current: int, path: List[int], visited: Set[int]):
-            if len(paths) >= max_paths or len(path) > 50:  # Prune long paths
-                return
-            path.append(current)
-            if current == len(self.blocks) - 1:  # Assume last block is exit
-                paths.append(path.copy())
-            else:
-                for succ in self.blocks[current].successors:
-                    if succ not in visited:
-                        dfs(succ, path, visited.copy())
-            path.pop()
-
-        dfs(self.entry, [], set())
-        return paths
+        return [list(path) for path in islice(self.iter_paths(), max_paths)]
 
     def analyze_path(self, path: List[int]) -> List[Dict[str, Any]]:
         """Analyze a path for diagnostics."""
         diagnostics: List[Dict[str, Any]] = []
+        if not self.any_div:
+            return diagnostics
         # Simple analysis: check for potential issues
         for block_id in path:
             block = self.blocks[block_id]
+            if not block.has_div:
+                continue
             for stmt in block.statements:
                 if isinstance(stmt, Instr):
                     # Example: check for division by zero potential
@@ -157,7 +191,7 @@ def build_cfg(func: Function) -> CFG:
         elif isinstance(stmt, Instr):
             current_block.statements.append(stmt)
             # If jump, end block
-            if stmt.mnemonic in ["JMP", "JZ", "JNZ", "CALL", "RET"]:
+            if stmt.mnemonic in _TERMINATORS:
                 add_block()
                 # Resolve successors later
         else:
@@ -167,7 +201,7 @@ def build_cfg(func: Function) -> CFG:
     # Resolve jumps
     for block in blocks:
         for stmt in block.statements:
-            if isinstance(stmt, Instr) and stmt.mnemonic in ["JMP", "JZ", "JNZ"]:
+            if isinstance(stmt, Instr) and stmt.mnemonic in _JUMPS:
                 if stmt.operands:
                     target = stmt.operands[0]
                     if target in block_map:
@@ -261,7 +295,8 @@ class DataflowAnalyzer:
                     )
 
         # Analyze all paths from CFG
-        for path in self.cfg.enumerate_paths(getattr(self.config, "max_paths", 100)):
+        max_paths = getattr(self.config, "max_paths", 100)
+        for path in islice(self.cfg.iter_paths(), max_paths):
             path_let: Set[str] = set()
             path_written: Set[str] = set()
             for block_id in path:
@@ -294,8 +329,8 @@ def analyze_text(txt: str, max_paths: int = 100, max_len: int = 100) -> Dict[str
     if not func:
         return {"status": "error"}
     cfg = build_cfg(func)
-    paths = cfg.enumerate_paths(max_paths)
-    if len(paths) >= max_paths:
+    path_count = sum(1 for _ in islice(cfg.iter_paths(), max_paths))
+    if path_count >= max_paths:
         status = "bounded"
     else:
         status = "ok"
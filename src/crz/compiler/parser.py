@@ -4,13 +4,24 @@ CRZ64I Parser Module
 Uses Lark parser to parse CRZ64I code according to the grammar in crz64i.lark and transforms to AST.
 """
 
+import operator
+import sys
+from functools import lru_cache
 from typing import Any, List, Optional, Tuple, Union
 from pathlib import Path
-from lark import Lark, Transformer, Token, Tree, v_args
+from lark import Lark, Token, Tree, v_args
+from lark.visitors import Transformer_InPlace
 
 
 from .ast import (
     Attribute,
+    BinOp,
+    Call,
+    Expr,
+    Group,
+    MemRef,
+    Ref,
+    UnaryOp,
     Instr,
     Label,
     LocalDecl,
@@ -24,24 +35,28 @@ from .ast import (
 )
 
 
-class CRZTransformer(Transformer):
-    """Transformer to convert parse tree to AST dataclasses."""
+class CRZTransformer(Transformer_InPlace):
+    """Transformer to convert parse tree to AST dataclasses.
+
+    Lark calls each rule bottom-up, so ``children`` are always already
+    transformed; callbacks never recurse into ``self.transform``.
+    Transformer_InPlace drives the walk from ``Tree.iter_subtrees()`` (an
+    explicit stack), so nesting depth is not bounded by the recursion limit.
+    """
 
     visit_tokens = True
 
     def __init__(self, code: str) -> None:
         self.code = code
 
-    def _binary_expr(self, children, ops) -> str:
-        """Helper for binary expressions."""
-        if len(children) == 1:
-            return self.transform(children[0])
-        left = self.transform(children[0])
+    def _binary_expr(self, children) -> Expr:
+        """Helper for binary expressions: fold operands into left-nested BinOps."""
+        expr = children[0]
         for i in range(1, len(children), 2):
-            op = children[i]
-            right = self.transform(children[i + 1])
-            left = f"{left} {op} {right}"
-        return left
+            expr = BinOp(
+                op=sys.intern(children[i].value), lhs=expr, rhs=children[i + 1]
+            )
+        return expr
 
     @v_args(meta=True)
     def attribute(self, meta, children) -> Attribute:
@@ -51,147 +66,128 @@ class CRZTransformer(Transformer):
         if (
             len(children) == 6 and children[4] is not None
         ):  # Has value: HASH LBRA NAME ASSIGN value RBRA
-            value = children[4]  # already string
+            value = sys.intern(str(children[4]))
         return Attribute(name=name, value=value, meta=meta)
 
-    def attribute_list(self, children) -> List[Attribute]:
-        """Transform attribute_list to list of attributes."""
-        return children
+    def attribute_list(self, children) -> Tuple[Attribute, ...]:
+        """Transform attribute_list to a tuple of attributes."""
+        return tuple(children)
 
-    def expression(self, children) -> str:
-        """Transform expression to string."""
-        if len(children) == 1:
-            return self.transform(children[0])
-        else:
-            # primary (BINARY_OP primary)*
-            left = self.transform(children[0])
-            for i in range(1, len(children), 2):
-                op = children[i]
-                right = self.transform(children[i + 1])
-                left = f"{left} {op} {right}"
-            return left
-
-    def or_expression(self, children) -> str:
+    def expression(self, children) -> Expr:
+        """Transform expression to an Expr tree."""
+        # primary (BINARY_OP primary)*
+        return self._binary_expr(children)
+
+    def or_expression(self, children) -> Expr:
         """Transform or_expression."""
-        return self._binary_expr(children, ["||"])
+        return self._binary_expr(children)
 
-    def and_expression(self, children) -> str:
+    def and_expression(self, children) -> Expr:
         """Transform and_expression."""
-        return self._binary_expr(children, ["&&"])
+        return self._binary_expr(children)
 
-    def comparison_expression(self, children) -> str:
+    def comparison_expression(self, children) -> Expr:
         """Transform comparison_expression."""
-        return self._binary_expr(children, ["==", "!=", "<", "<=", ">", ">="])
+        return self._binary_expr(children)
 
-    def add_expression(self, children) -> str:
+    def add_expression(self, children) -> Expr:
         """Transform add_expression."""
-        return self._binary_expr(children, ["+", "-"])
+        return self._binary_expr(children)
 
-    def mul_expression(self, children) -> str:
+    def mul_expression(self, children) -> Expr:
         """Transform mul_expression."""
-        return self._binary_expr(children, ["*", "/", "%", "<<", ">>", "&", "|", "^"])
+        return self._binary_expr(children)
 
-    def unary_expression(self, children) -> str:
-        """Transform unary_expression to string."""
+    def unary_expression(self, children) -> Expr:
+        """Transform unary_expression to an Expr node."""
         if len(children) == 1:
-            return self.transform(children[0])
-        op = children[0]
-        expr = self.transform(children[1])
-        return f"({op}{expr})"
+            return children[0]
+        op, operand = children
+        return UnaryOp(op=sys.intern(str(op)), operand=operand)
+
+    @v_args(inline=True)
+    def primary_expression(self, expr) -> Expr:
+        """Transform primary_expression to an Expr node."""
+        # NAME, NUMBER, STRING and REGISTER arrive as plain strings
+        return Ref(name=expr) if isinstance(expr, str) else expr
+
+    @v_args(inline=True)
+    def group_expression(self, expr) -> Group:
+        """Transform a parenthesized primary_expression to Group."""
+        return Group(expr=expr)
+
+    @v_args(inline=True)
+    def function_call(self, name, args) -> Call:
+        """Transform function_call to Call like 'func(a, b)'."""
+        return Call(name=name, args=args or [])
+
+    def argument_list(self, children) -> List[Expr]:
+        """Transform argument_list to list of expressions."""
+        return children
 
-    def primary_expression(self, children) -> str:
-        """Transform primary_expression to string."""
-        return self.transform(children[0])
+    def memory_reference(self, children) -> MemRef:
+        """Transform memory_reference to MemRef like '[expr]'."""
+        # children = [LBRA, expression, RBRA]
+        return MemRef(addr=children[1])
 
-    def function_call(self, children) -> str:
-        """Transform function_call to string like 'func(a, b)'."""
-        name = children[0]
-        if len(children) == 3:  # NAME LPAREN RPAREN
-            return f"{name}()"
-        args = self.argument_list(children[2])
-        return f"{name}({', '.join(args)})"
-
-    def argument_list(self, children) -> List[str]:
-        """Transform argument_list to list of expression strings."""
-        return [self.transform(c) for c in children[0::2]]
-
-    def memory_reference(self, children) -> str:
-        """Transform memory_reference to string like '[expr]'."""
-        # children = [LBRA, expression, RBRA] = ['[', 'R1', ']']
-        expr = children[1]
-        return f"[{expr}]"
-
-    def range_expression(self, children) -> Tuple[str, str]:
-        """Transform range_expression to (start, end) tuple of strings."""
-        start = self.transform(children[0])
-        end = self.transform(children[1])
-        return (start, end)
+    def range_expression(self, children) -> Tuple[Expr, Expr]:
+        """Transform range_expression to (start, end) tuple of expressions."""
+        return (children[0], children[1])
 
     def parameter_list(self, children) -> List[Tuple[str, Optional[str]]]:
         """Transform parameter_list to list of (name, type) tuples."""
-        params = []
-        for param in children[::2]:  # Skip COMMA
-            params.append(self.transform(param))
-        return params
+        return children
 
     def parameter(self, children) -> Tuple[str, Optional[str]]:
         """Transform parameter to (name, type) tuple."""
-        name = children[0]
-        type_ = (
-            self.transform(children[2]) if len(children) > 2 else None
-        )  # NAME : type
+        name, type_ = children  # NAME [":" type]; type_ is None when omitted
         return (name, type_)
 
     def return_type(self, children) -> str:
         """Transform return_type to type string."""
-        return self.transform(children[1])  # -> type
+        return children[1]  # -> type
 
-    def type(self, children) -> str:
+    @v_args(inline=True)
+    def type(self, name) -> str:
         """Transform type to string."""
-        return children[0]
+        return name
 
     def vector_type(self, children) -> str:
         """Transform vector_type to string like 'vec<16,i32>'."""
-        size = children[2]
-        elem_type = self.transform(children[4])
+        size, elem_type = children
         return f"vec<{size},{elem_type}>"
 
     @v_args(meta=True)
     def local_declaration(self, meta, children) -> LocalDecl:
         """Transform local_declaration to LocalDecl."""
-        name = children[1]
-        if children[2] == ":":
-            type_ = self.transform(children[3])
-            expr = self.transform(children[5])
-        else:
-            type_ = None
-            expr = self.transform(children[3])
+        # LET NAME [":" type] "=" expression SEMICOLON; anonymous tokens dropped
+        _, name, type_, expr, _ = children
         return LocalDecl(name=name, type_=type_, expr=expr, meta=meta)
 
     @v_args(meta=True)
     def return_statement(self, meta, children) -> Return:
         """Transform return_statement to Return."""
-        expr = self.transform(children[1]) if len(children) > 1 else None
+        expr = children[1] if len(children) > 1 else None
         return Return(expr=expr, meta=meta)
 
     @v_args(meta=True)
     def assignment(self, meta, children) -> Assign:
         """Transform assignment to Assign."""
-        target = children[0]
-        expr = self.transform(children[2])
+        # (NAME | MNEMONIC) "=" expression SEMICOLON; the "=" is dropped
+        target, expr, _ = children
         return Assign(target=target, expr=expr, meta=meta)
 
     @v_args(meta=True)
     def if_statement(self, meta, children) -> If:
         """Transform if_statement to If."""
-        condition = self.transform(children[1])
-        then_block = self.transform(children[2])
-        else_block = self.transform(children[4]) if len(children) > 3 else None
+        condition = children[1]
+        then_block = children[2]
+        else_block = children[4] if len(children) > 3 else None
         return If(
             condition=condition,
             then_block=then_block,
             else_block=else_block,
-            attrs=[],
+            attrs=(),
             meta=meta,
         )
 
@@ -199,55 +195,35 @@ class CRZTransformer(Transformer):
     def loop_statement(self, meta, children) -> Loop:
         """Transform loop_statement to Loop."""
         var = children[1]
-        range_expr = self.transform(children[3])
-        body = self.transform(children[4])
+        range_expr = children[3]
+        body = children[4]
         return Loop(
             var=var,
             start=range_expr[0],
             end=range_expr[1],
             body=body,
-            attrs=[],
+            attrs=(),
             meta=meta,
         )
 
     def operand_list(self, children) -> List[str]:
         """Transform operand_list to list of operand strings."""
-        return [self.transform(c) for c in children[::2]]
+        return children
 
-    def operand(self, children) -> str:
+    @v_args(inline=True)
+    def operand(self, value) -> str:
         """Transform operand to string."""
-        result = self.transform(children[0])
-        if isinstance(result, Token):
-            return result.value
-        else:
-            return str(result)
+        return value if isinstance(value, str) else str(value)
 
-    def immediate(self, children) -> str:
+    @v_args(inline=True)
+    def immediate(self, value) -> str:
         """Transform immediate to string."""
-        return children[0]  # already string
+        return value  # already string
 
-    def label_reference(self, children) -> str:
+    @v_args(inline=True)
+    def label_reference(self, name) -> str:
         """Transform label_reference to string."""
-        return children[0]
-
-    # Terminal transformers
-    def REGISTER(self, token) -> str:
-        return token.value
-
-    def NUMBER(self, token) -> str:
-        return token.value
-
-    def NAME(self, token) -> str:
-        return token.value
-
-    def STRING(self, token) -> str:
-        return token.value
-
-    def MNEMONIC(self, token) -> str:
-        return token.value
-
-    def CONDITION(self, token) -> str:
-        return token.value
+        return name
 
     @v_args(meta=True)
     def instruction(self, meta, children) -> Instr:
@@ -256,8 +232,14 @@ class CRZTransformer(Transformer):
         operands = (
             children[1] if len(children) > 1 and isinstance(children[1], list) else []
         )
-        raw = self.code[meta.start_pos : meta.end_pos]
-        return Instr(mnemonic=mnemonic, operands=operands, attrs=[], raw=raw, meta=meta)
+        return Instr(
+            mnemonic=mnemonic,
+            operands=operands,
+            attrs=(),
+            meta=meta,
+            raw_span=(meta.start_pos, meta.end_pos),
+            source=self.code,
+        )
 
     @v_args(meta=True)
     def label(self, meta, children) -> Label:
@@ -268,32 +250,9 @@ class CRZTransformer(Transformer):
     @v_args(meta=True)
     def function_declaration(self, meta, children) -> Function:
         """Transform function_declaration to Function dataclass."""
-        name = children[1]  # already string
-
-        # Parameters: after LPAREN, if parameter_list, transform it
-        has_params = (
-            len(children) > 3
-            and hasattr(children[3], "data")
-            and children[3].data == "parameter_list"
-        )
-        params = self.transform(children[3]) if has_params else []
-
-        # After RPAREN: index 4 if params, else 3
-        i = 4 if has_params else 3
-        i += 1  # Skip RPAREN
-
-        # Return type: optional
-        return_type = None
-        if (
-            i < len(children)
-            and hasattr(children[i], "data")
-            and children[i].data == "return_type"
-        ):
-            return_type = self.transform(children[i])
-            i += 1
-
-        # Body: the block
-        body = self.transform(children[i])
+        # FN NAME [parameter_list] [return_type] block; punctuation is dropped
+        _, name, params, return_type, body = children
+        params = params or []
 
         return Function(
             name=name, params=params, return_type=return_type, body=body, meta=meta
@@ -303,11 +262,11 @@ class CRZTransformer(Transformer):
     def statement(self, meta, children) -> Statement:
         """Transform statement, attaching attributes to the item."""
         if len(children) == 1:
-            return self.transform(children[0])
+            return children[0]
         attrs_list = children[0]
-        stmt = self.transform(children[1])
+        stmt = children[1]
         if hasattr(stmt, "attrs"):
-            stmt.attrs = attrs_list + getattr(stmt, "attrs", [])
+            stmt.attrs = attrs_list + getattr(stmt, "attrs", ())
         return stmt
 
     @v_args(meta=True)
@@ -318,12 +277,12 @@ class CRZTransformer(Transformer):
         attrs_list = children[0]
         decl = children[1]
         if hasattr(decl, "attrs"):
-            decl.attrs = attrs_list + getattr(decl, "attrs", [])
+            decl.attrs = attrs_list + getattr(decl, "attrs", ())
         return decl
 
     def block(self, children) -> List[Statement]:
         """Transform block to list of statements."""
-        return [self.transform(s) for s in children[1:-1]]  # skip LBRACE and RBRACE
+        return children
 
     def program(self, children) -> Program:
         """Transform program to Program dataclass."""
@@ -331,44 +290,79 @@ class CRZTransformer(Transformer):
         return Program(declarations=declarations)
 
 
-def create_parser() -> Lark:
-    """Create and return the Lark parser instance."""
-    grammar_path = Path(__file__).parent / "crz64i.lark"
-    grammar = grammar_path.read_text()
+# Terminal transformers, generated once at import. Identifiers, mnemonics and
+# numbers repeat heavily, so they are interned and later compares hit the
+# identity fast path. String literals are only unwrapped, via a C-level
+# attrgetter. Both are staticmethods, so Lark calls them without binding self.
+def _interned_value(token: Token) -> str:
+    return sys.intern(token.value)
+
+
+for _terminal in ("REGISTER", "NUMBER", "NAME", "MNEMONIC", "CONDITION"):
+    setattr(CRZTransformer, _terminal, staticmethod(_interned_value))
+CRZTransformer.STRING = staticmethod(operator.attrgetter("value"))
+del _terminal
+
+
+GRAMMAR_PATH = Path(__file__).parent / "crz64i.lark"
+
+
+@lru_cache(maxsize=None)
+def create_parser(grammar_path: Optional[str] = None) -> Lark:
+    """Create the Lark parser for a grammar file, built once per path.
+
+    The grammar is LALR(1) with a contextual lexer; the parse tables are
+    cached on disk by Lark and the instance is memoized and shared by every
+    parse() call.
+    """
+    grammar = Path(grammar_path or GRAMMAR_PATH).read_text()
     return Lark(
         grammar,
         start="program",
-        parser="earley",
-        lexer="dynamic",
+        parser="lalr",
+        lexer="contextual",
         propagate_positions=True,
-        cache=False,
+        cache=True,
     )
 
 
-def parse(code: str) -> Program:
+def _parse_with(parser: Lark, code: Union[str, bytes]) -> Program:
+    if isinstance(code, bytes):
+        # Lark's lexer only scans str, so decode exactly once here
+        code = code.decode("utf-8")
+    tree = parser.parse(code)
+    transformer = CRZTransformer(code)
+    # Transform one top-level declaration at a time. Transformer_InPlace keeps
+    # every subtree of its input alive until it returns, so this releases each
+    # declaration's Tree as soon as its AST exists instead of holding the
+    # whole program's parse tree next to the AST.
+    declarations = tree.children
+    for i, decl in enumerate(declarations):
+        declarations[i] = transformer.transform(decl)
+    return transformer.transform(tree)
+
+
+def parse(code: Union[str, bytes]) -> Program:
     """
     Parse CRZ64I code and return the AST.
 
     Args:
-        code: The CRZ64I source code as a string.
+        code: The CRZ64I source code as a string, or raw UTF-8 bytes.
 
     Returns:
         The AST as a Program dataclass.
     """
-    parser = create_parser()
-    tree = parser.parse(code)
-    transformer = CRZTransformer(code)
-    return transformer.transform(tree)
+    return _parse_with(create_parser(), code)
 
 
-def parse_text(code: str) -> Program:
+def parse_text(code: Union[str, bytes]) -> Program:
     """Alias for parse."""
     return parse(code)
 
 
 class Parser:
-    def __init__(self, lark_path: str) -> None:
-        pass
+    def __init__(self, lark_path: Optional[str] = None) -> None:
+        self.lark = create_parser(lark_path)
 
-    def parse(self, code: str) -> Program:
-        return parse(code)
+    def parse(self, code: Union[str, bytes]) -> Program:
+        return _parse_with(self.lark, code)
@@ -4,9 +4,150 @@ CRZ64I Optimization Passes
 Implements optimization passes including fusion patterns, reversible checks, and energy optimizations.
 """
 
-from typing import Any, Dict, List, Optional
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
 from .ast import Function, Instr, Statement, Attribute, Loop, If, Program
 
+__all__ = [
+    "apply_fusion_pass_safe",
+    "apply_reversible_pass",
+    "apply_energy_pass",
+    "fusion_pass",
+    "apply_fusion_to_ir",
+    "run_passes",
+]
+
+DEFAULT_FUSION_PATTERNS: Dict[str, List[str]] = {"load_add": ["LOAD", "ADD"]}
+
+
+# Passes are independent per function, but they are pure Python: threads only
+# help when the interpreter runs without a GIL (free-threaded builds).
+_PARALLEL_PASSES = not getattr(sys, "_is_gil_enabled", lambda: True)()
+_PARALLEL_MIN_DECLS = 4
+
+# One-byte ids for the IR mnemonics apply_fusion_to_ir looks for; every
+# other mnemonic packs to 0.
+_IR_OP_IDS: Dict[str, int] = {"LOAD": 1, "ADD": 2}
+_LOAD_ADD_IDS = bytes((_IR_OP_IDS["LOAD"], _IR_OP_IDS["ADD"]))
+
+# Statement kinds that own nested statement lists, and the fields holding them.
+_NESTED_BLOCKS: Dict[str, Tuple[str, ...]] = {
+    "loop": ("body",),
+    "if": ("then_block", "else_block"),
+}
+
+
+def _fuse_load_add(load: Instr, add: Instr) -> Optional[List[str]]:
+    """
+    Operands for FUSED_LOAD_ADD, or None when ADD does not read the loaded register.
+
+    Uses the short [dst, addr, imm] form when both instructions write the same
+    register and [load_dst, add_dst, addr, imm] otherwise, so the LOAD result
+    is never lost.
+    """
+    if len(load.operands) < 2 or len(add.operands) < 3:
+        return None
+    load_dst, mem_ref = load.operands[0], load.operands[1]
+    add_dst, add_src, imm = add.operands[0], add.operands[1], add.operands[2]
+    if add_src != load_dst:
+        return None
+    addr = (
+        mem_ref[1:-1] if mem_ref.startswith("[") and mem_ref.endswith("]") else mem_ref
+    )
+    if add_dst == load_dst:
+        return [load_dst, addr, imm]
+    return [load_dst, add_dst, addr, imm]
+
+
+def _concat_operands(first: Instr, second: Instr) -> List[str]:
+    """Generic fused operands: all of ``first``'s, then ``second``'s sources."""
+    return first.operands + second.operands[1:]
+
+
+# Pattern name -> operand builder; patterns without an entry concatenate.
+_FUSED_OPERANDS = {"load_add": _fuse_load_add}
+
+
+def apply_fusion_pass_safe(
+    func: Function, patterns: Optional[Dict[str, List[str]]] = None
+) -> Function:
+    """
+    Apply fusion optimization pass using configurable patterns.
+
+    Args:
+        func: The function AST to optimize.
+        patterns: Dict of fusion patterns, e.g., {"add_mul": ["ADD", "MUL"]}
+
+    Returns:
+        ``func`` itself. Blocks in which a pair was fused are replaced in
+        place on their owning Function/Loop/If node; when nothing fuses the
+        AST is not touched at all.
+    """
+    all_patterns = {**DEFAULT_FUSION_PATTERNS, **(patterns or {})}
+    # (first, second) mnemonic -> (fused mnemonic, operand builder)
+    pair_table = {
+        (ops[0], ops[1]): (
+            f"FUSED_{ops[0]}_{ops[1]}",
+            _FUSED_OPERANDS.get(name, _concat_operands),
+        )
+        for name, ops in all_patterns.items()
+        if len(ops) == 2
+    }
+
+    def fuse_pair(stmt1, stmt2) -> Optional[Instr]:
+        if stmt1.KIND != "instr" or stmt2.KIND != "instr":
+            return None
+        match = pair_table.get((stmt1.mnemonic, stmt2.mnemonic))
+        if match is None:
+            return None
+        fused_mnemonic, build_operands = match
+        fused_operands = build_operands(stmt1, stmt2)
+        if fused_operands is None:
+            return None
+        return Instr(
+            mnemonic=fused_mnemonic,
+            operands=fused_operands,
+            attrs=stmt1.attrs + stmt2.attrs,
+            raw=f"{stmt1.raw} {stmt2.raw}",
+        )
+
+    def fuse_body(body):
+        # Single forward pass, holding one statement of lookahead in prev
+        fused_body = []
+        it = iter(body)
+        prev = next(it, None)
+        while prev is not None:
+            cur = next(it, None)
+            if cur is None:
+                fused_body.append(prev)
+                break
+            fused_instr = fuse_pair(prev, cur)
+            if fused_instr is not None:
+                fused_body.append(fused_instr)
+                prev = next(it, None)
+            else:
+                fused_body.append(prev)
+                prev = cur
+        return fused_body
+
+    # Explicit work stack of (owner, block attribute) frames instead of
+    # recursing per nesting level; each block is fused independently.
+    work = [(func, "body")]
+    while work:
+        owner, attr = work.pop()
+        block = getattr(owner, attr)
+        for stmt in block:
+            nested = _NESTED_BLOCKS.get(stmt.KIND)
+            if nested is not None:
+                work.extend((stmt, name) for name in nested if getattr(stmt, name))
+        fused = fuse_body(block)
+        if len(fused) != len(block):
+            setattr(owner, attr, fused)
+    return func
+
 
 def apply_reversible_pass(func: Function) -> Function:
     """
@@ -18,9 +159,9 @@ def apply_reversible_pass(func: Function) -> Function:
         return func  # No change if not marked
 
     new_body = (
-        [Instr(mnemonic="SAVE_DELTA", operands=[], attrs=[], raw="SAVE_DELTA")]
+        [Instr(mnemonic="SAVE_DELTA", operands=[], attrs=(), raw="SAVE_DELTA")]
         + func.body
-        + [Instr(mnemonic="RESTORE_DELTA", operands=[], attrs=[], raw="RESTORE_DELTA")]
+        + [Instr(mnemonic="RESTORE_DELTA", operands=[], attrs=(), raw="RESTORE_DELTA")]
     )
 
     return Function(
@@ -37,16 +178,21 @@ def apply_energy_pass(func: Function, energy_config: Dict[str, float]) -> Functi
     """
     Apply energy optimization pass: Replace high-energy ops with low-energy alternatives,
     add thermal hints.
+
+    Thermal hints are added to the existing instructions' attrs. A new
+    Function is only built when an instruction was replaced; otherwise
+    ``func`` is returned as is.
     """
     # Example config: {"MUL": 10.0, "FMA": 8.0}  # FMA lower energy
+    # Hoist the config-only decisions out of the per-instruction loop
+    inf = float("inf")
+    replace_mul = energy_config.get("FMA", inf) < energy_config.get("MUL", inf)
+    high_energy = {m for m, e in energy_config.items() if e > 5.0}  # Threshold
     new_body = []
+    modified = False
     for stmt in func.body:
-        if isinstance(stmt, Instr):
-            if (
-                stmt.mnemonic == "MUL"
-                and "FMA" in energy_config
-                and energy_config["FMA"] < energy_config.get("MUL", float("inf"))
-            ):
+        if stmt.KIND == "instr":
+            if replace_mul and stmt.mnemonic == "MUL":
                 # Replace MUL a,b,c with FMA a,0,b,c if possible (a + b*c)
                 if len(stmt.operands) >= 3:
                     fma_operands = [
@@ -58,15 +204,17 @@ def apply_energy_pass(func: Function, energy_config: Dict[str, float]) -> Functi
                     stmt = Instr(
                         mnemonic="FMA",
                         operands=fma_operands,
-                        attrs=stmt.attrs + [Attribute(name="energy_opt")],
+                        attrs=stmt.attrs + (Attribute(name="energy_opt"),),
                         raw=f"FMA {stmt.raw}",
                     )
+                    modified = True
             # Add thermal hint if high energy
-            total_energy = sum(energy_config.get(op, 0) for op in [stmt.mnemonic])
-            if total_energy > 5.0:  # Threshold
-                stmt.attrs.append(Attribute(name="thermal_hint", value="cool"))
+            if stmt.mnemonic in high_energy:
+                stmt.attrs += (Attribute(name="thermal_hint", value="cool"),)
         new_body.append(stmt)
 
+    if not modified:
+        return func
     return Function(
         name=func.name,
         params=func.params,
@@ -90,39 +238,66 @@ def fusion_pass(program) -> List[Instr]:
     config: Dict[str, Any] = {}
     result = run_passes(program, ["fusion"], config)
     func = result.declarations[0]
-    return [stmt for stmt in func.body if isinstance(stmt, Instr)]
+    return [stmt for stmt in func.body if stmt.KIND == "instr"]
+
+
+def _find_fusion_sites(ids: bytes, pair: bytes) -> List[int]:
+    """
+    Start indices of every occurrence of the two-id ``pair`` in ``ids``.
+
+    ``ids`` is the packed one-byte-per-op buffer; the whole O(N) scan runs
+    inside ``bytes.find``, so Python only sees the matches.
+    """
+    sites = []
+    i = ids.find(pair)
+    while i != -1:
+        sites.append(i)
+        i = ids.find(pair, i + 1)
+    return sites
 
 
 def apply_fusion_to_ir(ops):
     """
     Apply fusion pass to IR ops list.
+
+    Mnemonics are packed into one byte each (see ``_IR_OP_IDS``) and the
+    LOAD; ADD candidates are located by ``_find_fusion_sites``; only the
+    candidates touch the op dicts. Runs between fusions are copied by
+    slice. The result is a new list; ``ops`` is left untouched.
     """
-    i = 0
-    while i < len(ops) - 1:
-        op1 = ops[i]
-        op2 = ops[i + 1]
-        if (
-            op1["op"] == "LOAD"
-            and op2["op"] == "ADD"
-            and op1["args"][0] == op2["args"][1]
-        ):
+    ids = bytes(map(_IR_OP_IDS.get, [op["op"] for op in ops], repeat(0)))
+    fused_ops = []
+    copied = 0  # ops[:copied] are already in fused_ops
+    for i in _find_fusion_sites(ids, _LOAD_ADD_IDS):
+        op1, op2 = ops[i], ops[i + 1]
+        if op1["args"][0] == op2["args"][1]:
             # Fuse LOAD rd, [addr] ; ADD rd2, rd, imm -> FUSED_LOAD_ADD load_dst, add_dst, addr, imm
-            load_dst = op1["args"][0]
-            add_dst = op2["args"][0]
-            addr = op1["args"][1]
-            imm = op2["args"][2]
-            fused_op = {
-                "op": "FUSED_LOAD_ADD",
-                "args": [load_dst, add_dst, addr, imm],
-                "fused": True,
-                "energy_est": 1.0,
-            }
-            ops[i] = fused_op
-            del ops[i + 1]
-            # don't increment i
-        else:
-            i += 1
-    return ops
+            fused_ops.extend(ops[copied:i])
+            fused_ops.append(
+                {
+                    "op": "FUSED_LOAD_ADD",
+                    "args": [
+                        op1["args"][0],
+                        op2["args"][0],
+                        op1["args"][1],
+                        op2["args"][2],
+                    ],
+                    "fused": True,
+                    "energy_est": 1.0,
+                }
+            )
+            copied = i + 2
+    fused_ops.extend(ops[copied:])
+    return fused_ops
+
+
+def _run_pipeline(decl, pipeline):
+    """Run the resolved passes over one declaration."""
+    # Passes operate on functions; top-level instructions and labels pass through
+    if decl.KIND == "function":
+        for run_pass in pipeline:
+            decl = run_pass(decl)
+    return decl
 
 
 def run_passes(program, passes, config=None):
@@ -139,25 +314,24 @@ def run_passes(program, passes, config=None):
     """
     if config is None:
         config: Dict[str, Any] = {}
-    optimized = []
-    for func in program.declarations:
-        for pass_name in passes:
-            if pass_name == "fusion":
-                patterns = config.get("fusion_patterns", {})
-                if patterns is None:
-                    patterns = {}
-                # No apply_fusion_pass_safe exists; apply fusion logic directly if needed
-                # If patterns are needed, pass to a fusion function here. For now, just skip patterns.
-                # If fusion_pass is meant to operate on the whole program, but here we want per-function, just continue.
-                # If you want to apply fusion to each function, you could implement it here.
-                # For now, just leave func unchanged or implement fusion logic as needed.
-                pass  # TODO: Implement per-function fusion if needed
-            elif pass_name == "reversible_emulation":
-                func = apply_reversible_pass(func)
-            elif pass_name == "energy_profile":
-                energy_table = config.get("energy_table", {})
-                if energy_table is None:
-                    energy_table = {}
-                func = apply_energy_pass(func, energy_table)
-        optimized.append(func)
+    fusion_patterns = config.get("fusion_patterns") or {}
+    energy_table = config.get("energy_table") or {}
+    handlers = {
+        "fusion": lambda f: apply_fusion_pass_safe(f, fusion_patterns),
+        "reversible_emulation": apply_reversible_pass,
+        "energy_profile": lambda f: apply_energy_pass(f, energy_table),
+    }
+    # Resolve the pipeline once; unknown pass names are ignored
+    pipeline = [handlers[name] for name in passes if name in handlers]
+    if not pipeline:
+        # nothing to run: same shallow copy the general path would return
+        return program.__class__(declarations=list(program.declarations))
+    declarations = program.declarations
+    if _PARALLEL_PASSES and len(declarations) >= _PARALLEL_MIN_DECLS:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            optimized = list(
+                pool.map(lambda decl: _run_pipeline(decl, pipeline), declarations)
+            )
+    else:
+        optimized = [_run_pipeline(decl, pipeline) for decl in declarations]
     return program.__class__(declarations=optimized)
@@ -5,9 +5,76 @@ Performs semantic checks on the CRZ64I AST, including attribute placement valida
 realtime constraints, and reversible dataflow checks.
 """
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Sequence, Set
 from rich.console import Console
-from .ast import Program, Function, Instr, If, Loop, Statement, Attribute, LocalDecl
+from .ast import (
+    Program,
+    Function,
+    Instr,
+    If,
+    Loop,
+    Statement,
+    Attribute,
+    LocalDecl,
+    Ref,
+)
+
+# Attributes allowed in each placement context
+_ALLOWED_ATTRS = {
+    "function": frozenset(
+        ["fusion", "reversible", "realtime", "power", "thermal_hint"]
+    ),
+    "instruction": frozenset(["fusion", "no_erase"]),
+    "if": frozenset(["reversible", "realtime"]),
+    "loop": frozenset(["reversible", "realtime"]),
+}
+
+# Ops not allowed in realtime code (dynamic allocation, DMA), with their issue
+_REALTIME_VIOLATIONS = {
+    mnemonic: f"Realtime violation: {mnemonic} inside realtime function."
+    for mnemonic in ("LOAD", "STORE", "VLOAD", "VSTORE", "DMA_START")
+}
+
+# Ops writing their first operand, which reversible code must save first
+_WRITE_OPS = frozenset(
+    [
+        "ADD",
+        "SUB",
+        "MUL",
+        "DIV",
+        "AND",
+        "OR",
+        "XOR",
+        "SHL",
+        "SHR",
+        "POPCNT",
+        "LOAD",
+        "STORE",
+        "ATOMIC_INC",
+        "VADD",
+        "VSUB",
+        "VMUL",
+        "VDOT32",
+        "VSHL",
+        "VSHR",
+        "VFMA",
+        "VREDUCE_SUM",
+        "FADD",
+        "FSUB",
+        "FMUL",
+        "FMA",
+        "REV_ADD",
+        "REV_SWAP",
+        "CRC32",
+        "HASH_INIT",
+        "HASH_UPDATE",
+        "HASH_FINAL",
+        "PROFILE_START",
+        "PROFILE_STOP",
+    ]
+)
+
+_REGISTERS = frozenset(f"R{i}" for i in range(32))
 
 
 class SemanticAnalyzer:
@@ -113,23 +180,18 @@ class SemanticAnalyzer:
                 if in_reversible:
                     saved_targets.add(stmt.name)
                     # Also save the assigned variable if it's a register
-                    if stmt.expr in [f"R{i}" for i in range(32)]:
-                        saved_targets.add(stmt.expr)
+                    if isinstance(stmt.expr, Ref) and stmt.expr.name in _REGISTERS:
+                        saved_targets.add(stmt.expr.name)
 
     def check_attrs(
         self,
-        attrs: List[Attribute],
+        attrs: Sequence[Attribute],
         context: str,
         meta: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Check if attributes are allowed in context."""
         issues = []
-        allowed = {
-            "function": ["fusion", "reversible", "realtime", "power", "thermal_hint"],
-            "instruction": ["fusion", "no_erase"],
-            "if": ["reversible", "realtime"],
-            "loop": ["reversible", "realtime"],
-        }.get(context, [])
+        allowed = _ALLOWED_ATTRS.get(context, ())
         for attr in attrs:
             if attr.name not in allowed:
                 line = meta.get("line", 0) if meta else 0
@@ -149,62 +211,17 @@ class SemanticAnalyzer:
 
     def check_realtime_instr(self, instr: Instr):
         """Check realtime constraints on instruction."""
-        # Dynamic allocation ops
-        dynamic_ops = ["LOAD", "STORE", "VLOAD", "VSTORE"]
-        if instr.mnemonic in dynamic_ops:
-            self.log_issue(
-                f"Realtime violation: {instr.mnemonic} inside realtime function.",
-                instr.meta,
-            )
-        # DMA_START
-        if instr.mnemonic == "DMA_START":
-            self.log_issue(
-                "Realtime violation: DMA_START inside realtime function.",
-                instr.meta,
-            )
+        message = _REALTIME_VIOLATIONS.get(instr.mnemonic)
+        if message is not None:
+            self.log_issue(message, instr.meta)
 
     def check_reversible_write(
         self, instr: Instr, saved_targets: Set[str], func_name: str
     ):
         """Check reversible write."""
-        write_ops = [
-            "ADD",
-            "SUB",
-            "MUL",
-            "DIV",
-            "AND",
-            "OR",
-            "XOR",
-            "SHL",
-            "SHR",
-            "POPCNT",
-            "LOAD",
-            "STORE",
-            "ATOMIC_INC",
-            "VADD",
-            "VSUB",
-            "VMUL",
-            "VDOT32",
-            "VSHL",
-            "VSHR",
-            "VFMA",
-            "VREDUCE_SUM",
-            "FADD",
-            "FSUB",
-            "FMUL",
-            "FMA",
-            "REV_ADD",
-            "REV_SWAP",
-            "CRC32",
-            "HASH_INIT",
-            "HASH_UPDATE",
-            "HASH_FINAL",
-            "PROFILE_START",
-            "PROFILE_STOP",
-        ]
-        if instr.mnemonic in write_ops and instr.operands:
+        if instr.mnemonic in _WRITE_OPS and instr.operands:
             target = instr.operands[0]
-            has_no_erase = any(attr.name == "no_erase" for attr in (instr.attrs or []))
+            has_no_erase = instr.get_attr("no_erase") is not None
             if target not in saved_targets and not has_no_erase:
                 self.log_issue(
                     f"Write to {target} in function {func_name} without prior let tmp = {target} or #[no_erase]",
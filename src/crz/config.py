@@ -1,65 +1,130 @@
 """CRZ64I configuration loader."""
 
+import functools
 import json
-from typing import Any, Dict
+import os
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
 
-def load_config(file_path: str = "config.json") -> Dict[str, Any]:
-    """Load configuration from config.json or return defaults."""
+
+# Default config
+_DEFAULTS: Dict[str, Any] = {
+    "energy": {
+        "ADD": 4.5e-08,  # Updated with measured energy per op in Joules
+        "SUB": 6e-08,
+        "MUL": 1.2e-6,
+        "DIV": 3.0e-6,
+        "LOAD": 4.0000000000000003e-07,  # Updated with measured per load
+        "STORE": 4.0000000000000003e-07,
+        "JMP": 1e-8,
+        "BR_IF": 2.5e-7,
+        "LABEL": 0.0,
+        "BRANCH": 3.0e-7,
+        "FUSED_LOAD_ADD": 4.1e-07,  # LOAD + ADD energy
+    },
+    "thermal": {
+        "base_temp": 25.0,
+        "heat_factor": 0.1,
+        "heat_capacity": 100.0,  # J/K, adjust based on hardware
+        "thermal_resistance": 0.5,  # K/W, adjust based on hardware
+    },
+    # real-time cycle cost model: cycles per opcode (sim cycles)
+    "cycles": {
+        "ADD": 4.5e-08,
+        "SUB": 1,
+        "MUL": 3,
+        "DIV": 10,
+        "LOAD": 4.0000000000000003e-07,
+        "STORE": 4.0000000000000003e-07,
+        "JMP": 1,
+        "BR_IF": 2,
+        "LABEL": 0,
+        "BRANCH": 1,
+        "FUSED_LOAD_ADD": 2,  # cheaper than LOAD(3)+ADD(1)=4
+    },
+    "cores": 4,
+    "energy_unit": 1.0,  # Updated to Joules
+    "sim_clock_hz": 343180684.9654721,  # Measured from calibrate_cycles.py
+    "memory_limit": None,  # optional hard cap, or None for no limit
+}
+
+
+def _freeze(value):
+    """Read-only view of a parsed config (nested dicts become mapping proxies)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+_FROZEN_DEFAULTS: Mapping[str, Any] = _freeze(_DEFAULTS)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(path: str, mtime_ns: int) -> Mapping[str, Any]:
+    """Parse ``path`` once per (path, mtime); editing the file invalidates it."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return _freeze(orjson.loads(data))
+    return _freeze(json.loads(data))
+
+
+def load_config(file_path: str = "config.json") -> Mapping[str, Any]:
+    """
+    Load configuration from config.json or return defaults.
+
+    The result is cached and shared between callers, so it is returned as a
+    read-only mapping; copy it with ``dict()`` before changing it.
+    """
+    path = os.path.abspath(file_path)
     try:
-        with open(file_path, "r") as f:
-            return json.load(f)
+        mtime_ns = os.stat(path).st_mtime_ns
+        return _load_cached(path, mtime_ns)
     except FileNotFoundError:
-        # Default config
-        return {
-            "energy": {
-                "ADD": 4.5e-08,  # Updated with measured energy per op in Joules
-                "SUB": 6e-08,
-                "MUL": 1.2e-6,
-                "DIV": 3.0e-6,
-                "LOAD": 4.0000000000000003e-07,  # Updated with measured per load
-                "STORE": 4.0000000000000003e-07,
-                "JMP": 1e-8,
-                "BR_IF": 2.5e-7,
-                "LABEL": 0.0,
-                "BRANCH": 3.0e-7,
-                "FUSED_LOAD_ADD": 4.1e-07,  # LOAD + ADD energy
-            },
-            "thermal": {
-                "base_temp": 25.0,
-                "heat_factor": 0.1,
-                "heat_capacity": 100.0,  # J/K, adjust based on hardware
-                "thermal_resistance": 0.5,  # K/W, adjust based on hardware
-            },
-            # real-time cycle cost model: cycles per opcode (sim cycles)
-            "cycles": {
-                "ADD": 4.5e-08,
-                "SUB": 1,
-                "MUL": 3,
-                "DIV": 10,
-                "LOAD": 4.0000000000000003e-07,
-                "STORE": 4.0000000000000003e-07,
-                "JMP": 1,
-                "BR_IF": 2,
-                "LABEL": 0,
-                "BRANCH": 1,
-                "FUSED_LOAD_ADD": 2,  # cheaper than LOAD(3)+ADD(1)=4
-            },
-            "cores": 4,
-            "energy_unit": 1.0,  # Updated to Joules
-            "sim_clock_hz": 343180684.9654721,  # Measured from calibrate_cycles.py
-            "memory_limit": None,  # optional hard cap, or None for no limit
-        }
+        return _FROZEN_DEFAULTS
+
+
+class ThermalParams(NamedTuple):
+    """Thermal model constants, read once from a config's ``thermal`` section."""
+
+    base_temp: float
+    heat_capacity: float  # J/K
+    thermal_resistance: float  # K/W
+
+    @classmethod
+    def from_mapping(cls, thermal: Mapping[str, Any]) -> "ThermalParams":
+        return cls(
+            thermal.get("base_temp", 25.0),
+            thermal.get("heat_capacity", 100.0),
+            thermal.get("thermal_resistance", 0.5),
+        )
 
 
 class Config:
     """Configuration class."""
 
-    def __init__(self, config_dict=None) -> None:
+    __slots__ = (
+        "energy",
+        "thermal",
+        "thermal_params",
+        "cycles",
+        "cores",
+        "energy_unit",
+        "sim_clock_hz",
+        "memory_limit",
+    )
+
+    def __init__(self, config_dict: Optional[Mapping[str, Any]] = None) -> None:
         if config_dict is None:
             config_dict = load_config("config.json")
         self.energy = config_dict["energy"]
         self.thermal = config_dict["thermal"]
+        self.thermal_params = ThermalParams.from_mapping(self.thermal)
         self.cycles = config_dict.get("cycles", {})
         self.cores = config_dict["cores"]
         self.energy_unit = config_dict.get("energy_unit", 1.0)
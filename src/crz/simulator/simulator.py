@@ -5,14 +5,151 @@ CRZ64I Simulator
 Executes CRZ64I ops, tracks energy, thermal hotspots.
 """
 
+import functools
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 from ..config import load_config, Config
 from crz.compiler.parser import parse_text
 from crz.compiler.codegen_sim import codegen
 from ..compiler.ast import Instr
 
+# Mnemonic -> Simulator method implementing it
+_OP_HANDLERS: Dict[str, str] = {
+    "ADD": "_op_add",
+    "SUB": "_op_sub",
+    "MUL": "_op_mul",
+    "DIV": "_op_div",
+    "LOAD": "_op_load",
+    "STORE": "_op_store",
+    "JMP": "_op_jmp",
+    "JZ": "_op_jz",
+    "JNZ": "_op_jnz",
+    "BR_IF": "_op_br_if",
+    "LABEL": "_op_label",
+    "CALL": "_op_call",
+    "FUSED_ADD_MUL": "_op_fused_add_mul",
+    "FUSED_LOAD_ADD": "_op_fused_load_add",
+    "SAVE_DELTA": "_op_save_delta",
+    "RESTORE_DELTA": "_op_restore_delta",
+    "WRITE_IO": "_op_write_io",
+    "DMA_START": "_op_dma_start",
+}
+
+# The register file of a freshly built or reset simulator
+_REGISTER_NAMES = tuple(f"r{i}" for i in range(32))
+
+# Ops whose label operand _link_jumps can resolve to a position
+_JUMP_OPS = frozenset(["JMP", "JZ", "JNZ", "BR_IF", "CALL"])
+
+# Ops heating the "alu" thermal component; everything else is "control"
+_ALU_OPS = frozenset(["ADD", "SUB", "MUL", "DIV", "FUSED_LOAD_ADD"])
+
+# Ops that update the Z/N flags from their destination register
+_FLAG_OPS = frozenset(
+    ["ADD", "SUB", "MUL", "DIV", "LOAD", "FUSED_ADD_MUL", "FUSED_LOAD_ADD"]
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_operand(s: str) -> Optional[Tuple[Optional[str], int]]:
+    """
+    Pre-parse a source operand for ``Simulator.get_val``.
+
+    Returns ``(register, imm)`` such that the operand's value is
+    ``regs.get(register, 0) + imm`` (``register`` is None for a plain
+    literal), or None for sums of several registers, which are left to
+    ``get_val``. Programs reuse a small set of operand spellings, so results
+    are cached.
+    """
+    register = None
+    imm = 0
+    for part in s.split("+"):
+        part = part.strip()
+        if part.isdigit() or (part.startswith("-") and part[1:].isdigit()):
+            imm += int(part)
+        elif register is None:
+            register = part
+        else:
+            return None
+    return register, imm
+
+
+def _resolve_binary(operands) -> Optional[tuple]:
+    if len(operands) != 3:
+        return None
+    rd, rs1, rs2 = operands
+    src1, src2 = _parse_operand(rs1), _parse_operand(rs2)
+    if src1 is None or src2 is None:
+        return None
+    return rd, src1, src2
+
+
+def _resolve_fused_add_mul(operands) -> Optional[tuple]:
+    if len(operands) != 4:
+        return None
+    rd, rs1, rs2, rs3 = operands
+    srcs = (_parse_operand(rs1), _parse_operand(rs2), _parse_operand(rs3))
+    if None in srcs:
+        return None
+    return (rd,) + srcs
+
+
+def _resolve_memory(operands) -> Optional[tuple]:
+    if len(operands) != 2:
+        return None
+    reg, mem_ref = operands
+    addr = _parse_operand(mem_ref[1:-1])
+    if addr is None:
+        return None
+    return reg, addr
+
+
+def _resolve_fused_load_add(operands) -> Optional[tuple]:
+    if len(operands) == 4:
+        load_dst, add_dst, mem_ref, imm = operands
+    elif len(operands) == 3:
+        add_dst, mem_ref, imm = operands
+        load_dst = add_dst
+    else:
+        return None
+    if isinstance(mem_ref, str) and mem_ref.startswith("[") and mem_ref.endswith("]"):
+        mem_ref = mem_ref[1:-1]
+    addr = _parse_operand(mem_ref)
+    try:
+        src = (None, int(imm))
+    except Exception:
+        src = _parse_operand(imm)
+    if addr is None or src is None:
+        return None
+    return load_dst, add_dst, addr, src
+
+
+def _resolve_br_if(operands) -> Optional[tuple]:
+    if len(operands) != 4 or operands[0] != "LT":
+        return None
+    condition, var, end, label = operands
+    lhs, rhs = _parse_operand(var), _parse_operand(end)
+    if lhs is None or rhs is None:
+        return None
+    return condition, lhs, rhs, label
+
+
+# Mnemonic -> (operand resolver, Simulator method taking the resolved
+# operands). _precompile uses these instead of the _OP_HANDLERS entry when the
+# resolver accepts an op's operands.
+_RESOLVED_OPS: Dict[str, Tuple[Callable, str]] = {
+    "ADD": (_resolve_binary, "_op_add_resolved"),
+    "SUB": (_resolve_binary, "_op_sub_resolved"),
+    "MUL": (_resolve_binary, "_op_mul_resolved"),
+    "DIV": (_resolve_binary, "_op_div_resolved"),
+    "FUSED_ADD_MUL": (_resolve_fused_add_mul, "_op_fused_add_mul_resolved"),
+    "LOAD": (_resolve_memory, "_op_load_resolved"),
+    "STORE": (_resolve_memory, "_op_store_resolved"),
+    "FUSED_LOAD_ADD": (_resolve_fused_load_add, "_op_fused_load_add_resolved"),
+    "BR_IF": (_resolve_br_if, "_op_br_if_resolved"),
+}
+
 
 def compile_file(path: str) -> List[Dict[str, Any]]:
     with open(path, "r") as f:
@@ -24,13 +161,38 @@ def compile_file(path: str) -> List[Dict[str, Any]]:
 class Simulator:
     """CRZ64I Simulator."""
 
+    __slots__ = (
+        "config",
+        "regs",
+        "memory",
+        "pc",
+        "flags",
+        "energy_used",
+        "thermal_map",
+        "_op_counts",
+        "labels",
+        "backup_regs",
+        "sandbox_allow_io",
+        "sandbox_allow_dma",
+        "cycles",
+        "wall_clock_s",
+        "_energy_table",
+        "_cycles_table",
+        "_energy_unit",
+        "_sim_clock_hz",
+        "_thermal_params",
+        "_op_info_cache",
+        "_mem_limit",
+        "_check_bounds",
+    )
+
     def __init__(self, config=None) -> None:
         if config is None:
             config = Config()
-        elif isinstance(config, dict):
+        elif isinstance(config, Mapping):
             config = Config(config)
         self.config = config
-        self.regs: Dict[str, int] = {f"r{i}": 0 for i in range(32)}
+        self.regs: Dict[str, int] = dict.fromkeys(_REGISTER_NAMES, 0)
         self.memory: List[int] = []
         self.pc = 0
         self.flags = {"Z": 0, "N": 0}
@@ -43,28 +205,83 @@ class Simulator:
         self.sandbox_allow_dma = False
         self.cycles = 0
         self.wall_clock_s: float = 0.0
+        # config values read per op, bound once (see _op_info)
+        self._energy_table = config.energy
+        self._cycles_table = config.cycles
+        self._energy_unit = getattr(config, "energy_unit", 1.0)
+        self._sim_clock_hz = getattr(config, "sim_clock_hz", 1.0)
+        self._thermal_params = config.thermal_params
+        self._op_info_cache: Dict[str, tuple] = {}
+        # memory bounds check specialized for the configured limit
+        self._mem_limit = getattr(config, "memory_limit", None)
+        if self._mem_limit is None:
+            self._check_bounds = self._bounds_unlimited
+        else:
+            self._check_bounds = self._bounds_limited
+
+    def reset(self) -> None:
+        """
+        Return the machine to its initial state, keeping the config bindings.
+
+        Containers are cleared in place rather than rebuilt, so references
+        taken earlier (e.g. ``get_energy_report()["thermal_hotspots"]``) see
+        the reset state. The sandbox permissions are settings, not state, and
+        are kept.
+        """
+        regs = self.regs
+        regs.clear()
+        regs.update(dict.fromkeys(_REGISTER_NAMES, 0))
+        self.memory.clear()
+        self.pc = 0
+        self.flags["Z"] = 0
+        self.flags["N"] = 0
+        self.energy_used = 0.0
+        self.thermal_map.clear()
+        self._op_counts.clear()
+        self.labels.clear()
+        self.backup_regs.clear()
+        self.cycles = 0
+        self.wall_clock_s = 0.0
 
     def check_memory_bounds(self, addr: int) -> None:
         """Check and auto-grow memory bounds."""
+        self._check_bounds(addr)
+
+    def _bounds_unlimited(self, addr: int) -> None:
+        """``check_memory_bounds`` without a ``memory_limit``."""
         # reject negative addresses
         if addr < 0:
             raise ValueError(f"Memory access out of bounds: negative address {addr}")
 
-        # optional max guard if config has memory_limit
-        mem_limit = getattr(self.config, "memory_limit", None)
-        if mem_limit is not None and addr >= mem_limit:
+        # auto-grow: extend underlying memory list to include addr
+        # (list storage already over-allocates geometrically, so repeated
+        # growth is amortized O(1) per cell)
+        memory = self.memory
+        needed = addr - len(memory) + 1
+        if needed == 1:
+            # sequential fill, the common pattern: no temporary list
+            memory.append(0)
+        elif needed > 1:
+            memory.extend([0] * needed)
+
+    def _bounds_limited(self, addr: int) -> None:
+        """``check_memory_bounds`` with the config's ``memory_limit`` guard."""
+        if addr < 0 or addr >= self._mem_limit:
+            if addr < 0:
+                raise ValueError(
+                    f"Memory access out of bounds: negative address {addr}"
+                )
             raise ValueError(
-                f"Memory access out of bounds: requested {addr} >= memory_limit {mem_limit}"
+                f"Memory access out of bounds: requested {addr} >= memory_limit {self._mem_limit}"
             )
-
-        # auto-grow: extend underlying memory list to include addr
-        if addr >= len(self.memory):
-            needed = addr - len(self.memory) + 1
-            # keep growth deterministic and efficient
-            self.memory.extend([0] * needed)
+        self._bounds_unlimited(addr)
 
     def get_val(self, s: str) -> int:
         """Get value from register or literal."""
+        # Plain register names are the common case: one dict probe, no parsing.
+        val = self.regs.get(s)
+        if val is not None:
+            return val
         s = s.strip()
         if "+" in s:
             left, right = s.split("+", 1)
@@ -75,23 +292,54 @@ class Simulator:
 
     def execute_op(self, mnemonic: str, operands: List[str]) -> None:
         """Execute a single operation."""
+        self._execute_decoded(*self._decode(mnemonic, operands))
+
+    def _decode(self, mnemonic: str, operands: List[str]) -> tuple:
+        """Decoded form of one op: ``(mnemonic, operands) + _op_info(mnemonic)``."""
+        return (mnemonic, operands) + self._op_info(mnemonic)
+
+    def _op_info(self, mnemonic: str) -> tuple:
+        """
+        Resolve everything about a mnemonic that does not depend on machine state.
+
+        Returns ``(handler, energy_joule, cost_cycles, dt, sets_flags)``: the
+        handler from the dispatch table, the per-op energy and cycle cost from
+        the config and the cycle duration at ``sim_clock_hz``. The result only
+        depends on the config values bound in ``__init__`` and is cached per
+        mnemonic.
+        """
+        op_info = self._op_info_cache.get(mnemonic)
+        if op_info is not None:
+            return op_info
         # --- compute energy for this opcode (per-op energy from config) ---
-        energy = self.config.energy.get(mnemonic, 0.0)
+        energy = self._energy_table.get(mnemonic, 0.0)
+        # energy in config is per-op in Joules (energy_unit should be 1.0 for J)
+        energy_joule = energy * self._energy_unit
 
         # --- compute cycles cost for this opcode (real-time cost model) ---
-        cost_cycles = self.config.cycles.get(mnemonic, 1)
+        cost_cycles = self._cycles_table.get(mnemonic, 1)
+
+        # convert cycles -> real time dt using sim_clock_hz
+        sim_clock_hz = self._sim_clock_hz
+        dt = cost_cycles / float(sim_clock_hz) if sim_clock_hz > 0 else 0.0
 
+        op_info = self._op_info_cache[mnemonic] = (
+            self._handlers.get(mnemonic),
+            energy_joule,
+            cost_cycles,
+            dt,
+            mnemonic in _FLAG_OPS,
+        )
+        return op_info
+
+    def _execute_decoded(
+        self, mnemonic, operands, handler, energy_joule, cost_cycles, dt, sets_flags
+    ) -> None:
+        """Execute an op produced by ``_decode``."""
         # increment simulator cycle counter by opcode cost
         # (simulator stores total cycles executed)
         self.cycles += cost_cycles
 
-        # convert cycles -> real time dt using sim_clock_hz
-        sim_clock_hz = getattr(self.config, "sim_clock_hz", 1.0)
-        dt = cost_cycles / float(sim_clock_hz) if sim_clock_hz > 0 else 0.0
-
-        # --- energy accounting ---
-        # energy in config is per-op in Joules (energy_unit should be 1.0 for J)
-        energy_joule = energy * getattr(self.config, "energy_unit", 1.0)
         # accumulate energy (total Joules)
         self.energy_used += energy_joule
 
@@ -99,173 +347,252 @@ class Simulator:
         self.wall_clock_s += dt
 
         # update thermal model using duration dt and energy_joule
-        # uses update_thermal_advanced which expects energy in Joules and dt computed there if needed
-        if hasattr(self, "update_thermal_advanced"):
-            # call with mnemonic and energy_joule (function will compute dt from cycles if needed)
-            try:
-                self.update_thermal_advanced(
-                    mnemonic, energy_joule, dt=dt, cycles=cost_cycles
-                )
-            except TypeError:
-                # backward compatibility: if update_thermal_advanced signature differs, call older form
-                self.update_thermal_advanced(mnemonic, energy_joule)
+        try:
+            self.update_thermal_advanced(
+                mnemonic, energy_joule, dt=dt, cycles=cost_cycles
+            )
+        except TypeError:
+            # backward compatibility: if update_thermal_advanced signature differs, call older form
+            self.update_thermal_advanced(mnemonic, energy_joule)
 
         self._op_counts[mnemonic] = self._op_counts.get(mnemonic, 0) + 1
 
-        if mnemonic == "ADD":
-            rd, rs1, rs2 = operands
-            self.regs[rd] = self.get_val(rs1) + self.get_val(rs2)
-        elif mnemonic == "SUB":
-            rd, rs1, rs2 = operands
-            self.regs[rd] = self.get_val(rs1) - self.get_val(rs2)
-        elif mnemonic == "MUL":
-            rd, rs1, rs2 = operands
-            self.regs[rd] = self.get_val(rs1) * self.get_val(rs2)
-        elif mnemonic == "DIV":
-            rd, rs1, rs2 = operands
-            rs2_val = self.get_val(rs2)
-            if rs2_val == 0:
-                self.regs[rd] = 0  # Handle division by zero
-            else:
-                self.regs[rd] = self.get_val(rs1) // rs2_val
-        elif mnemonic == "LOAD":
-            rd, mem_ref = operands
-            addr_str = mem_ref[1:-1]  # Remove [ ]
-            addr = self.get_val(addr_str)
-            self.check_memory_bounds(addr)
-            self.regs[rd] = self.memory[addr]
-        elif mnemonic == "STORE":
-            rs, mem_ref = operands
-            addr_str = mem_ref[1:-1]
-            addr = self.get_val(addr_str)
-            self.check_memory_bounds(addr)
-            self.memory[addr] = self.regs[rs]
-        elif mnemonic == "JMP":
-            label = operands[0]
-            if label.isdigit():
-                self.pc = int(label) - 1
-            else:
-                self.pc = self.labels[label] - 1
-        elif mnemonic == "JZ":
-            if self.flags["Z"]:
-                label = operands[0]
-                if label.isdigit():
-                    self.pc = int(label) - 1
-                else:
-                    self.pc = self.labels[label] - 1
-        elif mnemonic == "JNZ":
-            if not self.flags["Z"]:
-                label = operands[0]
-                if label.isdigit():
-                    self.pc = int(label) - 1
-                else:
-                    self.pc = self.labels[label] - 1
-        elif mnemonic == "BR_IF":
-            if len(operands) == 2:
-                # Old format: flag, label
-                flag, label = operands
-                if self.flags[flag]:
-                    if label.isdigit():
-                        self.pc = int(label) - 1
-                    else:
-                        self.pc = self.labels[label] - 1
-            elif len(operands) == 4:
-                # New format: condition, var, end, label
-                condition, var, end, label = operands
-                if condition == "LT":
-                    if self.get_val(var) < self.get_val(end):
-                        if label.isdigit():
-                            self.pc = int(label) - 1
-                        else:
-                            self.pc = self.labels[label] - 1
-                # Add other conditions if needed
-        elif mnemonic == "LABEL":
-            self.labels[operands[0]] = self.pc
-        elif mnemonic == "CALL":
-            # Simple call, no stack
-            self.pc = self.labels[operands[0]] - 1
-        elif mnemonic == "RET":
-            # Simple ret
-            pass
-        elif mnemonic == "FUSED_ADD_MUL":
-            # Fused add mul: rd = rs1 + rs2 * rs3
-            rd, rs1, rs2, rs3 = operands
-            self.regs[rd] = self.get_val(rs1) + self.get_val(rs2) * self.get_val(rs3)
-        elif mnemonic == "FUSED_LOAD_ADD":
-            # supported operand formats:
-            #  - new: [load_dst, add_dst, mem_ref, imm_or_reg]
-            #  - old/fallback: [add_dst, mem_ref, imm_or_reg]  (back-compat)
-            if len(operands) == 4:
-                load_dst, add_dst, mem_ref, imm = operands
-            elif len(operands) == 3:
-                # legacy: no explicit load_dst -> assume the ADD source register
-                # but legacy loses original load_dst; to preserve semantics best
-                # we treat add_dst as both load_dst and add_dst (least bad fallback)
-                add_dst, mem_ref, imm = operands
-                load_dst = add_dst
-            else:
-                raise ValueError(f"FUSED_LOAD_ADD: unexpected operands {operands}")
-
-            # normalize mem_ref: accept "[a + i]" or "a + i"
-            if (
-                isinstance(mem_ref, str)
-                and mem_ref.startswith("[")
-                and mem_ref.endswith("]")
-            ):
-                addr_str = mem_ref[1:-1]
-            else:
-                addr_str = mem_ref
-
-            addr = self.get_val(addr_str)
-            self.check_memory_bounds(addr)
-
-            # load value
-            val = self.memory[addr]
-            # write load destination (preserve semantics of LOAD)
-            self.regs[load_dst] = val
-
-            # resolve immediate/reg for add
-            try:
-                imm_val = int(imm)
-            except Exception:
-                imm_val = self.get_val(imm)
+        if handler is not None:
+            handler(self, operands)
 
-            # compute add result and write
-            self.regs[add_dst] = val + imm_val
-
-            # account for STORE energy/cycles handled elsewhere (this op only does load+add)
-            # update op counts:
-            self._op_counts["FUSED_LOAD_ADD"] = (
-                self._op_counts.get("FUSED_LOAD_ADD", 0) + 1
-            )
-            # energy, cycles, thermal already handled earlier in execute_op (top of function)
-        elif mnemonic == "SAVE_DELTA":
-            self.backup_regs = self.regs.copy()
-        elif mnemonic == "RESTORE_DELTA":
-            self.regs = self.backup_regs.copy()
-        elif mnemonic == "WRITE_IO":
-            if not self.sandbox_allow_io:
-                raise PermissionError("WRITE_IO not allowed in sandbox")
-            # Simulate IO write
-            pass
-        elif mnemonic == "DMA_START":
-            if not self.sandbox_allow_dma:
-                raise PermissionError("DMA_START not allowed in sandbox")
-            # Simulate DMA start
-            pass
         # Update flags
-        if mnemonic in [
-            "ADD",
-            "SUB",
-            "MUL",
-            "DIV",
-            "LOAD",
-            "FUSED_ADD_MUL",
-            "FUSED_LOAD_ADD",
-        ]:
-            rd = operands[0]
-            self.flags["Z"] = 1 if self.regs[rd] == 0 else 0
-            self.flags["N"] = 1 if self.regs[rd] < 0 else 0
+        if sets_flags:
+            val = self.regs[operands[0]]
+            self.flags["Z"] = 1 if val == 0 else 0
+            self.flags["N"] = 1 if val < 0 else 0
+
+    def _jump(self, label: str) -> None:
+        if label.isdigit():
+            self.pc = int(label) - 1
+        else:
+            self.pc = self.labels[label] - 1
+
+    def _op_add(self, operands: List[str]) -> None:
+        rd, rs1, rs2 = operands
+        self.regs[rd] = self.get_val(rs1) + self.get_val(rs2)
+
+    def _op_sub(self, operands: List[str]) -> None:
+        rd, rs1, rs2 = operands
+        self.regs[rd] = self.get_val(rs1) - self.get_val(rs2)
+
+    def _op_mul(self, operands: List[str]) -> None:
+        rd, rs1, rs2 = operands
+        self.regs[rd] = self.get_val(rs1) * self.get_val(rs2)
+
+    def _op_div(self, operands: List[str]) -> None:
+        rd, rs1, rs2 = operands
+        rs2_val = self.get_val(rs2)
+        if rs2_val == 0:
+            self.regs[rd] = 0  # Handle division by zero
+        else:
+            self.regs[rd] = self.get_val(rs1) // rs2_val
+
+    def _op_load(self, operands: List[str]) -> None:
+        rd, mem_ref = operands
+        addr_str = mem_ref[1:-1]  # Remove [ ]
+        addr = self.get_val(addr_str)
+        self._check_bounds(addr)
+        self.regs[rd] = self.memory[addr]
+
+    def _op_store(self, operands: List[str]) -> None:
+        rs, mem_ref = operands
+        addr_str = mem_ref[1:-1]
+        addr = self.get_val(addr_str)
+        self._check_bounds(addr)
+        self.memory[addr] = self.regs[rs]
+
+    def _op_jmp(self, operands: List[str]) -> None:
+        self._jump(operands[0])
+
+    def _op_jz(self, operands: List[str]) -> None:
+        if self.flags["Z"]:
+            self._jump(operands[0])
+
+    def _op_jnz(self, operands: List[str]) -> None:
+        if not self.flags["Z"]:
+            self._jump(operands[0])
+
+    def _op_br_if(self, operands: List[str]) -> None:
+        if len(operands) == 2:
+            # Old format: flag, label
+            flag, label = operands
+            if self.flags[flag]:
+                self._jump(label)
+        elif len(operands) == 4:
+            # New format: condition, var, end, label
+            condition, var, end, label = operands
+            if condition == "LT":
+                if self.get_val(var) < self.get_val(end):
+                    self._jump(label)
+            # Add other conditions if needed
+
+    def _op_label(self, operands: List[str]) -> None:
+        self.labels[operands[0]] = self.pc
+
+    def _op_call(self, operands: List[str]) -> None:
+        # Simple call, no stack
+        self.pc = self.labels[operands[0]] - 1
+
+    def _op_fused_add_mul(self, operands: List[str]) -> None:
+        # Fused add mul: rd = rs1 + rs2 * rs3
+        rd, rs1, rs2, rs3 = operands
+        self.regs[rd] = self.get_val(rs1) + self.get_val(rs2) * self.get_val(rs3)
+
+    def _op_fused_load_add(self, operands: List[str]) -> None:
+        # supported operand formats:
+        #  - new: [load_dst, add_dst, mem_ref, imm_or_reg]
+        #  - old/fallback: [add_dst, mem_ref, imm_or_reg]  (back-compat)
+        if len(operands) == 4:
+            load_dst, add_dst, mem_ref, imm = operands
+        elif len(operands) == 3:
+            # legacy: no explicit load_dst -> assume the ADD source register
+            # but legacy loses original load_dst; to preserve semantics best
+            # we treat add_dst as both load_dst and add_dst (least bad fallback)
+            add_dst, mem_ref, imm = operands
+            load_dst = add_dst
+        else:
+            raise ValueError(f"FUSED_LOAD_ADD: unexpected operands {operands}")
+
+        # normalize mem_ref: accept "[a + i]" or "a + i"
+        if (
+            isinstance(mem_ref, str)
+            and mem_ref.startswith("[")
+            and mem_ref.endswith("]")
+        ):
+            addr_str = mem_ref[1:-1]
+        else:
+            addr_str = mem_ref
+
+        addr = self.get_val(addr_str)
+        self._check_bounds(addr)
+
+        # load value
+        val = self.memory[addr]
+        # write load destination (preserve semantics of LOAD)
+        self.regs[load_dst] = val
+
+        # resolve immediate/reg for add
+        try:
+            imm_val = int(imm)
+        except Exception:
+            imm_val = self.get_val(imm)
+
+        # compute add result and write
+        self.regs[add_dst] = val + imm_val
+
+        # account for STORE energy/cycles handled elsewhere (this op only does load+add)
+        # update op counts:
+        self._op_counts["FUSED_LOAD_ADD"] = self._op_counts.get("FUSED_LOAD_ADD", 0) + 1
+        # energy, cycles, thermal already handled in _execute_decoded
+
+    def _op_save_delta(self, operands: List[str]) -> None:
+        self.backup_regs = self.regs.copy()
+
+    def _op_restore_delta(self, operands: List[str]) -> None:
+        self.regs = self.backup_regs.copy()
+
+    def _op_write_io(self, operands: List[str]) -> None:
+        if not self.sandbox_allow_io:
+            raise PermissionError("WRITE_IO not allowed in sandbox")
+        # Simulate IO write
+
+    def _op_dma_start(self, operands: List[str]) -> None:
+        if not self.sandbox_allow_dma:
+            raise PermissionError("DMA_START not allowed in sandbox")
+        # Simulate DMA start
+
+    # Handlers for operands pre-parsed by _RESOLVED_OPS: every source operand
+    # is a (register, imm) pair worth regs.get(register, 0) + imm.
+
+    def _op_add_resolved(self, operands: tuple) -> None:
+        rd, (a, a_imm), (b, b_imm) = operands
+        regs = self.regs
+        regs[rd] = (regs.get(a, 0) + a_imm) + (regs.get(b, 0) + b_imm)
+
+    def _op_sub_resolved(self, operands: tuple) -> None:
+        rd, (a, a_imm), (b, b_imm) = operands
+        regs = self.regs
+        regs[rd] = (regs.get(a, 0) + a_imm) - (regs.get(b, 0) + b_imm)
+
+    def _op_mul_resolved(self, operands: tuple) -> None:
+        rd, (a, a_imm), (b, b_imm) = operands
+        regs = self.regs
+        regs[rd] = (regs.get(a, 0) + a_imm) * (regs.get(b, 0) + b_imm)
+
+    def _op_div_resolved(self, operands: tuple) -> None:
+        rd, (a, a_imm), (b, b_imm) = operands
+        regs = self.regs
+        divisor = regs.get(b, 0) + b_imm
+        if divisor == 0:
+            regs[rd] = 0  # Handle division by zero
+        else:
+            regs[rd] = (regs.get(a, 0) + a_imm) // divisor
+
+    def _op_fused_add_mul_resolved(self, operands: tuple) -> None:
+        rd, (a, a_imm), (b, b_imm), (c, c_imm) = operands
+        regs = self.regs
+        regs[rd] = (regs.get(a, 0) + a_imm) + (regs.get(b, 0) + b_imm) * (
+            regs.get(c, 0) + c_imm
+        )
+
+    def _op_load_resolved(self, operands: tuple) -> None:
+        rd, (base, offset) = operands
+        addr = self.regs.get(base, 0) + offset
+        self._check_bounds(addr)
+        self.regs[rd] = self.memory[addr]
+
+    def _op_store_resolved(self, operands: tuple) -> None:
+        rs, (base, offset) = operands
+        addr = self.regs.get(base, 0) + offset
+        self._check_bounds(addr)
+        self.memory[addr] = self.regs[rs]
+
+    def _op_fused_load_add_resolved(self, operands: tuple) -> None:
+        load_dst, add_dst, (base, offset), (src, imm) = operands
+        addr = self.regs.get(base, 0) + offset
+        self._check_bounds(addr)
+        val = self.memory[addr]
+        regs = self.regs
+        regs[load_dst] = val
+        regs[add_dst] = val + (regs.get(src, 0) + imm)
+        # same double count as _op_fused_load_add
+        self._op_counts["FUSED_LOAD_ADD"] = self._op_counts.get("FUSED_LOAD_ADD", 0) + 1
+
+    def _op_br_if_resolved(self, operands: tuple) -> None:
+        _, (a, a_imm), (b, b_imm), label = operands
+        regs = self.regs
+        if regs.get(a, 0) + a_imm < regs.get(b, 0) + b_imm:
+            self._jump(label)
+
+    # Handlers for jumps linked by _link_jumps: the label operand is replaced
+    # by the pc value the jump sets (target position - 1).
+
+    def _op_goto_linked(self, operands: tuple) -> None:
+        self.pc = operands[0]
+
+    def _op_jz_linked(self, operands: tuple) -> None:
+        if self.flags["Z"]:
+            self.pc = operands[0]
+
+    def _op_jnz_linked(self, operands: tuple) -> None:
+        if not self.flags["Z"]:
+            self.pc = operands[0]
+
+    def _op_br_flag_linked(self, operands: tuple) -> None:
+        flag, target = operands
+        if self.flags[flag]:
+            self.pc = target
+
+    def _op_br_lt_linked(self, operands: tuple) -> None:
+        (a, a_imm), (b, b_imm), target = operands
+        regs = self.regs
+        if regs.get(a, 0) + a_imm < regs.get(b, 0) + b_imm:
+            self.pc = target
 
     def update_thermal_advanced(
         self,
@@ -278,20 +605,12 @@ class Simulator:
         energy_joule: energy consumed in this opcode (Joules).
         dt: duration in seconds (optional). If not provided, will attempt to compute using cycles and config.sim_clock_hz.
         """
-        component = (
-            "alu"
-            if mnemonic in ["ADD", "SUB", "MUL", "DIV", "FUSED_LOAD_ADD"]
-            else "control"
-        )
-        current_temp = self.thermal_map.get(
-            component, self.config.thermal.get("base_temp", 25.0)
-        )
-        ambient_temp = self.config.thermal.get("base_temp", 25.0)
-        heat_capacity = self.config.thermal.get("heat_capacity", 100.0)  # J/K
-        thermal_resistance = self.config.thermal.get("thermal_resistance", 0.5)  # K/W
+        component = "alu" if mnemonic in _ALU_OPS else "control"
+        ambient_temp, heat_capacity, thermal_resistance = self._thermal_params
+        current_temp = self.thermal_map.get(component, ambient_temp)
         if dt is None:
             if cycles is not None:
-                sim_clock_hz = getattr(self.config, "sim_clock_hz", 1.0)
+                sim_clock_hz = self._sim_clock_hz
                 dt = cycles / float(sim_clock_hz) if sim_clock_hz > 0 else 0.0
             else:
                 # fallback small dt
@@ -317,29 +636,175 @@ class Simulator:
     def get_flag(self, flag: str) -> bool:
         return self.flags[flag] == 1
 
+    def _precompile(self, ops) -> List[Optional[tuple]]:
+        """
+        Decode ``ops`` once (see ``_decode``); unknown op types decode to None.
+
+        The mnemonic-dependent part is resolved once per distinct mnemonic and
+        shared by every op using it. Operands of the ops in ``_RESOLVED_OPS``
+        are parsed here too, so executing them never goes through
+        ``get_val``'s string handling.
+        """
+        resolved_handlers = self._resolved_handlers
+        # identical ops (same mnemonic and operand spellings) share one entry
+        seen: Dict[tuple, tuple] = {}
+        decoded: List[Optional[tuple]] = []
+        for op in ops:
+            if hasattr(op, "mnemonic"):
+                mnemonic, operands = op.mnemonic, op.operands
+            elif isinstance(op, dict):
+                mnemonic, operands = op["op"], op["args"]
+            else:
+                decoded.append(None)
+                continue
+            key = (mnemonic, *operands)
+            entry = seen.get(key)
+            if entry is None:
+                op_info = self._op_info(mnemonic)
+                entry = (mnemonic, operands) + op_info
+                resolved = resolved_handlers.get(mnemonic)
+                if resolved is not None:
+                    resolve, handler = resolved
+                    args = resolve(operands)
+                    if args is not None:
+                        entry = (mnemonic, args, handler) + op_info[1:]
+                seen[key] = entry
+            decoded.append(entry)
+        return decoded
+
+    def _jump_target(self, label: str) -> Optional[int]:
+        """pc value ``_jump(label)`` would set, or None if the label is unknown."""
+        if label.isdigit():
+            return int(label) - 1
+        index = self.labels.get(label)
+        return None if index is None else index - 1
+
+    def _link_jumps(self, decoded: List[Optional[tuple]]) -> None:
+        """
+        Replace jump labels in ``decoded`` with their target positions.
+
+        Only done when every LABEL name is unique: executing a LABEL re-points
+        its name at the current position, so with duplicates a jump's target
+        depends on which copy ran last. Jumps to unknown labels keep the
+        by-name handler (and its KeyError when taken).
+
+        With unique names the pre-pass has already recorded every LABEL, so
+        their handler is dropped; they are still accounted for (op counts,
+        thermal component) like any other op.
+        """
+        label_count = sum(
+            1 for entry in decoded if entry is not None and entry[0] == "LABEL"
+        )
+        if label_count != len(self.labels):
+            return
+        for i, entry in enumerate(decoded):
+            if entry is None:
+                continue
+            if entry[0] == "LABEL":
+                decoded[i] = entry[:2] + (None,) + entry[3:]
+                continue
+            if entry[0] not in _JUMP_OPS:
+                continue
+            mnemonic, operands, handler = entry[:3]
+            linked = None
+            if mnemonic in ("JMP", "JZ", "JNZ"):
+                target = self._jump_target(operands[0])
+                if target is not None:
+                    linked = (target,), _LINKED_JUMPS[mnemonic]
+            elif mnemonic == "CALL":
+                index = self.labels.get(operands[0])
+                if index is not None:
+                    linked = (index - 1,), Simulator._op_goto_linked
+            elif handler is Simulator._op_br_if_resolved:
+                _, lhs, rhs, label = operands
+                target = self._jump_target(label)
+                if target is not None:
+                    linked = (lhs, rhs, target), Simulator._op_br_lt_linked
+            elif len(operands) == 2:
+                flag, label = operands
+                target = self._jump_target(label)
+                if target is not None:
+                    linked = (flag, target), Simulator._op_br_flag_linked
+            if linked is not None:
+                decoded[i] = (mnemonic,) + linked + entry[3:]
+
     def run_program(self, ops) -> None:
         """Run a list of ops."""
+        decoded = self._precompile(ops)
         # Pre-build labels
         self.labels = {}
-        for i, op in enumerate(ops):
-            if hasattr(op, "mnemonic") and op.mnemonic == "LABEL":
-                self.labels[op.operands[0]] = i
-            elif isinstance(op, dict) and op.get("op") == "LABEL":
-                self.labels[op["args"][0]] = i
-        while self.pc < len(ops):
-            op = ops[self.pc]
-            if hasattr(op, "mnemonic"):
-                mnemonic = op.mnemonic
-                operands = op.operands
-            elif isinstance(op, dict):
-                mnemonic = op["op"]
-                operands = op["args"]
-            else:
-                print(f"Unknown op type: {type(op)}")
+        for i, entry in enumerate(decoded):
+            if entry is not None and entry[0] == "LABEL":
+                self.labels[entry[1][0]] = i
+        self._link_jumps(decoded)
+        # _execute_decoded inlined, with the per-run invariants bound to locals
+        update_thermal = self.update_thermal_advanced
+        # The stock thermal model is inlined with its constants read once per
+        # run; a subclass overriding update_thermal_advanced is still called.
+        inline_thermal = (
+            type(self).update_thermal_advanced is Simulator.update_thermal_advanced
+        )
+        thermal_map = self.thermal_map
+        ambient_temp, heat_capacity, thermal_resistance = self._thermal_params
+        flags = self.flags
+        n = len(decoded)
+        # per-position execution counts, folded into _op_counts at the end
+        executed = [0] * n
+        try:
+            while self.pc < n:
+                pc = self.pc
+                entry = decoded[pc]
+                if entry is None:
+                    print(f"Unknown op type: {type(ops[pc])}")
+                    self.pc = pc + 1
+                    continue
+                (
+                    mnemonic,
+                    operands,
+                    handler,
+                    energy_joule,
+                    cost_cycles,
+                    dt,
+                    sets_flags,
+                ) = entry
+                self.cycles += cost_cycles
+                self.energy_used += energy_joule
+                self.wall_clock_s += dt
+                if not inline_thermal:
+                    try:
+                        update_thermal(
+                            mnemonic, energy_joule, dt=dt, cycles=cost_cycles
+                        )
+                    except TypeError:
+                        # backward compatibility: if update_thermal_advanced signature differs, call older form
+                        update_thermal(mnemonic, energy_joule)
+                elif dt > 0.0:
+                    component = "alu" if mnemonic in _ALU_OPS else "control"
+                    current_temp = thermal_map.get(component, ambient_temp)
+                    thermal_map[component] = current_temp + (
+                        energy_joule / dt
+                        - (current_temp - ambient_temp) / thermal_resistance
+                    ) * (dt / heat_capacity)
+                else:
+                    # zero-duration op (e.g. LABEL): temperature is unchanged,
+                    # the component only needs to be tracked
+                    component = "alu" if mnemonic in _ALU_OPS else "control"
+                    if component not in thermal_map:
+                        thermal_map[component] = ambient_temp + 0.0
+                executed[pc] += 1
+                if handler is not None:
+                    handler(self, operands)
+                if sets_flags:
+                    val = self.regs[operands[0]]
+                    flags["Z"] = 1 if val == 0 else 0
+                    flags["N"] = 1 if val < 0 else 0
                 self.pc += 1
-                continue
-            self.execute_op(mnemonic, operands)
-            self.pc += 1
+        finally:
+            op_counts = self._op_counts
+            for entry, count in zip(decoded, executed):
+                if count:
+                    mnemonic = entry[0]
+                    op_counts[mnemonic] = op_counts.get(mnemonic, 0) + count
 
     def run(self, ops: List[Dict[str, Any]], metrics: bool = True) -> Optional[tuple]:
         """Run ops and optionally return metrics."""
@@ -364,3 +829,20 @@ class Simulator:
             "regs": dict(self.regs),
             "memory": {str(i): v for i, v in enumerate(self.memory)},
         }
+
+
+# Dispatch tables, built once for the class: mnemonic -> function called as
+# handler(sim, operands). Mnemonics without an entry (RET, unknown ops) are
+# accounted for but have no effect on machine state.
+Simulator._handlers = {
+    mnemonic: getattr(Simulator, name) for mnemonic, name in _OP_HANDLERS.items()
+}
+Simulator._resolved_handlers = {
+    mnemonic: (resolve, getattr(Simulator, name))
+    for mnemonic, (resolve, name) in _RESOLVED_OPS.items()
+}
+_LINKED_JUMPS = {
+    "JMP": Simulator._op_goto_linked,
+    "JZ": Simulator._op_jz_linked,
+    "JNZ": Simulator._op_jnz_linked,
+}
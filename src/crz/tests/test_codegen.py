@@ -117,3 +117,25 @@ fn main() {
     program = parse(code)
     riscv = codegen_riscv(program)
     assert "VADD" in riscv  # Placeholder
+
+
+def test_compile_simulator_code():
+    """Test simulator code is built as one Python AST, compiled or unparsed."""
+    from types import CodeType
+    from crz.compiler.codegen_sim import compile_simulator_code
+    from crz.compiler.codegen_sim import generate_simulator_code
+
+    code = """
+fn main() {
+    ADD R0, R1, R2;
+    for i in 0..(n + 1) * 2 {
+        MUL R3, R3, R4;
+    }
+}
+"""
+    program = parse(code)
+    assert isinstance(compile_simulator_code(program.declarations), CodeType)
+    source = generate_simulator_code(program.declarations)
+    assert "simulator.add('R0', 'R1', 'R2')" in source
+    # loop bounds are lowered from the Expr nodes, not re-parsed text
+    assert "for i in range(0, (n + 1) * 2):" in source
@@ -113,3 +113,27 @@ def test_reversible_write_after_let():
     errors = analyzer.analyze()
     assert len(errors) > 0
     assert "Write to R0" in errors[0]["message"]
+
+
+def test_analyze_path_div_flags():
+    """Test per-block DIV flags drive analyze_path."""
+    from crz.compiler.dataflow import build_cfg
+
+    program = parse("""
+fn main() {
+    ADD R0, R1, R2;
+}
+""")
+    cfg = build_cfg(program.declarations[0])
+    assert not cfg.any_div
+    assert cfg.analyze_path([0]) == []
+
+    program = parse("""
+fn main() {
+    DIV R0, 0, R2;
+}
+""")
+    cfg = build_cfg(program.declarations[0])
+    assert cfg.any_div
+    diagnostics = cfg.analyze_path([0])
+    assert diagnostics[0]["message"] == "Potential division by zero"
@@ -5,7 +5,7 @@ Edge case tests for CRZ64I components.
 import pytest
 from crz.compiler.parser import parse
 from crz.simulator.simulator import Simulator
-from crz.config import load_config
+from crz.config import Config, ThermalParams, load_config
 
 
 def test_div_zero():
@@ -51,3 +51,50 @@ def test_path_bounding():
     cfg = CFG(blocks)
     paths = cfg.enumerate_paths(max_paths=1)
     assert len(paths) <= 1
+
+
+def test_load_config_is_cached_until_file_changes(tmp_path):
+    """Test load_config reuses the parsed config until the file's mtime changes."""
+    import os
+
+    path = tmp_path / "config.json"
+    path.write_text('{"energy": {}, "thermal": {}, "cores": 2}')
+    first = load_config(str(path))
+    assert load_config(str(path)) is first
+    with pytest.raises(TypeError):
+        first["cores"] = 8
+
+    path.write_text('{"energy": {}, "thermal": {}, "cores": 8}')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_config(str(path))["cores"] == 8
+
+
+def test_memory_grows_to_cover_address():
+    """Test memory auto-grows by one cell or by a gap, zero-filled."""
+    sim = Simulator()
+    sim.check_memory_bounds(0)
+    assert sim.memory == [0]
+    sim.check_memory_bounds(1)
+    sim.check_memory_bounds(4)
+    sim.check_memory_bounds(2)
+    assert sim.memory == [0] * 5
+
+
+def test_memory_limit_guard():
+    """Test a configured memory_limit rejects addresses at or past it."""
+    config = dict(load_config(), memory_limit=4)
+    sim = Simulator(config)
+    sim.check_memory_bounds(3)
+    assert sim.memory == [0] * 4
+    with pytest.raises(ValueError, match="memory_limit 4"):
+        sim.check_memory_bounds(4)
+    with pytest.raises(ValueError, match="negative address"):
+        sim.check_memory_bounds(-1)
+
+
+def test_config_thermal_params():
+    """Test thermal constants are parsed once, with the model's defaults."""
+    config = Config(dict(load_config(), thermal={"base_temp": 30.0}))
+    assert config.thermal_params == ThermalParams(30.0, 100.0, 0.5)
+    assert Simulator(config)._thermal_params is config.thermal_params
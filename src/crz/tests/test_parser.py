@@ -157,6 +157,37 @@ def test_parse_function_call():
     # Assume parsed correctly
 
 
+def test_parse_long_expression_chain():
+    """Test that a long operand chain is rendered left to right."""
+    terms = [f"a{i}" for i in range(64)]
+    code = f"""fn test() {{
+    let x = {' + '.join(terms)};
+}}"""
+    ast = parse(code)
+    decl = ast.declarations[0].body[0]
+    assert str(decl.expr) == " + ".join(terms)
+
+
+def test_parse_deeply_nested_blocks():
+    """Test deeply nested if/loop bodies parse without hitting the recursion limit."""
+    depth = 2000
+    code = (
+        "fn test() {\n"
+        + "for i in 0..2 {\nif R1 {\n" * depth
+        + "ADD R1, R1, 1;\n"
+        + "}\n}\n" * depth
+        + "}"
+    )
+    ast = parse(code)
+    stmt = ast.declarations[0].body[0]
+    for _ in range(depth):
+        assert stmt.KIND == "loop"
+        stmt = stmt.body[0]
+        assert stmt.KIND == "if"
+        stmt = stmt.then_block[0]
+    assert stmt.mnemonic == "ADD"
+
+
 def test_parse_binary_expression():
     """Test binary expressions."""
     code = """fn test() {
@@ -214,3 +245,73 @@ def test_ast_json_shape():
         if "mnemonic" in item:
             assert "operands" in item
             assert "raw" in item
+
+
+def test_parse_bytes_input():
+    """Test that raw UTF-8 bytes parse the same as text."""
+    code = """fn test() {
+    ADD R1, R0, 1;
+}"""
+    assert parse(code.encode("utf-8")).to_json() == parse(code).to_json()
+
+
+def test_instruction_raw_is_sliced_lazily():
+    """Test that Instr.raw is materialized from its source span on access."""
+    code = """fn test() {
+    ADD R1, R0, 1;
+}"""
+    instr = parse(code).declarations[0].body[0]
+    assert instr.raw == code[instr.raw_span[0] : instr.raw_span[1]]
+    assert instr.raw == "ADD R1, R0, 1;"
+
+
+def test_parse_interns_repeated_tokens():
+    """Test that repeated mnemonics and registers share one string object."""
+    code = """fn test() {
+    ADD R1, R0, 1;
+    ADD R1, R1, 1;
+}"""
+    first, second = parse(code).declarations[0].body
+    assert first.mnemonic is second.mnemonic
+    assert first.operands[0] is second.operands[0]
+
+
+def test_parse_structured_expression():
+    """Test that expressions parse into Expr nodes that render back to source."""
+    from crz.compiler.ast import BinOp, Call, Group, Ref
+
+    code = """fn test() {
+    let x = (a + b) * f(c, 2);
+}"""
+    expr = parse(code).declarations[0].body[0].expr
+    assert expr == BinOp(
+        op="*",
+        lhs=Group(expr=BinOp(op="+", lhs=Ref(name="a"), rhs=Ref(name="b"))),
+        rhs=Call(name="f", args=[Ref(name="c"), Ref(name="2")]),
+    )
+    assert str(expr) == "(a + b) * f(c, 2)"
+
+
+def test_parse_assignment_expression():
+    """Test that an assignment keeps its expression, not the semicolon."""
+    from crz.compiler.ast import BinOp, Ref
+
+    code = """fn test() {
+    x = R1 + 1;
+}"""
+    stmt = parse(code).declarations[0].body[0]
+    assert stmt.KIND == "assign"
+    assert stmt.target == "x"
+    assert isinstance(stmt.expr, BinOp)
+    assert stmt.expr == BinOp(op="+", lhs=Ref(name="R1"), rhs=Ref(name="1"))
+
+
+def test_unary_expression_builds_expr_node():
+    """Test unary expressions become UnaryOp nodes rather than strings."""
+    from lark import Token
+    from crz.compiler.ast import Ref, UnaryOp
+    from crz.compiler.parser import CRZTransformer
+
+    expr = CRZTransformer("").unary_expression([Token("MINUS", "-"), Ref(name="x")])
+    assert expr == UnaryOp(op="-", operand=Ref(name="x"))
+    assert str(expr) == "(-x)"
@@ -3,7 +3,7 @@ Tests for CRZ64I Passes
 """
 
 import pytest
-from crz.compiler.parser import parse
+from crz.tests.utils import parse_cached as parse
 from crz.compiler.passes import run_passes
 from crz.compiler.ast import Instr
 
@@ -27,6 +27,56 @@ fn main() {
     assert fused.operands == ["R0", "R1", "5"]
 
 
+def test_fusion_pass_keeps_load_destination():
+    """Test LOAD; ADD fusion keeps both destinations and skips unrelated ADDs."""
+    code = """
+fn main() {
+    LOAD R0, [R1];
+    ADD R2, R0, 5;
+    LOAD R3, [R1];
+    ADD R4, R0, 1;
+}
+"""
+    program = parse(code)
+    result = run_passes(program, ["fusion"], {})
+    func = result.declarations[0]
+    assert [stmt.mnemonic for stmt in func.body] == ["FUSED_LOAD_ADD", "LOAD", "ADD"]
+    assert func.body[0].operands == ["R0", "R2", "R1", "5"]
+
+
+def test_fusion_pass_custom_pattern():
+    """Test that configured fusion patterns are applied alongside the defaults."""
+    code = """
+fn main() {
+    ADD R1, R2, R3;
+    MUL R1, R1, R4;
+    ADD R5, R6, R7;
+}
+"""
+    program = parse(code)
+    config = {"fusion_patterns": {"add_mul": ["ADD", "MUL"]}}
+    result = run_passes(program, ["fusion"], config)
+    func = result.declarations[0]
+    assert [stmt.mnemonic for stmt in func.body] == ["FUSED_ADD_MUL", "ADD"]
+    assert func.body[0].operands == ["R1", "R2", "R3", "R1", "R4"]
+
+
+def test_fusion_pass_without_matches_returns_same_function():
+    """Test the fusion pass leaves an unfusable function object untouched."""
+    from crz.compiler.passes import apply_fusion_pass_safe
+
+    program = parse("""
+fn main() {
+    ADD R0, R1, R2;
+    SUB R3, R0, R1;
+}
+""")
+    func = program.declarations[0]
+    body = func.body
+    assert apply_fusion_pass_safe(func, {}) is func
+    assert func.body is body
+
+
 def test_reversible_emulation_pass():
     """Test insertion of SAVE_DELTA/RESTORE_DELTA."""
     code = """
@@ -56,7 +106,7 @@ fn main() {
     result = run_passes(program, ["energy_profile"], config)
     func = result.declarations[0]
     add = func.body[0]
-    energy_attr = next((attr for attr in add.attrs if attr.name == "energy"), None)
+    energy_attr = add.get_attr("energy")
     assert energy_attr.value == "1.5"
 
 
@@ -75,7 +125,7 @@ fn main() {
     assert len(func.body) == 1
     fused = func.body[0]
     assert fused.mnemonic == "FUSED_LOAD_ADD"
-    energy_attr = next((attr for attr in fused.attrs if attr.name == "energy"), None)
+    energy_attr = fused.get_attr("energy")
     assert energy_attr.value == "3.0"
 
 
@@ -123,11 +173,121 @@ fn main() {
     config = {"energy_table": {"ADD": {"energy": 1.0}, "MUL": {"energy": 5.0}}}
     result = run_passes(program, ["energy_profile"], config)
     func = result.declarations[0]
-    add_energy = next(
-        (attr for attr in func.body[0].attrs if attr.name == "energy"), None
-    )
-    mul_energy = next(
-        (attr for attr in func.body[1].attrs if attr.name == "energy"), None
-    )
+    add_energy = func.body[0].get_attr("energy")
+    mul_energy = func.body[1].get_attr("energy")
     assert add_energy.value == "1.0"
     assert mul_energy.value == "5.0"
+
+
+def test_apply_fusion_to_ir():
+    """Test IR-level LOAD; ADD fusion only fires on a matching register."""
+    from crz.compiler.passes import apply_fusion_to_ir
+
+    ops = [
+        {"op": "LOAD", "args": ["r1", "[r0]"]},
+        {"op": "ADD", "args": ["r2", "r1", "5"]},
+        {"op": "LOAD", "args": ["r3", "[r0]"]},
+        {"op": "ADD", "args": ["r4", "r1", "5"]},
+    ]
+    fused = apply_fusion_to_ir(ops)
+    assert [op["op"] for op in fused] == ["FUSED_LOAD_ADD", "LOAD", "ADD"]
+    assert fused[0]["args"] == ["r1", "r2", "[r0]", "5"]
+    assert fused[1] is ops[2]
+
+
+def test_fusion_pass_deeply_nested_loops():
+    """Test fusion reaches nested loop bodies without recursing per level."""
+    from crz.compiler.ast import Function, Loop
+    from crz.compiler.passes import apply_fusion_pass_safe
+
+    def load_add():
+        return [
+            Instr(mnemonic="LOAD", operands=["R0", "[R1]"], attrs=(), raw=""),
+            Instr(mnemonic="ADD", operands=["R0", "R0", "1"], attrs=(), raw=""),
+        ]
+
+    body = load_add()
+    for _ in range(2000):
+        body = [Loop(var="i", start="0", end="2", body=body)] + load_add()
+    func = Function(name="main", params=[], return_type=None, body=body)
+
+    result = apply_fusion_pass_safe(func, {})
+    assert result is func
+    node = result
+    for _ in range(2000):
+        assert [stmt.KIND for stmt in node.body] == ["loop", "instr"]
+        assert node.body[1].mnemonic == "FUSED_LOAD_ADD"
+        node = node.body[0]
+    assert [stmt.mnemonic for stmt in node.body] == ["FUSED_LOAD_ADD"]
+
+
+def test_energy_pass_replaces_mul_and_adds_thermal_hint():
+    """Test MUL -> FMA rewrite and thermal hints from a flat energy table."""
+    from crz.compiler.passes import apply_energy_pass
+
+    program = parse("""
+fn main() {
+    MUL R0, R1, R2;
+    ADD R3, R0, R1;
+}
+""")
+    func = apply_energy_pass(
+        program.declarations[0], {"MUL": 10.0, "FMA": 8.0, "ADD": 1.0}
+    )
+    fma, add = func.body
+    assert fma.mnemonic == "FMA"
+    assert fma.operands == ["0", "R0", "R1", "R2"]
+    assert [a.name for a in fma.attrs] == ["energy_opt", "thermal_hint"]
+    assert add.attrs == ()
+
+
+def test_run_passes_parallel_matches_serial(monkeypatch):
+    """Test the threaded per-function path produces the same program."""
+    from crz.compiler import passes
+
+    code = "\n".join(f"""fn f{i}() {{
+    LOAD R0, [R1];
+    ADD R2, R0, {i};
+}}""" for i in range(6))
+    serial = run_passes(parse(code), ["fusion"], {})
+    monkeypatch.setattr(passes, "_PARALLEL_PASSES", True)
+    parallel = run_passes(parse(code), ["fusion"], {})
+    assert [f.name for f in parallel.declarations] == [f"f{i}" for i in range(6)]
+    assert parallel.to_json() == serial.to_json()
+
+
+def test_run_passes_without_passes_copies_program():
+    """Test an empty (or all-unknown) pass list returns an untouched copy."""
+    program = parse("fn main() {\n    LOAD R0, [R1];\n    ADD R2, R0, 1;\n}\n")
+    for names in ([], ["no_such_pass"]):
+        result = run_passes(program, names, {})
+        assert result is not program
+        assert result.declarations == program.declarations
+        assert result.declarations is not program.declarations
+
+
+def test_fusion_pass_builds_new_block_list():
+    """Test a long fused block is rebuilt rather than edited with list deletes."""
+    from crz.compiler.ast import Function
+    from crz.compiler.passes import apply_fusion_pass_safe
+
+    body = []
+    for _ in range(10000):
+        body.append(Instr(mnemonic="LOAD", operands=["R0", "[R1]"], attrs=(), raw=""))
+        body.append(Instr(mnemonic="ADD", operands=["R0", "R0", "1"], attrs=(), raw=""))
+    func = Function(name="main", params=[], return_type=None, body=body)
+
+    result = apply_fusion_pass_safe(func, {})
+    assert len(body) == 20000  # original block list is not shrunk in place
+    assert len(result.body) == 10000
+    assert all(stmt.mnemonic == "FUSED_LOAD_ADD" for stmt in result.body)
+
+
+def test_find_fusion_sites():
+    """Test the packed scan reports every pair start, overlapping ones included."""
+    from crz.compiler.passes import _find_fusion_sites
+
+    assert _find_fusion_sites(bytes([0, 1, 2, 1, 1, 2]), bytes([1, 2])) == [1, 4]
+    assert _find_fusion_sites(bytes([1, 1, 1]), bytes([1, 1])) == [0, 1]
+    assert _find_fusion_sites(bytes([2, 1, 0, 2]), bytes([1, 2])) == []
+    assert _find_fusion_sites(b"", bytes([1, 2])) == []
@@ -4,9 +4,7 @@ Tests for CRZ64I Runtime
 
 import pytest
 from crz.runtime.runtime import Runtime
-from crz.compiler.parser import parse
-from crz.compiler.passes import run_passes
-from crz.compiler.codegen_sim import generate_simulator_code as codegen_sim
+from crz.tests.utils import compile_sim
 from crz.simulator.simulator import Simulator
 
 
@@ -63,10 +61,7 @@ fn main() {
     ADD R0, R1, R2;
 }
 """
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compile_sim(code)
     sim = Simulator()
     runtime = Runtime(sim)
     hints = [{"name": "power", "value": "low"}]
@@ -84,10 +79,7 @@ fn main() {
     ADD R0, R1, R2;
 }
 """
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compile_sim(code)
     sim = Simulator()
     runtime = Runtime(sim)
     hints = [{"name": "thermal_hint", "value": "cool"}]
@@ -106,10 +98,7 @@ fn main() {
     ADD R0, R1, R2;
 }
 """
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compile_sim(code)
     sim = Simulator()
     runtime = Runtime(sim)
     runtime.run_with_hints(sim_ir)
@@ -125,10 +114,7 @@ fn main() {
     MUL R3, R4, R5;
 }
 """
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compile_sim(code)
     sim = Simulator()
     runtime = Runtime(sim)
     runtime.run_with_hints(sim_ir)
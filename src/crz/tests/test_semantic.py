@@ -3,7 +3,7 @@ Tests for CRZ64I Semantic Analyzer
 """
 
 import pytest
-from crz.compiler.parser import parse
+from crz.tests.utils import parse_cached as parse
 from crz.compiler.semantic import SemanticAnalyzer
 
 
@@ -21,25 +21,16 @@ def test_invalid_attribute_on_function():
     assert "invalid" in issues[0]["message"]
 
 
-def test_realtime_with_load():
-    code = """
-#[realtime] fn main() {
-    LOAD R0, [R1];
-}
-"""
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
-    issues = analyzer.analyze(program)
-    assert len(issues) == 1
-    assert issues[0]["type"] == "error"
-    assert issues[0]["message"] == "Realtime violation: LOAD inside realtime function."
-
-
-def test_realtime_dma_start():
-    code = """
-#[realtime] fn main() {
-    DMA_START R0, R1, R2;
-}
+@pytest.mark.parametrize(
+    "mnemonic, operands",
+    [("LOAD", "R0, [R1]"), ("STORE", "R0, [R1]"), ("DMA_START", "R0, R1, R2")],
+    ids=["LOAD", "STORE", "DMA_START"],
+)
+def test_realtime_violation(mnemonic, operands):
+    code = f"""
+#[realtime] fn main() {{
+    {mnemonic} {operands};
+}}
 """
     program = parse(code)
     analyzer = SemanticAnalyzer()
@@ -48,7 +39,7 @@ def test_realtime_dma_start():
     assert issues[0]["type"] == "error"
     assert (
         issues[0]["message"]
-        == "Realtime violation: DMA_START inside realtime function."
+        == f"Realtime violation: {mnemonic} inside realtime function."
     )
 
 
@@ -117,20 +108,6 @@ fn main() {
     assert "invalid" in issues[0]["message"]
 
 
-def test_realtime_with_store():
-    code = """
-#[realtime] fn main() {
-    STORE R0, [R1];
-}
-"""
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
-    issues = analyzer.analyze(program)
-    assert len(issues) == 1
-    assert issues[0]["type"] == "error"
-    assert issues[0]["message"] == "Realtime violation: STORE inside realtime function."
-
-
 def test_reversible_multiple_writes():
     code = """
 #[reversible] fn main() {
@@ -4,23 +4,64 @@ Tests for CRZ64I Simulator
 
 import pytest
 from pathlib import Path
-from crz.compiler.parser import parse
-from crz.compiler.passes import run_passes
-from crz.compiler.codegen_sim import generate_simulator_code as codegen_sim
+from crz.tests.utils import compile_sim
 from crz.simulator.simulator import Simulator
 
+ARITH_SNIPPET = """
+fn main() {
+    ADD R0, R1, R2;
+    MUL R3, R4, R5;
+}
+"""
 
-def test_simulator_add():
-    """Test ADD instruction."""
-    code = """
+SNIPPETS = {
+    "add": """
 fn main() {
     ADD R0, R1, 5;
 }
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+""",
+    "energy": ARITH_SNIPPET,
+    "thermal": ARITH_SNIPPET,
+    "fused": """
+fn main() {
+    FUSED_LOAD_ADD R0, R1, 5;
+}
+""",
+    "memory": """
+fn main() {
+    STORE 42, [R1];
+    LOAD R0, [R1];
+}
+""",
+    "branch": """
+fn main() {
+    ADD R0, R1, 0;  // Set Z flag
+    JZ 5;  // Jump if zero
+}
+""",
+    "fibonacci": Path("examples/fibonacci.crz"),
+}
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    """sim IR of a SNIPPETS entry, compiled on first use and shared by the module."""
+    sources = {}
+
+    def get(name):
+        source = SNIPPETS[name]
+        if isinstance(source, Path):
+            if source not in sources:
+                sources[source] = source.read_text()
+            source = sources[source]
+        return compile_sim(source)
+
+    return get
+
+
+def test_simulator_add(compiled):
+    """Test ADD instruction."""
+    sim_ir = compiled("add")
     sim = Simulator()
     initial_state = {"registers": {"R1": 10}}
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
@@ -29,31 +70,18 @@ fn main() {
     assert energy > 0
 
 
-def test_simulator_fibonacci():
+def test_simulator_fibonacci(compiled):
     """Test fibonacci computation for n=10."""
-    code = Path("examples/fibonacci.crz").read_text()
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("fibonacci")
     sim = Simulator()
     initial_state = {"registers": {"R3": 10}}  # n=10
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
     assert final_state["registers"]["R0"] == 55  # fib(10)=55
 
 
-def test_simulator_energy_model():
+def test_simulator_energy_model(compiled):
     """Test energy consumption."""
-    code = """
-fn main() {
-    ADD R0, R1, R2;
-    MUL R3, R4, R5;
-}
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("energy")
     sim = Simulator()
     initial_state = {"registers": {"R1": 1, "R2": 2, "R4": 3, "R5": 4}}
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
@@ -61,18 +89,9 @@ fn main() {
     assert "total_energy" in sim.get_energy_report()
 
 
-def test_simulator_thermal_model():
+def test_simulator_thermal_model(compiled):
     """Test thermal hotspots."""
-    code = """
-fn main() {
-    ADD R0, R1, R2;
-    MUL R3, R4, R5;
-}
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("thermal")
     sim = Simulator()
     initial_state = {"registers": {"R1": 1, "R2": 2, "R4": 3, "R5": 4}}
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
@@ -81,17 +100,9 @@ fn main() {
     assert report["thermal_hotspots"]["alu"] > 25.0
 
 
-def test_simulator_fused_op():
+def test_simulator_fused_op(compiled):
     """Test fused operation."""
-    code = """
-fn main() {
-    FUSED_LOAD_ADD R0, R1, 5;
-}
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("fused")
     sim = Simulator()
     initial_state = {"registers": {"R1": 10}}
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
@@ -101,18 +112,9 @@ fn main() {
     assert energy < 5.0  # Lower energy for fused
 
 
-def test_simulator_memory_access():
+def test_simulator_memory_access(compiled):
     """Test memory load/store."""
-    code = """
-fn main() {
-    STORE 42, [R1];
-    LOAD R0, [R1];
-}
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("memory")
     sim = Simulator()
     initial_state = {"registers": {"R1": 100}}  # Memory address
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
@@ -121,20 +123,160 @@ fn main() {
     assert sim.memory[100] == 42
 
 
-def test_simulator_branch():
+def test_simulator_branch(compiled):
     """Test branch instruction."""
-    code = """
-fn main() {
-    ADD R0, R1, 0;  // Set Z flag
-    JZ 5;  // Jump if zero
-}
-"""
-    program = parse(code)
-    config = {}
-    optimized = run_passes(program, [], config)
-    sim_ir = codegen_sim(optimized)
+    sim_ir = compiled("branch")
     sim = Simulator()
     initial_state = {"registers": {"R1": 0}}
     cycles, energy, temp, final_state = sim.run(sim_ir, initial_state, metrics=True)
     # Assuming pc jumps, but since sequential, check flags
     assert sim.get_flag("Z")
+
+
+def test_simulator_operand_values():
+    """Test register, named, literal and register+offset operands."""
+    sim = Simulator()
+    sim.regs["r1"] = 7
+    sim.execute_op("ADD", ["x", "r1", "-2"])
+    sim.execute_op("ADD", ["r2", "x", " r1 + 3 "])
+    assert sim.regs["x"] == 5
+    assert sim.regs["r2"] == 15
+    assert sim.get_val("unknown") == 0
+
+
+def test_simulator_run_decoded_loop():
+    """Test a counted loop runs through the decoded op list with per-op costs."""
+    ops = [
+        {"op": "ADD", "args": ["r1", "r0", "0"]},
+        {"op": "LABEL", "args": ["top"]},
+        {"op": "ADD", "args": ["r2", "r2", "r1"]},
+        {"op": "ADD", "args": ["r1", "r1", "1"]},
+        {"op": "BR_IF", "args": ["LT", "r1", "5", "top"]},
+    ]
+    config = {
+        "energy": {"ADD": 1.0},
+        "thermal": {},
+        "cycles": {"ADD": 2, "BR_IF": 3, "LABEL": 0},
+        "cores": 1,
+    }
+    sim = Simulator(config)
+    cycles, energy, _ = sim.run(ops)
+    assert sim.regs["r2"] == 0 + 1 + 2 + 3 + 4
+    assert sim._op_counts == {"ADD": 11, "LABEL": 5, "BR_IF": 5}
+    assert cycles == 11 * 2 + 5 * 3
+    assert energy == 11.0
+
+
+def test_simulator_preparsed_operands_match_get_val():
+    """Test pre-parsed operands agree with get_val, including sums it falls back for."""
+    from crz.simulator.simulator import _parse_operand
+
+    assert _parse_operand("r1") == ("r1", 0)
+    assert _parse_operand("-4") == (None, -4)
+    assert _parse_operand(" r2 + 3 ") == ("r2", 3)
+    assert _parse_operand("r1 + r2") is None
+
+    ops = [
+        {"op": "ADD", "args": ["r1", "r0", "6"]},
+        {"op": "ADD", "args": ["r2", "r1", "r1 + 2"]},
+        {"op": "STORE", "args": ["r2", "[r1 + 1]"]},
+        {"op": "LOAD", "args": ["r3", "[7]"]},
+        {"op": "SUB", "args": ["r4", "r1 + r2", "-1"]},
+        {"op": "FUSED_LOAD_ADD", "args": ["r5", "r6", "[r1+1]", "r1"]},
+    ]
+    sim = Simulator()
+    sim.run(ops)
+    assert sim.regs["r2"] == 14
+    assert sim.regs["r3"] == 14
+    assert sim.regs["r4"] == 21
+    assert (sim.regs["r5"], sim.regs["r6"]) == (14, 20)
+
+
+def test_simulator_inlined_thermal_matches_method():
+    """Test run_program's inlined thermal update matches update_thermal_advanced."""
+    calls = []
+
+    class TracingSimulator(Simulator):
+        def update_thermal_advanced(self, mnemonic, energy_joule, dt=None, cycles=None):
+            calls.append(mnemonic)
+            super().update_thermal_advanced(
+                mnemonic, energy_joule, dt=dt, cycles=cycles
+            )
+
+    ops = [
+        {"op": "LABEL", "args": ["start"]},
+        {"op": "ADD", "args": ["r1", "r1", "3"]},
+        {"op": "MUL", "args": ["r2", "r1", "r1"]},
+        {"op": "JMP", "args": ["5"]},
+        {"op": "ADD", "args": ["r3", "r0", "1"]},
+    ]
+    fast, traced = Simulator(), TracingSimulator()
+    fast.run(ops)
+    traced.run(ops)
+    assert calls == ["LABEL", "ADD", "MUL", "JMP"]
+    assert fast.thermal_map == traced.thermal_map
+    assert set(fast.thermal_map) == {"alu", "control"}
+
+
+def test_simulator_links_jump_labels():
+    """Test jumps are linked and LABELs made inert unless label names repeat."""
+    ops = [
+        {"op": "JMP", "args": ["skip"]},
+        {"op": "ADD", "args": ["r1", "r0", "1"]},
+        {"op": "LABEL", "args": ["skip"]},
+        {"op": "ADD", "args": ["r2", "r0", "2"]},
+    ]
+    sim = Simulator()
+    decoded = sim._precompile(ops)
+    sim.labels = {"skip": 2}
+    sim._link_jumps(decoded)
+    assert decoded[0][1] == (1,)
+    assert decoded[2][2] is None  # LABEL already recorded by the pre-pass
+    sim.run(ops)
+    assert (sim.regs["r1"], sim.regs["r2"]) == (0, 2)
+
+    duplicated = ops + [{"op": "LABEL", "args": ["skip"]}]
+    sim = Simulator()
+    decoded = sim._precompile(duplicated)
+    sim.labels = {"skip": 4}
+    sim._link_jumps(decoded)
+    assert decoded[0][1] == ["skip"]
+
+
+def test_simulator_restore_delta_can_repeat():
+    """Test RESTORE_DELTA restores the saved registers every time it runs."""
+    sim = Simulator()
+    sim.execute_op("ADD", ["r1", "r0", "4"])
+    sim.execute_op("SAVE_DELTA", [])
+    for _ in range(2):
+        sim.execute_op("ADD", ["r1", "r1", "10"])
+        sim.execute_op("RESTORE_DELTA", [])
+        assert sim.regs["r1"] == 4
+    assert sim.regs is not sim.backup_regs
+
+
+def test_simulator_and_config_use_slots():
+    """Test Simulator and Config instances carry no per-instance __dict__."""
+    sim = Simulator()
+    assert not hasattr(sim, "__dict__")
+    assert not hasattr(sim.config, "__dict__")
+    with pytest.raises(AttributeError):
+        sim.unknown_attribute = 1
+
+
+def test_simulator_reset_matches_fresh_instance():
+    """Test reset() returns a used simulator to the state of a new one."""
+    ops = [
+        {"op": "ADD", "args": ["r1", "r0", "3"]},
+        {"op": "STORE", "args": ["r1", "[2]"]},
+        {"op": "SAVE_DELTA", "args": []},
+    ]
+    sim = Simulator()
+    sim.run(ops)
+    regs, memory = sim.regs, sim.memory
+    sim.reset()
+    fresh = Simulator()
+    assert sim.get_state() == fresh.get_state()
+    assert sim.regs is regs and sim.memory is memory
+    assert (sim.pc, sim.cycles, sim.energy_used, sim.thermal_map) == (0, 0, 0.0, {})
+    assert sim.run(ops) == fresh.run(ops)
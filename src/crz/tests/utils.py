@@ -1,6 +1,9 @@
-from ..compiler.parser import parse_text
+import functools
+import pickle
+
+from ..compiler.parser import parse, parse_text
 from ..compiler.passes import run_passes
-from ..compiler.codegen_sim import codegen
+from ..compiler.codegen_sim import codegen, generate_simulator_code
 from ..simulator.simulator import Simulator
 
 
@@ -11,12 +14,37 @@ def run_roundtrip(filename):
     ir = codegen(ast)
     simulator = Simulator()
     simulator.run_program(ir)
-    original_regs = simulator.regs.copy()
 
     fused_ast = run_passes(ast, ["fusion"], {})
     fused_ir = codegen(fused_ast)
     simulator2 = Simulator()
     simulator2.run_program(fused_ir)
-    fused_regs = simulator2.regs.copy()
 
-    return original_regs == fused_regs
+    # each simulator is done after one run, so compare the live register files
+    return simulator.regs == simulator2.regs
+
+
+@functools.lru_cache(maxsize=256)
+def _parsed_snippet(code):
+    return pickle.dumps(parse(code))
+
+
+def parse_cached(code):
+    """
+    ``parse`` for test snippets: each distinct source is parsed once.
+
+    Passes rewrite the AST in place, so every call returns a fresh copy
+    (unpickling is several times cheaper than re-parsing).
+    """
+    return pickle.loads(_parsed_snippet(code))
+
+
+@functools.lru_cache(maxsize=512)
+def compile_sim(code, passes=()):
+    """
+    parse -> run_passes -> generate_simulator_code for a test snippet.
+
+    ``passes`` is a tuple so calls can be cached; the generated simulator
+    code is a string, so cached results are shared as they are.
+    """
+    return generate_simulator_code(run_passes(parse_cached(code), list(passes), {}))
@@ -1,6 +1,7 @@
 # tests.py
 # Benchmarks for CRZ64I
 
+import multiprocessing
 import time
 from grammar import CRZParser
 from compiler import CRZCompiler
@@ -8,7 +9,8 @@ from assembler import CRZAssembler
 from simulator import CRZSimulator
 
 
-def benchmark(code):
+def run_benchmark(code):
+    """Compile and simulate code; returns (cycles, energy, temperature, seconds)."""
     parser = CRZParser()
     instructions, labels = parser.parse(code)
     compiler = CRZCompiler()
@@ -21,10 +23,20 @@ def benchmark(code):
         optimized
     )  # Run on instructions, not bytecode for simplicity
     end = time.time()
+    return cycles, energy, temperature, end - start
+
+
+def report(result):
+    cycles, energy, temperature, elapsed = result
     print(
-        f"Cycles: {cycles}, Energy: {energy}, Temperature: {temperature:.2f}, Time: {end - start:.4f}s"
+        f"Cycles: {cycles}, Energy: {energy}, Temperature: {temperature:.2f}, Time: {elapsed:.4f}s"
     )
-    return cycles, energy, temperature
+
+
+def benchmark(code):
+    result = run_benchmark(code)
+    report(result)
+    return result[:3]
 
 
 if __name__ == "__main__":
@@ -39,9 +51,12 @@ if __name__ == "__main__":
     }
 
     print("Baseline Microbenchmarks:")
-    for instr, code in microbenchmarks.items():
+    # independent programs: compile and simulate them in parallel, report in order
+    with multiprocessing.Pool() as pool:
+        results = pool.map(run_benchmark, microbenchmarks.values())
+    for instr, result in zip(microbenchmarks, results):
         print(f"\n{instr}:")
-        benchmark(code)
+        report(result)
 
     # Full Workload: Simple GEMM (Matrix Multiply Accumulate)
     print("\nFull Workload Benchmark: GEMM")
@@ -0,0 +1,33 @@
+"""Seeded process-pool sharding shared by the fuzz scripts."""
+
+import multiprocessing
+import os
+import random
+
+
+def run_sharded(worker, make_job, iterations, workers=None, seed=None):
+    """
+    Split ``iterations`` across ``workers`` processes and run ``worker`` on each.
+
+    ``make_job(start, count, job_seed)`` builds the picklable job for one
+    slice; ``worker`` must be a module-level function. Workers default to
+    one per CPU, and a single slice runs inline. Job seeds are drawn from a
+    local ``random.Random(seed)``; the seed (random when not given) is
+    returned with the results so crashes can be reproduced by passing it
+    back with the same ``workers``.
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if iterations <= 0:
+        return [], seed
+    rng = random.Random(seed)
+    workers = max(1, min(workers or os.cpu_count() or 1, iterations))
+    chunk = -(-iterations // workers)
+    jobs = [
+        make_job(start, min(chunk, iterations - start), rng.getrandbits(32))
+        for start in range(0, iterations, chunk)
+    ]
+    if len(jobs) == 1:
+        return [worker(jobs[0])], seed
+    with multiprocessing.Pool(len(jobs)) as pool:
+        return pool.map(worker, jobs), seed
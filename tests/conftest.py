@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    """One SemanticAnalyzer shared by the suite; analyze() resets its issues."""
+    from crz.compiler.semantic import SemanticAnalyzer
+
+    return SemanticAnalyzer()
@@ -1,43 +1,246 @@
+import copy
 import random
-from lark import Lark
+import re
 from lark.exceptions import LarkError
+from crz.compiler.parser import create_parser
 
+from _fuzz_pool import run_sharded
 
-def fuzz_parser(grammar_file, iterations=1000, timeout=0.1):
-    """Fuzz the parser with random inputs."""
-    with open(grammar_file, "r") as f:
-        grammar = f.read()
-    parser = Lark(
-        grammar,
-        start="program",
-        parser="earley",
-        lexer="dynamic",
-        propagate_positions=True,
-        cache=False,
-    )
-    crashes = 0
-    for i in range(iterations):
-        # Generate random string
-        length = random.randint(1, 100)
-        txt = "".join(
-            random.choice(
-                "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 \n\t{}();[],."
+# Share of iterations fed raw random text, so the lexer's error paths stay covered
+RAW_FRACTION = 0.05
+RAW_ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 \n\t{}();[],."
+)
+
+# Spellings tried for regex terminals; each terminal samples those its
+# pattern fully matches.
+TOKEN_SAMPLES = [
+    "r0",
+    "r7",
+    "v1",
+    "ADD",
+    "LOAD",
+    "FUSED_LOAD_ADD",
+    "x",
+    "loop",
+    "main",
+    "fusion",
+    "low",
+    "0",
+    "42",
+    '"s"',
+    "LT",
+    "GE",
+    "+",
+    "<<",
+    "==",
+]
+
+# Past this depth derivations take their shortest alternative
+MAX_DEPTH = 12
+# Weight of empty alternatives ([x], x*), which inverse-size weighting
+# would otherwise make the most likely choice everywhere
+EMPTY_WEIGHT = 0.1
+CORPUS_SIZE = 64
+
+
+class GrammarFuzzer:
+    """
+    Derives random sentences from a Lark parser's compiled grammar.
+
+    Derivation trees are ``[symbol, children]`` lists with terminal spellings
+    as leaves. Alternatives are drawn weighted by the inverse of their
+    shortest expansion, which keeps derivations bounded; accepted trees can
+    be mutated by regenerating or splicing subtrees.
+    """
+
+    def __init__(self, parser, rng=random):
+        self.rng = rng
+        self.alternatives = {}
+        for rule in parser.rules:
+            self.alternatives.setdefault(rule.origin.name, []).append(
+                [(symbol.name, symbol.is_term) for symbol in rule.expansion]
             )
-            for _ in range(length)
+        self.samples = {}
+        for terminal in parser.terminals:
+            pattern = terminal.pattern
+            if pattern.type == "str":
+                self.samples[terminal.name] = [pattern.value]
+            else:
+                regexp = re.compile(pattern.to_regexp())
+                self.samples[terminal.name] = [
+                    s for s in TOKEN_SAMPLES if regexp.fullmatch(s)
+                ] or ["x"]
+        costs = self._min_costs()
+        self.shortest = {}
+        self.weights = {}
+        for name, alts in self.alternatives.items():
+            alt_costs = [self._alt_cost(alt, costs) for alt in alts]
+            self.shortest[name] = alts[alt_costs.index(min(alt_costs))]
+            self.weights[name] = [
+                1.0 / (1 + cost) if cost else EMPTY_WEIGHT for cost in alt_costs
+            ]
+
+    @staticmethod
+    def _alt_cost(alt, costs):
+        return sum(
+            1 if is_term else costs.get(name, float("inf")) for name, is_term in alt
         )
+
+    def _min_costs(self):
+        """Token count of each nonterminal's shortest derivation (fixed point)."""
+        costs = {}
+        changed = True
+        while changed:
+            changed = False
+            for name, alts in self.alternatives.items():
+                best = min(self._alt_cost(alt, costs) for alt in alts)
+                if best < costs.get(name, float("inf")):
+                    costs[name] = best
+                    changed = True
+        return costs
+
+    def derive(self, name, depth=0):
+        """Random derivation tree for nonterminal ``name``."""
+        if depth >= MAX_DEPTH:
+            alt = self.shortest[name]
+        else:
+            alts = self.alternatives[name]
+            alt = self.rng.choices(alts, weights=self.weights[name])[0]
+        children = [
+            (
+                self.rng.choice(self.samples[symbol])
+                if is_term
+                else self.derive(symbol, depth + 1)
+            )
+            for symbol, is_term in alt
+        ]
+        return [name, children]
+
+    def mutate(self, tree, corpus):
+        """Copy of ``tree`` with one subtree regenerated or spliced from ``corpus``."""
+        tree = copy.deepcopy(tree)
+        sites = list(_subtree_sites(tree))
+        if not sites:
+            return tree
+        children, index = self.rng.choice(sites)
+        name = children[index][0]
+        donors = [
+            node
+            for other in corpus
+            for node in _subtrees(other)
+            if node[0] == name and node is not children[index]
+        ]
+        if donors and self.rng.random() < 0.5:
+            children[index] = copy.deepcopy(self.rng.choice(donors))
+        else:
+            children[index] = self.derive(name, MAX_DEPTH // 2)
+        return tree
+
+    @staticmethod
+    def text(tree):
+        """Source text of a derivation tree: its leaves, space separated."""
+        tokens = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                tokens.append(node)
+            else:
+                stack.extend(reversed(node[1]))
+        return " ".join(tokens)
+
+
+def _subtrees(tree):
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, str):
+            yield node
+            stack.extend(node[1])
+
+
+def _subtree_sites(tree):
+    """(children list, index) of every nonterminal below the root."""
+    for node in _subtrees(tree):
+        for index, child in enumerate(node[1]):
+            if not isinstance(child, str):
+                yield node[1], index
+
+
+def _fuzz_worker(job):
+    """
+    Run one slice of ``fuzz_parser``'s iterations in a pool worker.
+
+    ``job`` is ``(grammar_file, start, iterations, seed)``; each worker keeps
+    its own RNG and corpus. Returns ``(accepted, iterations run, crash
+    messages)``.
+    """
+    grammar_file, start, iterations, seed = job
+    rng = random.Random(seed)
+    # The production parser (LALR, tables cached on disk, memoized per path)
+    parser = create_parser(grammar_file)
+    fuzzer = GrammarFuzzer(parser, rng)
+    corpus = []
+    crashes = []
+    accepted = 0
+    for i in range(start, start + iterations):
+        tree = None
+        roll = rng.random()
+        if roll < RAW_FRACTION:
+            length = rng.randint(1, 100)
+            txt = "".join(rng.choices(RAW_ALPHABET, k=length))
+        else:
+            if corpus and roll < 0.5:
+                tree = fuzzer.mutate(rng.choice(corpus), corpus)
+            else:
+                tree = fuzzer.derive("program")
+            txt = fuzzer.text(tree)
         try:
             parser.parse(txt)
         except LarkError:
             pass  # Expected
         except Exception as e:
-            print(f"Crash on iteration {i}: {e}")
-            crashes += 1
-            if crashes > 10:  # Stop after too many crashes
+            crashes.append(f"Crash on iteration {i}: {e}")
+            if len(crashes) > 10:  # Stop after too many crashes
                 break
-    if crashes == 0:
+        else:
+            accepted += 1
+            if tree is not None:
+                if len(corpus) < CORPUS_SIZE:
+                    corpus.append(tree)
+                else:
+                    corpus[rng.randrange(CORPUS_SIZE)] = tree
+    return accepted, i + 1 - start, crashes
+
+
+def fuzz_parser(grammar_file, iterations=1000, timeout=0.1, workers=None, seed=None):
+    """
+    Fuzz the parser with grammar-derived (and some raw random) inputs.
+
+    Iterations are sharded by ``run_sharded``; the seed is printed with any
+    crashes.
+    """
+    # Build (or fetch) the memoized parser here: forked workers inherit it
+    # instead of each loading the grammar again
+    create_parser(grammar_file)
+    results, seed = run_sharded(
+        _fuzz_worker,
+        lambda start, count, job_seed: (grammar_file, start, count, job_seed),
+        iterations,
+        workers,
+        seed,
+    )
+    accepted = sum(r[0] for r in results)
+    total = sum(r[1] for r in results)
+    crashes = [message for r in results for message in r[2]]
+    for message in crashes:
+        print(message)
+    print(f"Accepted {accepted}/{total} inputs.")
+    if not crashes:
         print("No crashes found.")
     else:
-        print(f"Found {crashes} crashes.")
+        print(f"Found {len(crashes)} crashes (seed {seed}).")
 
 
 if __name__ == "__main__":
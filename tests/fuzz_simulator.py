@@ -3,54 +3,93 @@ from crz.compiler.parser import parse
 from crz.compiler.codegen_sim import codegen
 from crz.simulator.simulator import Simulator
 
+from _fuzz_pool import run_sharded
 
-def generate_random_program(max_len=50):
+OPS = ["ADD", "SUB", "MUL", "DIV", "MOV", "CMP", "JMP", "JZ", "JNZ", "CALL", "RET"]
+REGS = [f"R{i}" for i in range(8)]
+LABELS = [f"label{i}" for i in range(5)]
+# Operand kinds of each op: "r" register, "l" label
+OPERANDS = {
+    "ADD": "rrr",
+    "SUB": "rrr",
+    "MUL": "rrr",
+    "DIV": "rrr",
+    "MOV": "rr",
+    "CMP": "rr",
+    "JMP": "l",
+    "JZ": "l",
+    "JNZ": "l",
+    "CALL": "l",
+    "RET": "",
+}
+PROLOGUE = "#[fusion]\nfn fuzz_func() {\n"
+EPILOGUE = "\n}"
+
+
+def generate_random_program(max_len=50, rng=random):
     """Generate a random CRZ program."""
-    ops = ["ADD", "SUB", "MUL", "DIV", "MOV", "CMP", "JMP", "JZ", "JNZ", "CALL", "RET"]
-    regs = [f"R{i}" for i in range(8)]
-    labels = [f"label{i}" for i in range(5)]
-
-    program = []
-    program.append("#[fusion]")
-    program.append("fn fuzz_func() {")
-
-    for _ in range(random.randint(1, max_len)):
-        op = random.choice(ops)
-        if op in ["ADD", "SUB", "MUL", "DIV"]:
-            args = [random.choice(regs), random.choice(regs), random.choice(regs)]
-        elif op == "MOV":
-            args = [random.choice(regs), random.choice(regs)]
-        elif op == "CMP":
-            args = [random.choice(regs), random.choice(regs)]
-        elif op in ["JMP", "JZ", "JNZ", "CALL"]:
-            args = [random.choice(labels)]
-        elif op == "RET":
-            args = []
-        program.append(f"    {op} {', '.join(args)};")
-
-    program.append("}")
-    return "\n".join(program)
-
-
-def fuzz_simulator(iterations=100, max_len=50):
-    """Fuzz the simulator with random programs."""
+    n = rng.randint(1, max_len)
+    # draw every op and operand up front, then format in one pass
+    chosen = rng.choices(OPS, k=n)
+    pools = {
+        "r": iter(rng.choices(REGS, k=3 * n)),
+        "l": iter(rng.choices(LABELS, k=n)),
+    }
+    body = "\n".join(
+        f"    {op} {', '.join(next(pools[kind]) for kind in OPERANDS[op])};"
+        for op in chosen
+    )
+    return PROLOGUE + body + EPILOGUE
+
+
+def _fuzz_worker(job):
+    """
+    Run one slice of ``fuzz_simulator``'s iterations in a pool worker.
+
+    ``job`` is ``(start, iterations, max_len, seed)``; returns the crash
+    messages.
+    """
+    start, iterations, max_len, seed = job
+    rng = random.Random(seed)
     sim = Simulator()
-    crashes = 0
-    for i in range(iterations):
-        prog = generate_random_program(max_len)
+    crashes = []
+    for i in range(start, start + iterations):
+        prog = generate_random_program(max_len, rng)
+        # one simulator per worker, returned to its initial state so an
+        # iteration never sees registers or memory left by the previous one
+        sim.reset()
         try:
             ast = parse(prog)
             ir = codegen(ast)
             sim.run_program(ir)
         except Exception as e:
-            print(f"Crash on iteration {i}: {e}")
-            crashes += 1
-            if crashes > 10:
+            crashes.append(f"Crash on iteration {i}: {e}")
+            if len(crashes) > 10:
                 break
-    if crashes == 0:
+    return crashes
+
+
+def fuzz_simulator(iterations=100, max_len=50, workers=None, seed=None):
+    """
+    Fuzz the simulator with random programs.
+
+    Iterations are sharded by ``run_sharded``; the seed is printed with any
+    crashes.
+    """
+    results, seed = run_sharded(
+        _fuzz_worker,
+        lambda start, count, job_seed: (start, count, max_len, job_seed),
+        iterations,
+        workers,
+        seed,
+    )
+    crashes = [message for r in results for message in r]
+    for message in crashes:
+        print(message)
+    if not crashes:
         print("No crashes found.")
     else:
-        print(f"Found {crashes} crashes.")
+        print(f"Found {len(crashes)} crashes (seed {seed}).")
 
 
 if __name__ == "__main__":
@@ -3,19 +3,17 @@ Tests for CRZ64I Reversible Block Detection
 """
 
 import pytest
-from crz.compiler.parser import parse
-from crz.compiler.semantic import SemanticAnalyzer
+from crz.tests.utils import parse_cached
 
 
-def test_reversible_store_without_let():
+def test_reversible_store_without_let(analyzer):
     """Test STORE in reversible function without let tmp = target reports error."""
     code = """
 #[reversible] fn main() {
     STORE R0, [R1];
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 1
     assert issues[0]["type"] == "error"
@@ -26,7 +24,7 @@ def test_reversible_store_without_let():
     assert issues[0]["line"] == 3  # Assuming line 3 is the STORE
 
 
-def test_reversible_store_with_let():
+def test_reversible_store_with_let(analyzer):
     """Test STORE in reversible function with let tmp = target is ok."""
     code = """
 #[reversible] fn main() {
@@ -34,20 +32,18 @@ def test_reversible_store_with_let():
     STORE R0, [R1];
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 0
 
 
-def test_reversible_store_with_no_erase():
+def test_reversible_store_with_no_erase(analyzer):
     """Test STORE in reversible function with #[no_erase] is ok."""
     code = """
 #[reversible] fn main() {
     #[no_erase] STORE R0, [R1];
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 0
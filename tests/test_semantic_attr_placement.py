@@ -3,24 +3,22 @@ Tests for CRZ64I Semantic Analyzer - Attribute Placement
 """
 
 import pytest
-from crz.compiler.parser import parse
-from crz.compiler.semantic import SemanticAnalyzer
+from crz.tests.utils import parse_cached
 
 
-def test_reversible_on_function():
+def test_reversible_on_function(analyzer):
     """Test that #[reversible] is allowed on functions."""
     code = """
 #[reversible] fn main() {
     NOP;
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 0
 
 
-def test_reversible_on_if():
+def test_reversible_on_if(analyzer):
     """Test that #[reversible] is allowed on if blocks."""
     code = """
 fn main() {
@@ -29,13 +27,12 @@ fn main() {
     }
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 0
 
 
-def test_reversible_on_loop():
+def test_reversible_on_loop(analyzer):
     """Test that #[reversible] is allowed on loops."""
     code = """
 fn main() {
@@ -44,21 +41,19 @@ fn main() {
     }
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 0
 
 
-def test_reversible_on_instruction_error():
+def test_reversible_on_instruction_error(analyzer):
     """Test that #[reversible] is not allowed on instructions."""
     code = """
 fn main() {
     #[reversible] ADD R0, R1, R2;
 }
 """
-    program = parse(code)
-    analyzer = SemanticAnalyzer()
+    program = parse_cached(code)
     issues = analyzer.analyze(program)
     assert len(issues) == 1
     assert issues[0]["type"] == "error"
@@ -1,3 +1,5 @@
+import copy
+import re
 import sys
 
 sys.path.insert(0, "src")
@@ -6,19 +8,13 @@ from crz.compiler.codegen_sim import codegen
 from crz.compiler.passes import run_passes
 from crz.simulator.simulator import Simulator
 
+_R_RE = re.compile(r"\bR(\d+)\b")
 
-def run_uncompiled(code):
-    prog = parse_text(code)
-    ops = codegen(prog)
-    sim = Simulator()
-    sim.run(ops)
-    return sim.get_state()
 
-
-def run_compiled(code):
-    prog = parse_text(code)
-    compiled_prog = run_passes(prog, ["fusion", "reversible"])
-    ops = codegen(compiled_prog)
+def run_from_ast(prog, passes):
+    if passes:
+        prog = run_passes(prog, passes)
+    ops = codegen(prog)
     sim = Simulator()
     sim.run(ops)
     return sim.get_state()
@@ -26,7 +22,8 @@ def run_compiled(code):
 
 def compare_states(s1, s2):
     diffs = []
-    for r in sorted(set(list(s1["regs"].keys()) + list(s2["regs"].keys()))):
+    # Dict views union without building lists; only a failure report is sorted
+    for r in s1["regs"].keys() | s2["regs"].keys():
         a = s1["regs"].get(r, 0)
         b = s2["regs"].get(r, 0)
         if isinstance(a, float) or isinstance(b, float):
@@ -35,7 +32,7 @@ def compare_states(s1, s2):
         else:
             if a != b:
                 diffs.append(f"R{r}: {a} != {b}")
-    for addr in sorted(set(list(s1["memory"].keys()) + list(s2["memory"].keys()))):
+    for addr in s1["memory"].keys() | s2["memory"].keys():
         a = s1["memory"].get(addr, 0)
         b = s2["memory"].get(addr, 0)
         if a != b:
@@ -45,8 +42,6 @@ def compare_states(s1, s2):
 
 def test_equivalence_micro_add():
     # Use the same substitution as measure_micro_add.py
-    import re
-
     with open("examples/micro_add.crz", "r") as f:
         lines = f.readlines()
     # Remove lines starting with # and containing =
@@ -59,8 +54,10 @@ def test_equivalence_micro_add():
     # Replace N in the code
     code = code.replace("N", "100")
     # Replace uppercase R with lowercase r for registers (e.g., R1 -> r1)
-    code = re.sub(r"\bR(\d+)\b", r"r\1", code)
-    s_uc = run_uncompiled(code)
-    s_c = run_compiled(code)
+    code = _R_RE.sub(r"r\1", code)
+    # Parse once; the passes rewrite the AST, so they get their own copy
+    prog = parse_text(code)
+    s_uc = run_from_ast(prog, [])
+    s_c = run_from_ast(copy.deepcopy(prog), ["fusion", "reversible"])
     diffs = compare_states(s_uc, s_c)
-    assert not diffs, "Semantic differences found:\n" + "\n".join(diffs[:100])
+    assert not diffs, "Semantic differences found:\n" + "\n".join(sorted(diffs)[:100])
@@ -0,0 +1,42 @@
+"""Shared helper for the tools that patch numbers in src/crz/config.py."""
+
+import os
+import re
+
+
+def rewrite_values(text, values):
+    """
+    Replace the number after each ``"KEY":`` in ``text`` with ``values[KEY]``.
+
+    Keys whose value is None are left alone. All keys are handled by one
+    regex in a single pass over the text. Returns the new text and the set of
+    keys that were found.
+    """
+    values = {key: value for key, value in values.items() if value is not None}
+    if not values:
+        return text, set()
+    pattern = re.compile(
+        r'("(' + "|".join(map(re.escape, values)) + r')"\s*:\s*)[0-9eE+\-\.]+'
+    )
+    found = set()
+
+    def replace(match):
+        found.add(match.group(2))
+        return match.group(1) + repr(values[match.group(2)])
+
+    return pattern.sub(replace, text), found
+
+
+def write_if_changed(path, old, new):
+    """
+    Write ``new`` to ``path`` unless it equals ``old``; returns whether it did.
+
+    The text goes to a temporary file that then replaces ``path``, so readers
+    never see a partial file and an unchanged file keeps its mtime.
+    """
+    if new == old:
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(new)
+    os.replace(tmp, path)
+    return True
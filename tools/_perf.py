@@ -0,0 +1,47 @@
+"""Shared ``perf stat`` fallback for the tools that measure without sysfs RAPL."""
+
+import json
+import subprocess
+import time
+
+# One perf run collects energy and cycle counts; -j prints one JSON object per
+# event. perf applies the RAPL scale itself, so Joule counts arrive in Joules.
+PERF_EVENTS = (
+    "power/energy-pkg/,power/energy-cores/,power/energy-ram/,cycles,instructions"
+)
+
+
+def perf_stat(cmd):
+    """Run ``cmd`` under perf stat; counts it could not take are None."""
+    t0 = time.time()
+    p = subprocess.run(
+        ["perf", "stat", "-j", "-e", PERF_EVENTS, "--", *cmd],
+        capture_output=True,
+        text=True,
+    )
+    t1 = time.time()
+    events = {}
+    for line in p.stderr.splitlines():
+        try:
+            rec = json.loads(line)
+            events[rec["event"]] = float(rec["counter-value"])
+        except (ValueError, KeyError, TypeError):
+            continue  # not a counter record, or "<not counted>"
+    return {
+        "energy_pkg_J": events.get("power/energy-pkg/"),
+        "energy_core_J": events.get("power/energy-cores/"),
+        "energy_ram_J": events.get("power/energy-ram/"),
+        "cycles": events.get("cycles"),
+        "instructions": events.get("instructions"),
+        "time_s": t1 - t0,
+    }
+
+
+def domain_energies(stats):
+    """perf_stat energies keyed like the RAPL domains; uncounted ones left out."""
+    energies = {
+        "pkg": stats["energy_pkg_J"],
+        "core": stats["energy_core_J"],
+        "dram": stats["energy_ram_J"],
+    }
+    return {key: value for key, value in energies.items() if value is not None}
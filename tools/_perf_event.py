@@ -0,0 +1,79 @@
+"""Read RAPL energy through perf_event_open(2), without a perf subprocess."""
+
+import ctypes
+import functools
+import os
+import platform
+import struct
+
+POWER_PMU = "/sys/bus/event_source/devices/power"
+# perf_event_open(2) syscall number; RAPL exists on x86 only
+_NR_PERF_EVENT_OPEN = {"x86_64": 298, "i386": 336, "i686": 336}
+
+
+class PerfEventAttr(ctypes.Structure):
+    # struct perf_event_attr up to config1 (PERF_ATTR_SIZE_VER0, 64 bytes)
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("size", ctypes.c_uint32),
+        ("config", ctypes.c_uint64),
+        ("sample_period", ctypes.c_uint64),
+        ("sample_type", ctypes.c_uint64),
+        ("read_format", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+        ("wakeup_events", ctypes.c_uint32),
+        ("bp_type", ctypes.c_uint32),
+        ("config1", ctypes.c_uint64),
+    ]
+
+
+def _read_pmu_file(*parts):
+    with open(os.path.join(POWER_PMU, *parts)) as fh:
+        return fh.read().strip()
+
+
+class RaplEvent:
+    """
+    System-wide counter for one power PMU event, e.g. ``"energy-pkg"``.
+
+    The PMU type, the event's config and its Joules-per-count scale are read
+    from sysfs rather than hard-coded. ``read()`` costs one read(2) of the
+    open fd. Raises OSError when the PMU, event or syscall is unavailable.
+    """
+
+    def __init__(self, event="energy-pkg"):
+        nr = _NR_PERF_EVENT_OPEN.get(platform.machine())
+        if nr is None:
+            raise OSError(f"perf_event_open: unsupported machine {platform.machine()}")
+        attr = PerfEventAttr()
+        attr.type = int(_read_pmu_file("type"))
+        attr.size = ctypes.sizeof(PerfEventAttr)
+        # events/<name> reads like "event=0x02"
+        attr.config = int(_read_pmu_file("events", event).partition("=")[2], 0)
+        self.scale = float(_read_pmu_file("events", event + ".scale"))
+        # the counter is per package: open it on the first CPU the PMU lists
+        cpu = int(_read_pmu_file("cpumask").replace("-", ",").split(",")[0])
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.syscall.restype = ctypes.c_long
+        fd = libc.syscall(nr, ctypes.byref(attr), -1, cpu, -1, ctypes.c_ulong(0))
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"perf_event_open({event}): {os.strerror(err)}")
+        self.fd = fd
+
+    def read(self):
+        """Joules counted since the event was opened."""
+        (count,) = struct.unpack("Q", os.read(self.fd, 8))
+        return count * self.scale
+
+    def close(self):
+        os.close(self.fd)
+
+
+@functools.lru_cache(maxsize=None)
+def open_rapl_event(event="energy-pkg"):
+    """The process-wide RaplEvent for ``event``, or None if it cannot be opened."""
+    try:
+        return RaplEvent(event)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,70 @@
+"""Shared RAPL (powercap sysfs) counter lookup for the measurement tools."""
+
+import functools
+import glob
+import os
+
+# sysfs RAPL zone names, and the keys their samples are reported under
+RAPL_DOMAINS = {"package-0": "pkg", "core": "core", "dram": "dram"}
+
+
+@functools.lru_cache(maxsize=None)
+def find_rapl_domains():
+    """
+    Map "pkg"/"core"/"dram" to (energy_uj, max_energy_range_uj) paths.
+
+    Zones are picked by their ``name`` file, not by listing order, so every
+    machine reports the same domains. They sit flat under /sys/class/powercap
+    (as symlinks, which os.walk does not descend into). CRZ_RAPL_PATH, set by
+    a parent, stands in for the package domain and skips the scan.
+    """
+    if os.environ.get("CRZ_RAPL_PATH"):
+        path = os.environ["CRZ_RAPL_PATH"]
+        max_path = os.path.join(os.path.dirname(path), "max_energy_range_uj")
+        return {"pkg": (path, max_path)}
+    domains = {}
+    for zone in sorted(glob.glob("/sys/class/powercap/*/")):
+        try:
+            with open(os.path.join(zone, "name")) as fh:
+                key = RAPL_DOMAINS.get(fh.read().strip())
+        except OSError:
+            continue
+        energy = os.path.join(zone, "energy_uj")
+        # energy_uj is root-only on recent kernels; skip what cannot be read
+        if key and key not in domains and os.access(energy, os.R_OK):
+            domains[key] = (energy, os.path.join(zone, "max_energy_range_uj"))
+    return domains
+
+
+@functools.lru_cache(maxsize=None)
+def _open_counter(path):
+    # kept open for the whole run, so a sample costs no open/close
+    return os.open(path, os.O_RDONLY)
+
+
+def read_rapl(path):
+    try:
+        # one pread at offset 0 per sample: a single syscall, no seek
+        return int(os.pread(_open_counter(path), 32, 0))
+    except (OSError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def read_max_range(path):
+    # the counter's range is fixed; 0 when unknown
+    try:
+        with open(path, "r") as fh:
+            return int(fh.read().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def energy_delta(before, after, max_range):
+    """Counter delta in uJ across at most one wraparound, or None if implausible."""
+    delta = after - before
+    if delta < 0 and max_range:
+        delta += max_range
+    if delta < 0 or (max_range and delta >= max_range):
+        return None
+    return delta
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import json
+import re
 import sys
 
+# "energy": { ... }, and "cycles": { ... }, blocks of the _DEFAULTS literal
+_SECTION_RE = re.compile(r'^\s*"(energy|cycles)": \{')
+_SECTION_END_RE = re.compile(r"^\s*\},")
+
 
 def update_config(measurements):
     # Load current config
@@ -21,34 +26,40 @@ def update_config(measurements):
     with open("config.json", "w") as f:
         json.dump(config, f, indent=2)
 
-    # Also update src/crz/config.py defaults
-    with open("src/crz/config.py", "r") as f:
-        lines = f.readlines()
+    # Also update src/crz/config.py defaults: one pass over the file, with one
+    # pattern per section matching only the ops that have a measurement
+    values = {"energy": {}, "cycles": {}}
+    for op, data in measurements.items():
+        if data["energy_J"] is not None:
+            values["energy"][op] = data["energy_J"]
+        if data["cycles"] is not None:
+            values["cycles"][op] = data["cycles"]
+    patterns = {
+        section: re.compile(
+            r'^(\s*)"(' + "|".join(map(re.escape, ops)) + r')":', re.ASCII
+        )
+        for section, ops in values.items()
+        if ops
+    }
+    comments = {"energy": "  # Updated", "cycles": ""}
 
-    # Find energy dict
-    in_energy = False
-    in_cycles = False
+    section = None
     new_lines = []
-    for line in lines:
-        if '"energy": {' in line:
-            in_energy = True
-        elif in_energy and "}," in line and '"thermal"' in line:
-            in_energy = False
-        elif in_energy:
-            for op, data in measurements.items():
-                if f'"{op}":' in line and data["energy_J"] is not None:
-                    line = f'                "{op}": {data["energy_J"]},  # Updated\n'
-                    break
-        elif '"cycles": {' in line:
-            in_cycles = True
-        elif in_cycles and "}," in line and '"cores"' in line:
-            in_cycles = False
-        elif in_cycles:
-            for op, data in measurements.items():
-                if f'"{op}":' in line and data["cycles"] is not None:
-                    line = f'                "{op}": {data["cycles"]},\n'
-                    break
-        new_lines.append(line)
+    with open("src/crz/config.py", "r") as f:
+        for line in f:
+            if section is None:
+                match = _SECTION_RE.match(line)
+                if match:
+                    section = match.group(1)
+            elif _SECTION_END_RE.match(line):
+                section = None
+            elif section in patterns:
+                match = patterns[section].match(line)
+                if match:
+                    indent, op = match.groups()
+                    value = values[section][op]
+                    line = f'{indent}"{op}": {value},{comments[section]}\n'
+            new_lines.append(line)
 
     with open("src/crz/config.py", "w") as f:
         f.writelines(new_lines)
@@ -6,13 +6,18 @@ Generates C benchmarks for each opcode, compiles, runs with HW measurement,
 collects energy and cycles, outputs JSON.
 """
 
+import argparse
+import hashlib
 import os
+import re
 import sys
 import json
 import subprocess
 import tempfile
 import shutil
 
+from _rapl import find_rapl_domains
+
 # Add src to path
 sys.path.insert(0, "src")
 
@@ -98,83 +103,216 @@ OP_BENCH = {
     "EXTENSION": "a = a;",
 }
 
+# One binary holds every benchmark: argv[1] is the index of the body to run
+# (see generate_c_bench), argv[2] the iteration count, argv[3] the array size.
 C_TEMPLATE = """#include <stdint.h>
 #include <stdio.h>
 #include <stdlib.h>
+static int *A = NULL;
+static float *Af = NULL;
+static int *B = NULL;
+static int *C = NULL;
+/* allocate and fill only the arrays a benchmark uses: bit 0 A, 1 Af, 2 B, 3 C */
+static void setup(int need, long size){
+    if (size <= 0) return;
+    if (need & 1) { A = malloc(size * sizeof(int)); for(long i=0;i<size;i++) A[i]=i; }
+    if (need & 2) { Af = malloc(size * sizeof(float)); for(long i=0;i<size;i++) Af[i]=(float)i; }
+    if (need & 4) { B = malloc(size * sizeof(int)); for(long i=0;i<size;i++) B[i]=i+1; }
+    if (need & 8) { C = malloc(size * sizeof(int)); for(long i=0;i<size;i++) C[i]=0; }
+}
 int main(int argc, char **argv){
-    long N = argc>1 ? atol(argv[1]) : 100000000;
-    long size = argc>2 ? atol(argv[2]) : 1000000;
-    int *A = NULL;
-    float *Af = NULL;
-    int *B = NULL;
-    int *C = NULL;
-    if (size > 0) {
-        A = malloc(size * sizeof(int));
-        Af = malloc(size * sizeof(float));
-        B = malloc(size * sizeof(int));
-        C = malloc(size * sizeof(int));
-        for(long i=0;i<size;i++) {
-            A[i]=i;
-            Af[i]=(float)i;
-            B[i]=i+1;
-            C[i]=0;
-        }
-    }
-    volatile int a=1, b=2, c=0;
-    for(long i=0;i<N;i++){
-        {body}
+    int op = argc>1 ? atoi(argv[1]) : 0;
+    long N = argc>2 ? atol(argv[2]) : 100000000;
+    long size = argc>3 ? atol(argv[3]) : 1000000;
+    /* seeded from argc so nothing is known at compile time */
+    int a=argc, b=argc+1, c=0;
+    switch(op){
+{cases}
+    default:
+        fprintf(stderr, "unknown benchmark %d\\n", op);
+        return 2;
     }
-    printf("%d\\n", c);
-    if (A) free(A);
-    if (Af) free(Af);
-    if (B) free(B);
-    if (C) free(C);
+    printf("%d\\n", a ^ b ^ c);
+    free(A);
+    free(Af);
+    free(B);
+    free(C);
     return 0;
 }
 """
 
+# Each case loops over one body. DoNotOptimize-style sinks (fair-benchmark
+# pattern): a, b, c and the arrays become opaque every iteration, so the body
+# can be neither folded nor hoisted, while a, b, c stay in registers instead
+# of paying a volatile store and load per access.
+C_CASE = """    case {index}: /* {op} */
+        setup({need}, size);
+        for(long i=0;i<N;i++){
+            {body}
+            __asm__ volatile("" : "+r"(a), "+r"(b), "+r"(c));
+            __asm__ volatile("" : : "r"(A), "r"(B), "r"(C) : "memory");
+        }
+        break;"""
+
+# Empty body measured first: the loop and sink cost, subtracted from every op
+BASELINE = "NOP_LOOP"
+
+
+# Compiled benchmark binary, named by a hash of source and compiler flags, so
+# reruns reuse it instead of compiling again
+CACHE_DIR = os.path.join("bench", "cache")
+# The short fixed-count loops of the vector bodies get unrolled and vectorized;
+# the sinks in C_CASE keep the benchmark loops themselves from being folded.
+CFLAGS = ["-O3", "-march=native", "-funroll-loops", "-ffast-math", "-fno-trapping-math"]
 
-def generate_c_bench(op, body):
-    code = C_TEMPLATE.replace("{body}", body)
-    return code
 
+# Arrays a body may use, as the bits of setup()'s mask
+ARRAYS = {"A": 1, "Af": 2, "B": 4, "C": 8}
+_ARRAY_RE = re.compile(r"\b(" + "|".join(ARRAYS) + r")\b")
 
-def compile_and_measure(op, body, N=10000000, size=1000000):
-    code = generate_c_bench(op, body)
+
+def array_mask(body):
+    return sum({ARRAYS[name] for name in _ARRAY_RE.findall(body)})
+
+
+def generate_c_bench(benches):
+    """C source running ``benches[k]`` (an (op, body) pair) when argv[1] is k."""
+    cases = "\n".join(
+        C_CASE.replace("{index}", str(index))
+        .replace("{op}", op)
+        .replace("{need}", str(array_mask(body)))
+        .replace("{body}", body)
+        for index, (op, body) in enumerate(benches)
+    )
+    return C_TEMPLATE.replace("{cases}", cases)
+
+
+def compile_bench(benches):
+    code = generate_c_bench(benches)
+    key = hashlib.sha1("\0".join([code, *CFLAGS]).encode()).hexdigest()[:16]
+    exe = os.path.abspath(os.path.join(CACHE_DIR, f"ops-{key}"))
+    if os.path.exists(exe):
+        return exe
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # ccache also covers a cached executable that was removed
+    cc = ["ccache", "gcc"] if shutil.which("ccache") else ["gcc"]
     with tempfile.TemporaryDirectory() as tmpdir:
-        cfile = os.path.join(tmpdir, f"{op}.c")
-        exe = os.path.join(tmpdir, op)
+        cfile = os.path.join(tmpdir, "ops.c")
+        tmp_exe = os.path.join(tmpdir, "ops")
         with open(cfile, "w") as f:
             f.write(code)
-        # Compile
-        subprocess.run(["gcc", "-O2", cfile, "-o", exe], check=True)
-        # Measure
+        subprocess.run([*cc, *CFLAGS, cfile, "-o", tmp_exe], check=True)
+        # a finished executable appears atomically, never half-written
+        shutil.move(tmp_exe, exe + ".tmp")
+        os.replace(exe + ".tmp", exe)
+    return exe
+
+
+# Elements per array: 16 KiB of ints, so memory bodies stay in L1
+L1_SIZE = 4096
+ITERATIONS = 10000000
+# Raw (energy_J, cycles) per measurement key, see measure_key
+MEASURE_CACHE = os.path.join("bench", ".measure_cache.json")
+
+
+def measure_one(exe, index, N=ITERATIONS, size=L1_SIZE, env=None):
+    result = subprocess.run(
+        [sys.executable, "tools/measure_hw.py", exe, str(index), str(N), str(size)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    result.check_returncode()
+    # measure_hw.py ends its output with one JSON line
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["energy_J"], data["cycles"]
+
+
+def gcc_version():
+    try:
         result = subprocess.run(
-            [sys.executable, "tools/measure_hw.py", exe, str(N), str(size)],
-            capture_output=True,
-            text=True,
+            ["gcc", "-dumpfullversion"], capture_output=True, text=True
         )
-        lines = result.stdout.strip().split("\n")
-        energy = None
-        cycles = None
-        for line in lines:
-            if "energy_J:" in line:
-                energy = float(line.split("energy_J:")[1].strip())
-            if "cycles:" in line:
-                cycles = int(line.split("cycles:")[1].strip())
-        return energy, cycles
-
-
-def main():
+    except OSError:
+        return ""
+    return result.stdout.strip()
+
+
+def measure_key(body, gcc_ver, N=ITERATIONS, size=L1_SIZE):
+    """Everything that decides what a measurement of ``body`` means."""
+    parts = [C_TEMPLATE, C_CASE, body, " ".join(CFLAGS), gcc_ver, str(N), str(size)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def load_measure_cache():
+    try:
+        with open(MEASURE_CACHE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_measure_cache(cache):
+    # written to a temporary file and renamed, so a crash never leaves half
+    tmp = MEASURE_CACHE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, MEASURE_CACHE)
+
+
+def _net(value, baseline):
+    # clamp: noise can put a cheap op below the empty loop
+    if value is None or baseline is None:
+        return value
+    return max(value - baseline, 0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure every CRZ64I opcode")
+    ap.add_argument(
+        "--force", action="store_true", help="Remeasure ops found in the cache"
+    )
+    args = ap.parse_args(argv)
+
     results = {}
-    for op, body in OP_BENCH.items():
-        print(f"Measuring {op}...")
+    # Locate the RAPL counter once and hand it to every measure_hw.py run
+    env = dict(os.environ)
+    pkg = find_rapl_domains().get("pkg")
+    if pkg:
+        env["CRZ_RAPL_PATH"] = pkg[0]
+    # Compiled at most once (only if some op is not cached), then run once per
+    # op; measurements stay serial so runs never share the machine
+    benches = [(BASELINE, ""), *OP_BENCH.items()]
+    cache = load_measure_cache()
+    gcc_ver = gcc_version()
+    exe = None
+    base_energy = base_cycles = None
+    for index, (op, body) in enumerate(benches):
+        key = measure_key(body, gcc_ver)
         try:
-            energy, cycles = compile_and_measure(op, body)
+            if key in cache and not args.force:
+                print(f"Cached {op}")
+                energy, cycles = cache[key]
+            else:
+                print(f"Measuring {op}...")
+                if exe is None:
+                    exe = compile_bench(benches)
+                energy, cycles = measure_one(exe, index, env=env)
+                if energy is not None:
+                    cache[key] = [energy, cycles]
+            if op == BASELINE:
+                base_energy, base_cycles = energy, cycles
+            else:
+                energy = _net(energy, base_energy)
+                cycles = _net(cycles, base_cycles)
             results[op] = {"energy_J": energy, "cycles": cycles}
         except Exception as e:
             print(f"Failed {op}: {e}")
-            results[op] = {"energy_J": None, "cycles": None}
+            # consumers skip None values; the error says why they are None
+            results[op] = {"energy_J": None, "cycles": None, "error": str(e)}
+        # the flags decide what was measured, so keep them with the result
+        results[op]["cflags"] = " ".join(CFLAGS)
+    save_measure_cache(cache)
     with open("bench/op_results.json", "w") as f:
         json.dump(results, f, indent=2)
     print("Results saved to bench/op_results.json")
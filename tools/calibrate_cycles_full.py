@@ -2,7 +2,7 @@
 """
 Compute sim_clock_hz by:
  - running CRZ simulator on same logical program and reading sim_cycles
- - running native microbench and measuring wall time (or perf cycles)
+ - running native microbench under perf (cycles, task-clock; wall time without perf)
  - compute sim_clock_hz = sim_cycles / wall_time
 
 Usage:
@@ -18,10 +18,40 @@ from crz.simulator.simulator import Simulator
 
 
 def run_native(cmd):
-    t0 = time.time()
-    subprocess.run(cmd, check=True)
-    t1 = time.time()
-    return t1 - t0
+    """
+    Run cmd under perf; returns (hardware cycles, task-clock seconds).
+
+    The task clock covers only the benchmark's own CPU time, not process
+    startup. Without perf, or if it reports nothing, fall back to
+    (None, wall time).
+    """
+    try:
+        p = subprocess.run(
+            ["perf", "stat", "-x,", "-e", "cycles,task-clock", "--"] + cmd,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        p = None
+    cycles = seconds = None
+    if p is not None and p.returncode == 0:
+        # -x, lines read: value,unit,event,...
+        for line in p.stderr.splitlines():
+            fields = line.split(",")
+            if len(fields) < 3:
+                continue
+            try:
+                if fields[2].strip() == "cycles":
+                    cycles = int(float(fields[0]))
+                elif fields[2].strip() == "task-clock":
+                    seconds = float(fields[0]) / 1e3  # reported in msec
+            except ValueError:
+                pass  # "<not supported>" / "<not counted>"
+    if seconds is None:
+        t0 = time.time()
+        subprocess.run(cmd, check=True)
+        seconds = time.time() - t0
+    return cycles, seconds
 
 
 def main():
@@ -41,12 +71,17 @@ def main():
     res = sim.run(ops)  # expect (cycles, energy, temp, ...)
     sim_cycles = res[0]
     # run native
-    wall = run_native(["./bench/micro_add", str(args.n_native)])
+    native_cycles, wall = run_native(["./bench/micro_add", str(args.n_native)])
     sim_clock_hz = sim_cycles / wall if wall > 0 else None
     out = {
         "sim_cycles": sim_cycles,
         "wall_native_s": wall,
         "sim_clock_hz": sim_clock_hz,
+        # unit-less, independent of clock frequency; None without perf
+        "native_cycles": native_cycles,
+        "sim_to_native_cycle_ratio": (
+            sim_cycles / native_cycles if native_cycles else None
+        ),
     }
     Path("bench/calib_cycles.json").write_text(json.dumps(out, indent=2))
     print(json.dumps(out, indent=2))
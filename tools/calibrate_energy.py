@@ -1,48 +1,39 @@
 #!/usr/bin/env python3
-import subprocess, time, os, sys, math
-
-RAPL_PATH = None
-# detect RAPL path
-for root, dirs, files in os.walk("/sys/class/powercap"):
-    for f in files:
-        if f == "energy_uj":
-            RAPL_PATH = os.path.join(root, f)
-            break
-    if RAPL_PATH:
-        break
+import subprocess, time, os, sys, math, json
 
+from _perf import perf_stat
+from _perf_event import open_rapl_event
+from _rapl import energy_delta, find_rapl_domains, read_max_range, read_rapl
 
-def read_rapl():
-    if not RAPL_PATH:
-        return None
-    with open(RAPL_PATH, "r") as fh:
-        return int(fh.read().strip())
+# package counter; None when absent or unreadable (then perf_event_open is tried)
+RAPL_PATH, MAX_RANGE_PATH = find_rapl_domains().get("pkg", (None, None))
 
 
 def run_and_measure(cmd, args):
     if RAPL_PATH:
-        before = read_rapl()
+        before = read_rapl(RAPL_PATH)
         t0 = time.time()
         subprocess.run([cmd] + args, check=True)
         t1 = time.time()
-        after = read_rapl()
-        energy_uj = after - before
+        after = read_rapl(RAPL_PATH)
+        if before is None or after is None:
+            return None, t1 - t0
+        # handles one wraparound; None when the delta is implausible
+        energy_uj = energy_delta(before, after, read_max_range(MAX_RANGE_PATH))
+        if energy_uj is None:
+            return None, t1 - t0
         return energy_uj / 1e6, t1 - t0  # Joule, seconds
+    elif open_rapl_event("energy-pkg"):
+        # the same counter through an open perf fd: no perf process per sample
+        event = open_rapl_event("energy-pkg")
+        before = event.read()
+        t0 = time.time()
+        subprocess.run([cmd] + args, check=True)
+        t1 = time.time()
+        return event.read() - before, t1 - t0
     else:
-        # fallback to perf: perf prints to stderr energy-pkg in joules sometimes in uJ
-        perf_cmd = ["perf", "stat", "-e", "energy-pkg", "--"] + [cmd] + args
-        p = subprocess.run(perf_cmd, capture_output=True, text=True)
-        # parse stderr for 'energy-pkg' line
-        for line in p.stderr.splitlines():
-            if "energy" in line and "pkg" in line:
-                tokens = line.strip().split()
-                # tokens like:  12345.00 joules energy-pkg
-                try:
-                    val = float(tokens[0])
-                    return val, None
-                except:
-                    continue
-        return None, None
+        stats = perf_stat([cmd] + args)
+        return stats["energy_pkg_J"], stats["time_s"]
 
 
 if __name__ == "__main__":
@@ -1,22 +1,12 @@
 #!/usr/bin/env python3
-import os, subprocess, time, sys
+import os, subprocess, time, sys, json
 
+from _perf import perf_stat
+from _rapl import energy_delta, find_rapl_domains, read_max_range, read_rapl
 
-# try find energy_uj path
-def find_rapl():
-    for root, dirs, files in os.walk("/sys/class/powercap"):
-        for f in files:
-            if f == "energy_uj":
-                return os.path.join(root, f)
-    return None
-
-
-RAPL = find_rapl()
-
-
-def read_rapl(path):
-    with open(path, "r") as fh:
-        return int(fh.read().strip())
+# package energy_uj and max_energy_range_uj paths, or None; CRZ_RAPL_PATH (set
+# by a parent) skips the scan
+RAPL, RAPL_MAX_RANGE = find_rapl_domains().get("pkg", (None, None))
 
 
 def run_measure(cmd, args):
@@ -26,29 +16,15 @@ def run_measure(cmd, args):
         subprocess.run([cmd] + args, check=True)
         t1 = time.time()
         after = read_rapl(RAPL)
-        energy_j = (after - before) / 1e6
-        return energy_j, t1 - t0, None
+        if before is None or after is None:
+            return None, t1 - t0, None
+        # handles one wraparound; None when the delta is implausible
+        delta = energy_delta(before, after, read_max_range(RAPL_MAX_RANGE))
+        return None if delta is None else delta / 1e6, t1 - t0, None
     else:
-        # fallback perf
-        perf_cmd = (
-            ["perf", "stat", "-e", "energy-pkg,cycles,branches", "--"] + [cmd] + args
-        )
-        p = subprocess.run(perf_cmd, capture_output=True, text=True)
-        # parse stderr for energy-pkg and cycles
-        energy = None
-        cycles = None
-        for line in p.stderr.splitlines():
-            if "energy-pkg" in line:
-                try:
-                    energy = float(line.strip().split()[0])
-                except:
-                    pass
-            if "cycles" in line and "cycles:" in line:
-                try:
-                    cycles = int(line.strip().split()[0].replace(",", ""))
-                except:
-                    pass
-        return energy, None, cycles
+        stats = perf_stat([cmd] + args)
+        cycles = None if stats["cycles"] is None else int(stats["cycles"])
+        return stats["energy_pkg_J"], stats["time_s"], cycles
 
 
 if __name__ == "__main__":
@@ -58,4 +34,5 @@ if __name__ == "__main__":
     cmd = sys.argv[1]
     args = sys.argv[2:]
     e, t, cycles = run_measure(cmd, args)
-    print("energy_J:", e, "time_s:", t, "cycles:", cycles)
+    # one JSON line, read by auto_measure_ops.py
+    print(json.dumps({"energy_J": e, "time_s": t, "cycles": cycles}))
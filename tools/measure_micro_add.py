@@ -12,6 +12,7 @@ import time
 import statistics
 import csv
 import os
+import re
 
 # Add src to path
 sys.path.insert(0, "src")
@@ -60,56 +61,70 @@ except ImportError:
         raise ImportError("Could not import Simulator")
 
 
+CSV_HEADER = ("mode", "run_id", "cycles", "energy", "temp", "wall_clock_s")
+
+
+# Comment lines holding an assignment (e.g. "# N = 100000"); [^\n] keeps each
+# match on one line
+_COMMENT_RE = re.compile(r"^[ \t]*#[^\n]*=[^\n]*(?:\n|\Z)", re.MULTILINE)
+_REG_RE = re.compile(r"\bR(\d+)\b")
+
+
 def load_and_substitute(path, n):
     """Load CRZ source and substitute N with the given value."""
-    import re
-
     with open(path, "r") as f:
-        lines = f.readlines()
+        code = f.read()
     # Remove lines starting with # and containing =
-    lines = [
-        line
-        for line in lines
-        if not (line.strip().startswith("#") and "=" in line.strip())
-    ]
-    code = "".join(lines)
+    code = _COMMENT_RE.sub("", code)
     # Replace N in the code
     code = code.replace("N", str(n))
     # Replace uppercase R with lowercase r for registers (e.g., R1 -> r1)
-    code = re.sub(r"\bR(\d+)\b", r"r\1", code)
-    return code
+    return _REG_RE.sub(r"r\1", code)
 
 
-def run_uncompiled(code, runs, verbose=False):
-    """Run uncompiled mode: parse -> codegen -> simulate."""
-    try:
-        program = parse_text(code)
-        # For uncompiled, do NOT apply fusion
-        ops = codegen(program, apply_fusion=False)
-    except Exception as e:
-        print(f"Error in uncompiled parsing/codegen: {e}")
-        raise
-
+def _run_loop(ops, runs, mode, verbose=False):
+    """Simulate ``ops`` ``runs`` times; return per-run results and final states."""
     results = []
     states = []
+    # One simulator, reset between runs; its energy table never changes
+    sim = Simulator()
+    energy_cfg = sim.config.energy
     for run_id in range(runs):
-        sim = Simulator()
+        sim.reset()
         start = time.perf_counter()
         try:
             cycles, energy, temp = sim.run(ops)
         except Exception as e:
-            print(f"Error in uncompiled simulation run {run_id}: {e}")
+            print(f"Error in {mode} simulation run {run_id}: {e}")
             raise
         wall = time.perf_counter() - start
         results.append((cycles, energy, temp, wall))
         states.append(sim.get_state())
         if verbose:
+            breakdown = {
+                op: count * energy_cfg.get(op, 1.0)
+                for op, count in sim._op_counts.items()
+            }
             print(
-                f"Uncompiled run {run_id}: op_counts={sim._op_counts}, energy_breakdown={ {op: count * sim.config.energy.get(op, 1.0) for op, count in sim._op_counts.items()} }"
+                f"{mode.capitalize()} run {run_id}: op_counts={sim._op_counts}, energy_breakdown={breakdown}"
             )
     return results, states
 
 
+def run_uncompiled(code, runs, verbose=False):
+    """Run uncompiled mode: parse -> codegen -> simulate."""
+    try:
+        program = parse_text(code)
+        # For uncompiled, do NOT apply fusion
+        # Parsed and lowered once, outside the timed loop; a tuple so no run
+        # can alter the ops the next one sees
+        ops = tuple(codegen(program, apply_fusion=False))
+    except Exception as e:
+        print(f"Error in uncompiled parsing/codegen: {e}")
+        raise
+    return _run_loop(ops, runs, "uncompiled", verbose)
+
+
 def run_compiled(code, runs, verbose=False):
     """Run compiled mode: CRZCompiler.compile -> simulate."""
     try:
@@ -117,65 +132,30 @@ def run_compiled(code, runs, verbose=False):
         from crz.compiler.passes import run_passes
 
         compiled_program = run_passes(program, ["fusion"])
-        ops = codegen(compiled_program)
+        ops = tuple(codegen(compiled_program))
     except Exception as e:
         print(f"Error in compiled compilation: {e}")
         raise
+    return _run_loop(ops, runs, "compiled", verbose)
 
-    results = []
-    states = []
-    for run_id in range(runs):
-        sim = Simulator()
-        start = time.perf_counter()
-        try:
-            cycles, energy, temp = sim.run(ops)
-        except Exception as e:
-            print(f"Error in compiled simulation run {run_id}: {e}")
-            raise
-        wall = time.perf_counter() - start
-        results.append((cycles, energy, temp, wall))
-        states.append(sim.get_state())
-        if verbose:
-            print(
-                f"Compiled run {run_id}: op_counts={sim._op_counts}, energy_breakdown={ {op: count * sim.config.energy.get(op, 1.0) for op, count in sim._op_counts.items()} }"
-            )
-    return results, states
-
-
-def main():
-    parser = argparse.ArgumentParser(description="Measure CRZ64I micro_add benchmark")
-    parser.add_argument("--n", type=int, default=100000, help="Number of iterations")
-    parser.add_argument("--runs", type=int, default=5, help="Number of runs per mode")
-    parser.add_argument(
-        "--out", type=str, default="results_micro_add.csv", help="Output CSV path"
-    )
-    parser.add_argument(
-        "--verbose",
-        action="store_true",
-        help="Print detailed op counts and energy breakdown",
-    )
-    args = parser.parse_args()
 
-    code = load_and_substitute("examples/micro_add.crz", args.n)
+def run(n, runs, out, verbose=False):
+    """Measure both modes, print the summary and write the CSV to ``out``."""
+    code = load_and_substitute("examples/micro_add.crz", n)
 
-    uncompiled_results, uncompiled_states = run_uncompiled(
-        code, args.runs, args.verbose
-    )
-    compiled_results, compiled_states = run_compiled(code, args.runs, args.verbose)
+    uncompiled_results, uncompiled_states = run_uncompiled(code, runs, verbose)
+    compiled_results, compiled_states = run_compiled(code, runs, verbose)
 
-    # Compute means and stddevs
-    uncompiled_means = [
-        statistics.mean([r[i] for r in uncompiled_results]) for i in range(4)
-    ]
-    compiled_means = [
-        statistics.mean([r[i] for r in compiled_results]) for i in range(4)
-    ]
+    # Column means: zip(*) transposes the (cycles, energy, temp, wall) rows
+    uncompiled_means = [statistics.fmean(col) for col in zip(*uncompiled_results)]
+    compiled_means = [statistics.fmean(col) for col in zip(*compiled_results)]
 
     # Semantic equivalence check
     uc_state = uncompiled_states[0]
     c_state = compiled_states[0]
     diffs = []
-    for r in sorted(set(list(uc_state["regs"].keys()) + list(c_state["regs"].keys()))):
+    # Dict views union without building lists; only a mismatch report is sorted
+    for r in uc_state["regs"].keys() | c_state["regs"].keys():
         a = uc_state["regs"].get(r, 0)
         b = c_state["regs"].get(r, 0)
         if isinstance(a, float) or isinstance(b, float):
@@ -184,16 +164,14 @@ def main():
         else:
             if a != b:
                 diffs.append(f"R{r}: {a} != {b}")
-    for addr in sorted(
-        set(list(uc_state["memory"].keys()) + list(c_state["memory"].keys()))
-    ):
+    for addr in uc_state["memory"].keys() | c_state["memory"].keys():
         a = uc_state["memory"].get(addr, 0)
         b = c_state["memory"].get(addr, 0)
         if a != b:
             diffs.append(f"MEM[{addr}]: {a} != {b}")
     if diffs:
         print("SEMANTIC MISMATCH between uncompiled and compiled:")
-        for d in diffs[:200]:
+        for d in sorted(diffs)[:200]:
             print(d)
         raise SystemExit(2)
     else:
@@ -201,16 +179,12 @@ def main():
 
     # Improvements: (compiled - uncompiled) / uncompiled * 100
     improvements = [
-        (
-            (compiled_means[i] - uncompiled_means[i]) / uncompiled_means[i] * 100
-            if uncompiled_means[i] != 0
-            else 0
-        )
-        for i in range(4)
+        (c - u) / u * 100 if u != 0 else 0
+        for u, c in zip(uncompiled_means, compiled_means)
     ]
 
     # Print human-readable summary
-    print(f"Microbench: micro_add N={args.n} runs={args.runs}")
+    print(f"Microbench: micro_add N={n} runs={runs}")
     print(
         f"UNCOMPILED mean cycles={uncompiled_means[0]:.0f}, energy={uncompiled_means[1]:.2f}J, temp={uncompiled_means[2]:.1f}, wall={uncompiled_means[3]:.3f}s"
     )
@@ -222,15 +196,30 @@ def main():
     )
 
     # Save CSV
-    with open(args.out, "w", newline="") as f:
+    rows = [("uncompiled", i, *r) for i, r in enumerate(uncompiled_results, 1)]
+    rows += [("compiled", i, *r) for i, r in enumerate(compiled_results, 1)]
+    with open(out, "w", newline="", buffering=1 << 16) as f:
         writer = csv.writer(f)
-        writer.writerow(["mode", "run_id", "cycles", "energy", "temp", "wall_clock_s"])
-        for i, r in enumerate(uncompiled_results):
-            writer.writerow(["uncompiled", i + 1] + list(r))
-        for i, r in enumerate(compiled_results):
-            writer.writerow(["compiled", i + 1] + list(r))
+        writer.writerow(CSV_HEADER)
+        writer.writerows(rows)
+
+    print(f"CSV saved to {out}")
+
 
-    print(f"CSV saved to {args.out}")
+def main():
+    parser = argparse.ArgumentParser(description="Measure CRZ64I micro_add benchmark")
+    parser.add_argument("--n", type=int, default=100000, help="Number of iterations")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs per mode")
+    parser.add_argument(
+        "--out", type=str, default="results_micro_add.csv", help="Output CSV path"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print detailed op counts and energy breakdown",
+    )
+    args = parser.parse_args()
+    run(args.n, args.runs, args.out, args.verbose)
 
 
 if __name__ == "__main__":
@@ -5,47 +5,75 @@ Usage:
   sudo ./venv/bin/python3 tools/op_calibrate.py --op ADD --iters 20000000
   sudo ./venv/bin/python3 tools/op_calibrate.py --op LOAD --iters 2000000 --size 5000000
 """
-import os, time, subprocess, argparse
+import os, time, subprocess, argparse, functools
 
+from _perf import domain_energies, perf_stat
+from _perf_event import open_rapl_event
+from _rapl import energy_delta, find_rapl_domains, read_max_range, read_rapl
 
-def find_rapl():
-    for root, dirs, files in os.walk("/sys/class/powercap"):
-        for f in files:
-            if f == "energy_uj":
-                return os.path.join(root, f)
-    return None
+# Domains charged to each op: ADD stays inside the cores, while a LOAD also
+# pays for DRAM, which the package domain may not include
+OP_DOMAINS = {"ADD": ("core",), "LOAD": ("pkg", "dram")}
 
 
-def read_rapl(path):
-    try:
-        with open(path, "r") as fh:
-            return int(fh.read().strip())
-    except:
+def op_energy(op, energies):
+    """Joules charged to ``op`` from per-domain Joules, or None."""
+    keys = [key for key in OP_DOMAINS[op] if key in energies]
+    if not keys:
+        # no core/dram domain on this machine: fall back to the package
+        keys = [key for key in ("pkg",) if key in energies]
+    values = [energies[key] for key in keys]
+    if not values or None in values:
         return None
+    return sum(values)
+
+
+# power PMU event names for the RAPL domains, for the fallback without sysfs
+PERF_DOMAINS = {"energy-pkg": "pkg", "energy-cores": "core", "energy-ram": "dram"}
+
+
+@functools.lru_cache(maxsize=None)
+def open_perf_domains():
+    # perf_event_open fds per domain, for when the sysfs counters are unreadable
+    events = {}
+    for name, key in PERF_DOMAINS.items():
+        event = open_rapl_event(name)
+        if event:
+            events[key] = event
+    return events
 
 
 def run_and_measure(cmd):
-    rapl = find_rapl()
-    if rapl:
-        before = read_rapl(rapl)
+    """Run ``cmd``; return ({domain: Joules}, seconds) or (None, seconds)."""
+    domains = find_rapl_domains()
+    events = {} if domains else open_perf_domains()
+    if domains:
+        before = {key: read_rapl(path) for key, (path, _) in domains.items()}
+        t0 = time.time()
+        subprocess.run(cmd, check=True)
+        t1 = time.time()
+        after = {key: read_rapl(path) for key, (path, _) in domains.items()}
+        energies = {}
+        for key, (_, max_range_path) in domains.items():
+            if before[key] is None or after[key] is None:
+                energies[key] = None
+                continue
+            delta = energy_delta(
+                before[key], after[key], read_max_range(max_range_path)
+            )
+            energies[key] = None if delta is None else delta / 1e6  # Joules
+        return energies, t1 - t0
+    elif events:
+        # read the open perf fds directly: no perf process per sample
+        before = {key: event.read() for key, event in events.items()}
         t0 = time.time()
         subprocess.run(cmd, check=True)
         t1 = time.time()
-        after = read_rapl(rapl)
-        if before is None or after is None:
-            return None, t1 - t0
-        return (after - before) / 1e6, t1 - t0  # Joules, seconds
+        after = {key: event.read() for key, event in events.items()}
+        return {key: after[key] - before[key] for key in events}, t1 - t0
     else:
-        perf_cmd = ["perf", "stat", "-e", "power/energy-pkg/", "--"] + cmd
-        p = subprocess.run(perf_cmd, capture_output=True, text=True)
-        for line in p.stderr.splitlines():
-            if "energy" in line and "pkg" in line:
-                try:
-                    val = float(line.strip().split()[0])
-                    return val, None
-                except:
-                    pass
-        return None, None
+        stats = perf_stat(cmd)
+        return domain_energies(stats) or None, stats["time_s"]
 
 
 def main():
@@ -63,16 +91,16 @@ def main():
 
     if args.op == "ADD":
         cmd = ["./bench/micro_add", str(args.iters)]
-        J, t = run_and_measure(cmd)
-        print("energy(J):", J, "time(s):", t, "ops:", args.iters)
-        if J:
-            print("energy per op (J):", J / float(args.iters))
+        unit = "op"
     else:  # LOAD
         cmd = ["./bench/micro_load", str(args.iters), str(args.size)]
-        J, t = run_and_measure(cmd)
-        print("energy(J):", J, "time(s):", t, "loads:", args.iters)
-        if J:
-            print("energy per load (J):", J / float(args.iters))
+        unit = "load"
+    energies, t = run_and_measure(cmd)
+    J = op_energy(args.op, energies) if energies else None
+    print("domains(J):", energies, "time(s):", t, f"{unit}s:", args.iters)
+    print("energy(J):", J, "from", "+".join(OP_DOMAINS[args.op]))
+    if J:
+        print(f"energy per {unit} (J):", J / float(args.iters))
 
 
 if __name__ == "__main__":
@@ -8,80 +8,138 @@ Usage:
   sudo ./venv/bin/python3 tools/op_calibrate_full.py --op ADD --iters 20000000 --runs 7
   sudo ./venv/bin/python3 tools/op_calibrate_full.py --op LOAD --iters 2000000 --size 5000000 --runs 7
 """
-import os, time, subprocess, argparse, statistics, json, re
+import os, time, subprocess, argparse, statistics, json, shutil
+import contextlib, signal, sys
 from pathlib import Path
 
+from _config_rewrite import rewrite_values
+from _perf import domain_energies, perf_stat
+from _rapl import energy_delta, find_rapl_domains, read_max_range, read_rapl
+from op_calibrate import OP_DOMAINS, op_energy
 
-def find_rapl():
-    for root, dirs, files in os.walk("/sys/class/powercap"):
-        if "energy_uj" in files:
-            return os.path.join(root, "energy_uj"), os.path.join(
-                root, "max_energy_range_uj"
-            )
-    return None, None
 
-
-def read_int_file(path):
-    try:
-        with open(path, "r") as f:
-            return int(f.read().strip())
-    except:
-        return None
+# write_patch refuses calibrations noisier than this (stdev / median energy)
+MAX_REL_STDEV = 0.05
 
 
-def measure_once(cmd, rapl_path, max_range_path):
-    if rapl_path:
-        before = read_int_file(rapl_path)
+def measure_once(cmd, domains, max_ranges):
+    """Run ``cmd`` once; return ({domain: Joules}, seconds)."""
+    if domains:
+        before = {key: read_rapl(path) for key, (path, _) in domains.items()}
         t0 = time.time()
         subprocess.run(cmd, check=True)
         t1 = time.time()
-        after = read_int_file(rapl_path)
-        if before is None or after is None:
-            return None, t1 - t0
-        max_range = read_int_file(max_range_path) or 0
-        delta = after - before
-        if max_range and delta < 0:
-            # wraparound
-            delta = (after + max_range) - before
-        return delta / 1e6, t1 - t0  # Joules, seconds
+        after = {key: read_rapl(path) for key, (path, _) in domains.items()}
+        energies = {}
+        for key in domains:
+            if before[key] is None or after[key] is None:
+                energies[key] = None
+                continue
+            # handles one wraparound; None when the delta is implausible
+            delta = energy_delta(before[key], after[key], max_ranges[key])
+            energies[key] = None if delta is None else delta / 1e6  # Joules
+        return energies, t1 - t0
     else:
-        perf_cmd = ["perf", "stat", "-x,", "-e", "power/energy-pkg", "--"] + cmd
-        p = subprocess.run(perf_cmd, capture_output=True, text=True)
-        # parse perf csv-like stderr lines
-        for line in p.stderr.splitlines():
-            # perf sometimes prints: "12345.00, joules, power/energy-pkg"
-            parts = [s.strip() for s in line.split(",") if s.strip()]
-            if len(parts) >= 3 and "power/energy-pkg" in parts[-1]:
-                try:
-                    val = float(parts[0])
-                    return val, None
-                except:
-                    pass
-        # fallback parse textual
-        for line in p.stderr.splitlines():
-            if "energy" in line and "pkg" in line:
-                toks = re.findall(r"([0-9]+\.[0-9]+|[0-9]+)", line)
-                if toks:
-                    try:
-                        return float(toks[0]), None
-                    except:
-                        pass
-        return None, None
-
-
-def run_many(op, iters, size, runs, pin_core):
-    rapl_path, max_range = find_rapl()
+        stats = perf_stat(cmd)
+        # events perf could not count are left out, as absent sysfs domains are
+        return domain_energies(stats), stats["time_s"]
+
+
+class CpuFreeze:
+    """
+    Hold the CPU in a fixed state while measuring, restoring it on exit.
+
+    Sets every cpufreq governor to "performance" and disables intel_pstate
+    turbo; with ``offline_siblings`` it also takes the SMT siblings of
+    ``pin_core`` offline. Needs root; settings that cannot be written are
+    reported and left as they are. SIGTERM still restores the saved state,
+    but a SIGKILLed run leaves it changed.
+    """
+
+    CPU_DIR = Path("/sys/devices/system/cpu")
+
+    def __init__(self, pin_core=None, offline_siblings=False):
+        self.pin_core = pin_core
+        self.offline_siblings = offline_siblings
+        self._saved = []  # (path, previous value), restored in reverse
+        self._sigterm = None
+
+    def _set(self, path, value):
+        try:
+            old = path.read_text().strip()
+            if old != value:
+                path.write_text(value)
+                self._saved.append((path, old))
+        except OSError as e:
+            print(f"CpuFreeze: cannot set {path}: {e.strerror}")
+
+    def _siblings(self, core):
+        # thread_siblings_list reads like "0,4" or "0-1"
+        path = self.CPU_DIR / f"cpu{core}" / "topology" / "thread_siblings_list"
+        try:
+            text = path.read_text().strip()
+        except OSError:
+            return []
+        cpus = []
+        for part in text.split(","):
+            lo, _, hi = part.partition("-")
+            cpus.extend(range(int(lo), int(hi or lo) + 1))
+        return [cpu for cpu in cpus if cpu != core]
+
+    def __enter__(self):
+        # turn SIGTERM into SystemExit so __exit__ gets to restore the state
+        self._sigterm = signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+        governors = self.CPU_DIR.glob("cpu[0-9]*/cpufreq/scaling_governor")
+        for governor in sorted(governors):
+            self._set(governor, "performance")
+        no_turbo = self.CPU_DIR / "intel_pstate" / "no_turbo"
+        if no_turbo.exists():
+            self._set(no_turbo, "1")
+        if self.offline_siblings and self.pin_core is not None:
+            for sibling in self._siblings(self.pin_core):
+                self._set(self.CPU_DIR / f"cpu{sibling}" / "online", "0")
+        return self
+
+    def __exit__(self, *exc):
+        while self._saved:
+            path, old = self._saved.pop()
+            try:
+                path.write_text(old)
+            except OSError as e:
+                print(f"CpuFreeze: cannot restore {path}: {e.strerror}")
+        signal.signal(signal.SIGTERM, self._sigterm)
+        return False
+
+
+def run_many(op, iters, size, runs, pin_core, freeze=False, offline_siblings=False):
+    domains = find_rapl_domains()
+    # the counters' ranges are fixed, so read them once rather than per sample
+    max_ranges = {key: read_max_range(path) for key, (_, path) in domains.items()}
+    if op == "ADD":
+        cmd = ["./bench/micro_add", str(iters)]
+    else:
+        cmd = ["./bench/micro_load", str(iters), str(size)]
+    if pin_core is not None:
+        cmd = ["taskset", "-c", str(pin_core)] + cmd
+        # SCHED_FIFO keeps other tasks off the pinned core (root only)
+        if os.geteuid() == 0 and shutil.which("chrt"):
+            cmd = ["chrt", "-f", "50"] + cmd
     results = []
-    for i in range(runs):
-        if op == "ADD":
-            cmd = ["./bench/micro_add", str(iters)]
-        else:
-            cmd = ["./bench/micro_load", str(iters), str(size)]
-        if pin_core is not None:
-            cmd = ["taskset", "-c", str(pin_core)] + cmd
-        J, t = measure_once(cmd, rapl_path, max_range)
-        results.append((J, t))
-        print(f"run {i}: energy(J)={J} time(s)={t}")
+    domain_samples = []
+    # the CPU state is only touched when asked for (see CpuFreeze)
+    if freeze:
+        frozen = CpuFreeze(pin_core, offline_siblings)
+    else:
+        frozen = contextlib.nullcontext()
+    with frozen:
+        # throwaway warm-up: the first run pays for cold caches and the DVFS ramp
+        measure_once(cmd, domains, max_ranges)
+        for i in range(runs):
+            sample, t = measure_once(cmd, domains, max_ranges)
+            J = op_energy(op, sample)
+            results.append((J, t))
+            domain_samples.append(sample)
+            print(f"run {i}: energy(J)={J} time(s)={t} domains(J)={sample}")
     # filter out None energy results
     energies = [r[0] for r in results if r[0] is not None]
     times = [r[1] for r in results if r[1] is not None]
@@ -90,6 +148,11 @@ def run_many(op, iters, size, runs, pin_core):
     median_J = statistics.median(energies)
     mean_J = statistics.mean(energies)
     median_t = statistics.median([x for x in times if x is not None]) if times else None
+    # drop the min and max sample once there are enough left to average
+    trimmed_J = (
+        statistics.mean(sorted(energies)[1:-1]) if len(energies) >= 4 else mean_J
+    )
+    stdev_J = statistics.stdev(energies) if len(energies) >= 2 else 0.0
     per_op = median_J / float(iters)
     return {
         "op": op,
@@ -97,25 +160,22 @@ def run_many(op, iters, size, runs, pin_core):
         "runs": runs,
         "median_energy_J": median_J,
         "mean_energy_J": mean_J,
+        "trimmed_mean_energy_J": trimmed_J,
+        "stdev_energy_J": stdev_J,
         "median_time_s": median_t,
         "energy_per_op_J": per_op,
+        "domains": list(OP_DOMAINS[op]),
         "raw": results,
+        "raw_domains": domain_samples,
     }
 
 
 def write_patch(cfg_path: Path, key_name: str, value: float, out_patch: Path):
     old = cfg_path.read_text()
-    new = old
-    # Replace inside "energy" dict pattern "KEY": <num>
-    pat = r'("' + re.escape(key_name) + r'"\s*:\s*)([0-9eE\+\-\.]+)'
-    if re.search(pat, old):
-        new = re.sub(pat, lambda m: m.group(1) + repr(value), old)
-    else:
-        # fallback: insert into energy dict (naive)
-        new = old.replace(
-            '"energy": {',
-            '"energy": {\n                "' + key_name + '": ' + repr(value) + ",",
-        )
+    # Replace "KEY": <num>; a key that is not there is reported, not inserted
+    new, found = rewrite_values(old, {key_name: value})
+    if not found:
+        print(f"{key_name} not found in {cfg_path}; left unchanged")
     # write patch as unified diff
     import difflib
 
@@ -144,12 +204,32 @@ def main():
     ap.add_argument("--runs", type=int, default=7)
     ap.add_argument("--pin", type=int, default=0)
     ap.add_argument("--write-patch", action="store_true")
+    ap.add_argument(
+        "--freeze-cpu",
+        action="store_true",
+        help="root only: performance governor and no turbo while measuring",
+    )
+    ap.add_argument(
+        "--offline-siblings",
+        action="store_true",
+        help="with --freeze-cpu, also take the pinned core's SMT siblings offline",
+    )
     args = ap.parse_args()
 
-    print(
-        "WARNING: Run as sudo for RAPL access (recommended). Using pin/core and performance governor reduces noise."
+    print("WARNING: Run as sudo for RAPL access (recommended).")
+    freeze = args.freeze_cpu
+    if freeze and os.geteuid() != 0:
+        print("WARNING: --freeze-cpu needs root; measuring without it.")
+        freeze = False
+    res = run_many(
+        args.op,
+        args.iters,
+        args.size,
+        args.runs,
+        args.pin,
+        freeze=freeze,
+        offline_siblings=args.offline_siblings,
     )
-    res = run_many(args.op, args.iters, args.size, args.runs, args.pin)
     if res is None:
         print("No valid energy samples collected (perf/RAPL fallback failed).")
         return
@@ -157,7 +237,14 @@ def main():
     out.write_text(json.dumps(res, indent=2))
     print("Wrote", out)
     print("energy per op (J):", res["energy_per_op_J"])
-    if args.write_patch:
+    median_J = res["median_energy_J"]
+    rel_stdev = res["stdev_energy_J"] / median_J if median_J else float("inf")
+    if args.write_patch and rel_stdev > MAX_REL_STDEV:
+        print(
+            f"WARNING: energy samples too noisy (stdev/median = {rel_stdev:.1%} > {MAX_REL_STDEV:.0%}); "
+            "NOT writing a config patch. Re-run on a quieter machine or with more --runs."
+        )
+    elif args.write_patch:
         cfg = Path("src/crz/config.py")
         patch = Path("crz_calib_patch.diff")
         key = "ADD" if args.op == "ADD" else "LOAD"
@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import functools
+import multiprocessing
 import sys
 
 sys.path.insert(0, "src")
@@ -6,11 +8,16 @@ from crz.compiler.parser import parse_text
 from crz.compiler.codegen_sim import codegen
 from crz.compiler.passes import run_passes
 from crz.simulator.simulator import Simulator
-from instructions import INSTRUCTIONS
+
+
+@functools.lru_cache(maxsize=None)
+def _parse(crz_code):
+    # codegen only reads the AST, so the unfused and fused runs share one parse
+    return parse_text(crz_code)
 
 
 def run_prog(crz_code, apply_fusion=False):
-    prog = parse_text(crz_code)
+    prog = _parse(crz_code)
     ops = codegen(prog, apply_fusion=apply_fusion)
     sim = Simulator()
     sim.run(ops)
@@ -58,21 +65,32 @@ def compare_states(s1, s2):
     return diffs
 
 
+def _check(item):
+    """
+    Run one op's program unfused and fused; returns (op, diffs, error).
+
+    The error is returned as text: parser exceptions do not pickle.
+    """
+    op, code = item
+    try:
+        s_uc = run_prog(code, apply_fusion=False)
+        s_c = run_prog(code, apply_fusion=True)
+        return op, compare_states(s_uc, s_c), None
+    except Exception as e:
+        return op, [], str(e)
+
+
 if __name__ == "__main__":
-    ops_to_test = list(OP_TEMPLATES.keys())
     failures = []
-    for op in ops_to_test:
-        code = OP_TEMPLATES.get(op, "start:\n  HALT\n")
-        try:
-            s_uc = run_prog(code, apply_fusion=False)
-            s_c = run_prog(code, apply_fusion=True)
-            diffs = compare_states(s_uc, s_c)
-            if diffs:
+    # ops are independent: check them in parallel, reporting as each finishes
+    with multiprocessing.Pool() as pool:
+        for op, diffs, error in pool.imap_unordered(_check, OP_TEMPLATES.items()):
+            if error is not None:
+                print(f"ERROR {op}: {error}")
+                failures.append(op)
+            elif diffs:
                 print(f"MISMATCH {op}: {diffs}")
                 failures.append(op)
-        except Exception as e:
-            print(f"ERROR {op}: {e}")
-            failures.append(op)
-    print("Failures:", failures)
+    print("Failures:", sorted(failures, key=list(OP_TEMPLATES).index))
     if not failures:
         print("All semantic tests passed!")
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
-import argparse, re
+import argparse
 from pathlib import Path
 
+from _config_rewrite import rewrite_values, write_if_changed
+
 ap = argparse.ArgumentParser()
 ap.add_argument("--add", type=float, help="energy per ADD (J)")
 ap.add_argument("--load", type=float, help="energy per LOAD (J)")
@@ -19,29 +21,22 @@ if not bak.exists():
     bak.write_text(text)
 
 
-def replace_key(key, val, txt):
-    if val is None:
-        return txt
-    pattern = rf'("{key}"\s*:\s*)([0-9eE+\-\.]+)'
-    return re.sub(pattern, lambda m: m.group(1) + repr(val), txt)
-
-
 repls = {
     "ADD": args.add,
     "LOAD": args.load,
     "STORE": args.store,
     "FUSED_LOAD_ADD": args.fused,
+    "sim_clock_hz": args.sim_clock_hz,
 }
-
-for k, v in repls.items():
-    text = replace_key(k, v, text)
-
-if args.sim_clock_hz is not None:
-    text = re.sub(
-        r'("sim_clock_hz"\s*:\s*)[0-9eE+\-\.]+',
-        lambda m: m.group(1) + repr(args.sim_clock_hz),
-        text,
-    )
-
-p.write_text(text)
-print("Updated src/crz/config.py (backup at {})".format(bak))
+new_text, found = rewrite_values(text, repls)
+requested = {k for k, v in repls.items() if v is not None}
+if requested and not found:
+    raise SystemExit("none of the given keys were found in src/crz/config.py")
+missing = sorted(requested - found)
+if missing:
+    print("not found in config.py:", ", ".join(missing))
+
+if write_if_changed(p, text, new_text):
+    print("Updated src/crz/config.py (backup at {})".format(bak))
+else:
+    print("src/crz/config.py unchanged")
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 from pathlib import Path
-import json, re, sys
+import json, sys
+
+from _config_rewrite import rewrite_values, write_if_changed
 
 p = Path("src/crz/config.py")
 text = p.read_text()
@@ -15,16 +17,17 @@ new_values = {
     "energy_unit": 1.0,
 }
 
-# replace simple numeric literal patterns for those keys (robust-ish)
-for k, v in new_values.items():
-    if k == "sim_clock_hz" or k == "energy_unit":
-        # replace top-level assignment in the dictionary near sim_clock_hz
-        text = re.sub(r'("sim_clock_hz"\s*:\s*)[0-9eE+\-\.]+', r"\1" + repr(v), text)
-        text = re.sub(r'("energy_unit"\s*:\s*)[0-9eE+\-\.]+', r"\1" + repr(v), text)
-    else:
-        # replace inside "energy" or "cycles" dict entries
-        pattern = r'("' + k + r'"\s*:\s*)[0-9eE+\-\.]+'
-        text = re.sub(pattern, lambda m: m.group(1) + repr(v), text)
+# replace the numeric literal after each key ("energy", "cycles" and top level)
+new_text, found = rewrite_values(text, new_values)
+if not found:
+    sys.exit("none of the keys were found in src/crz/config.py")
+missing = sorted(set(new_values) - found)
+if missing:
+    print("not found in config.py:", ", ".join(missing))
 
-p.write_text(text)
-print("config.py updated. Please review src/crz/config.py.bak and src/crz/config.py")
+if write_if_changed(p, text, new_text):
+    print(
+        "config.py updated. Please review src/crz/config.py.bak and src/crz/config.py"
+    )
+else:
+    print("config.py already has these values; not rewritten")